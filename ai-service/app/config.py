@@ -37,6 +37,29 @@ class Settings(BaseSettings):
     # for short, scoped node generation is fine on the 8b instant model.
     GROQ_FILL_MODEL: str = "llama-3.1-8b-instant"
     GROQ_FILL_MAX_TOKENS: int = 4000
+
+    # Shared Groq HTTP pool (app/services/groq_client.py): every generate / stream / fill call
+    # reuses keep-alive connections; GROQ_API_KEY is re-read when .env changes (checked every N s).
+    GROQ_HTTP_MAX_CONNECTIONS: int = 20
+    GROQ_HTTP_MAX_KEEPALIVE: int = 10
+    GROQ_HTTP_KEEPALIVE_EXPIRY_S: float = 60.0
+    GROQ_KEY_RELOAD_INTERVAL_S: float = 5.0
+
+    # Proactive Groq rate limiting (app/services/groq_scheduler.py): per-model TPM/RPM token buckets
+    # (0 = unlimited), corrected from x-ratelimit-* headers; waiting calls are served round-robin per roadmap.
+    GROQ_TPM_LIMIT: int = 12000
+    GROQ_RPM_LIMIT: int = 30
+    GROQ_FILL_TPM_LIMIT: int = 6000
+    GROQ_FILL_RPM_LIMIT: int = 30
+    GROQ_CHARS_PER_TOKEN: float = 3.0  # Vietnamese prompts tokenize denser than English (~4 chars/token)
+    GROQ_SCHEDULER_MAX_WAIT_S: float = 90.0
+
+    # Roadmap result cache (app/services/roadmap_cache.py), keyed by SHA-256 of the built prompt,
+    # both Groq models and PROMPT_VERSION: memory (per-process LRU) | sqlite (file shared by workers) | none.
+    ROADMAP_CACHE_BACKEND: str = "memory"
+    ROADMAP_CACHE_TTL_S: float = 86400.0
+    ROADMAP_CACHE_MAX_ENTRIES: int = 512
+    ROADMAP_CACHE_SQLITE_PATH: str = "data/roadmap_cache.sqlite3"
     
     # Supabase Configuration (optional - for direct access)
     SUPABASE_URL: str = ""
@@ -62,6 +85,7 @@ class Settings(BaseSettings):
     FACE_TOUCH_DEFAULT_WIDTH: int = 640
     FACE_TOUCH_DEFAULT_HEIGHT: int = 480
     FACE_TOUCH_PROCESS_WIDTH: int = 640  # Giữ nguyên độ phân giải để MediaPipe detect tay tốt hơn
+    FACE_TOUCH_REDUCED_DECODE_ENABLED: bool = True  # JPEG ≥2x PROCESS_WIDTH decodes at 1/2, 1/4 or 1/8 scale
     FACE_TOUCH_FACE_MARGIN_RATIO: float = 0.18
     FACE_TOUCH_FACE_ROI_MARGIN_RATIO: float = 0.45
     FACE_TOUCH_FACE_ROI_MIN_SIZE: int = 320
@@ -87,12 +111,93 @@ class Settings(BaseSettings):
     FACE_TOUCH_DEPTH_TOUCH_FLOOR: float = 0.12
     FACE_TOUCH_DEPTH_NEAR_FLOOR: float = 0.55
     FACE_TOUCH_ENABLE_MEDIAPIPE: bool = True
+    # Landmark backend: mediapipe (legacy solutions graphs) | onnx (ONNX Runtime CPU running the
+    # same BlazeFace / FaceMesh / palm / hand-landmark models exported to ONNX, files in MODEL_DIR).
+    # ONNX sessions are shared per process; THREADS is intra-op threads per inference call.
+    FACE_TOUCH_BACKEND: str = "mediapipe"
+    FACE_TOUCH_ONNX_MODEL_DIR: str = "models/face_touch"
+    FACE_TOUCH_ONNX_FACE_DETECTOR: str = "face_detection_full_range.onnx"
+    FACE_TOUCH_ONNX_FACE_LANDMARK: str = "face_landmark.onnx"
+    FACE_TOUCH_ONNX_PALM_DETECTOR: str = "palm_detection_full.onnx"
+    FACE_TOUCH_ONNX_HAND_LANDMARK: str = "hand_landmark_full.onnx"
+    FACE_TOUCH_ONNX_THREADS: int = 1
+    # Adaptive processing width per session: smallest rung keeping the last face/hand above
+    # the min pixel sizes (capped at FACE_TOUCH_PROCESS_WIDTH); one rung lower while the
+    # session latency EMA is over budget or the worker pool is saturated.
+    FACE_TOUCH_ADAPTIVE_WIDTH_ENABLED: bool = True
+    FACE_TOUCH_ADAPTIVE_WIDTHS: List[int] = [320, 480, 640]
+    FACE_TOUCH_ADAPTIVE_MIN_FACE_PX: int = 120
+    FACE_TOUCH_ADAPTIVE_MIN_HAND_PX: int = 56
+    FACE_TOUCH_ADAPTIVE_HOLD_FRAMES: int = 5
+    FACE_TOUCH_LATENCY_BUDGET_MS: float = 80.0
+    # Hand ROI tracking per session: once a face is known, Hands runs on a crop of the face box
+    # expanded by MARGIN_RATIO × face size per side. The full frame is re-scanned every N frames,
+    # after a hand reached the crop edge, when the face is lost or the crop covers most of the frame.
+    FACE_TOUCH_HAND_ROI_ENABLED: bool = True
+    FACE_TOUCH_HAND_ROI_MARGIN_RATIO: float = 0.9
+    FACE_TOUCH_HAND_ROI_FULL_FRAME_INTERVAL: int = 10
+    FACE_TOUCH_HAND_ROI_MAX_AREA_RATIO: float = 0.7
+    # Opt-in multi-face mode (request max_faces > 1, capped here; 1 disables): separate FaceMesh /
+    # Hands graphs sized for N faces / 2N hands, each hand scored against the face it belongs to.
+    FACE_TOUCH_MULTI_FACE_MAX: int = 4
     # MediaPipe confidence (video streaming mode)
     FACE_TOUCH_FACE_DETECT_CONFIDENCE: float = 0.6
     FACE_TOUCH_FACE_TRACK_CONFIDENCE: float = 0.5
     FACE_TOUCH_HAND_DETECT_CONFIDENCE: float = 0.3
     FACE_TOUCH_HAND_TRACK_CONFIDENCE: float = 0.2
-    
+    # Worker pool for frame inference (thread | process | inline). Workers=0 → min(4, cpu_count).
+    # Frames beyond workers + max_pending are rejected with 503 + Retry-After.
+    FACE_TOUCH_EXECUTOR_BACKEND: str = "thread"
+    FACE_TOUCH_EXECUTOR_WORKERS: int = 0
+    FACE_TOUCH_EXECUTOR_MAX_PENDING: int = 8
+    FACE_TOUCH_EXECUTOR_RETRY_AFTER_S: float = 1.0
+    # Per-client rate control: token bucket per session at sample_rate_fps × (1 + SLACK), capped at
+    # a fair share of GLOBAL_FPS over the sessions seen in the last ACTIVE_WINDOW_S; session-less
+    # frames get one bucket per client address at that fair share (the X-Forwarded-For address
+    # when the peer is in TRUSTED_PROXIES, e.g. the Next.js proxy). Over budget → 429 +
+    # X-Suggested-Fps. GLOBAL_FPS=0 → workers × FPS_PER_WORKER.
+    FACE_TOUCH_RATE_LIMIT_ENABLED: bool = True
+    FACE_TOUCH_RATE_GLOBAL_FPS: float = 0.0
+    FACE_TOUCH_RATE_FPS_PER_WORKER: float = 12.0
+    FACE_TOUCH_RATE_SLACK: float = 0.25
+    FACE_TOUCH_RATE_BURST_S: float = 1.0
+    FACE_TOUCH_RATE_ACTIVE_WINDOW_S: float = 5.0
+    FACE_TOUCH_RATE_MAX_KEYS: int = 4096
+    FACE_TOUCH_RATE_TRUSTED_PROXIES: List[str] = ["127.0.0.1", "::1"]
+    # Startup warm-up: every worker loads and runs all models once (plus N pre-warmed
+    # session runtimes per process); /api/face-touch/health reports ready only after it.
+    FACE_TOUCH_WARMUP_ENABLED: bool = True
+    FACE_TOUCH_WARMUP_TIMEOUT_S: float = 120.0
+    FACE_TOUCH_WARMUP_SESSION_RUNTIMES: int = 2
+    # Per-session tracking runtimes (keyed by FaceTouchAnalyzeRequest.session_id).
+    # Each resident session holds FaceMesh + Hands graphs (~tens of MB), so cap them.
+    FACE_TOUCH_SESSION_MAX_RESIDENT: int = 32
+    FACE_TOUCH_SESSION_IDLE_TTL_S: float = 120.0
+    # Per-session FaceMesh keyframing: reuse face landmarks for up to N-1 frames while
+    # the last state was safe, no hand is near the face and the face patch is static.
+    FACE_TOUCH_FACE_REFRESH_INTERVAL: int = 3
+    FACE_TOUCH_FACE_REFRESH_MAX_AGE_MS: float = 400.0
+    FACE_TOUCH_FACE_MOTION_THRESHOLD: float = 10.0  # mean abs diff (0-255) of a 32x32 gray face patch
+    # Offline batch review: frames are split into segments of N frames, each tracked by
+    # its own session, and segments run in parallel on the worker pool. All batches together
+    # use at most MAX_WORKERS workers (0 → workers - 1, min 1) so live frames keep one free.
+    FACE_TOUCH_BATCH_MAX_FRAMES: int = 5000
+    FACE_TOUCH_BATCH_SEGMENT_FRAMES: int = 64
+    FACE_TOUCH_BATCH_MAX_WORKERS: int = 0
+    FACE_TOUCH_BATCH_MAX_VIDEO_BYTES: int = 256_000_000
+    FACE_TOUCH_BATCH_BUSY_RETRIES: int = 30
+    # Server-side persistence per session: EMA time constant of touch/near scores,
+    # hysteresis (exit at ratio × enter threshold) and minimum alert duration.
+    FACE_TOUCH_EVENT_EMA_TAU_MS: float = 150.0
+    FACE_TOUCH_EVENT_EXIT_RATIO: float = 0.75
+    FACE_TOUCH_EVENT_MIN_DURATION_MS: float = 200.0
+    # Landmark capture for offline threshold tuning (app/services/face_touch_replay.py): when set,
+    # every session writes its single-face frames' landmarks to <dir>/<session>-<ms>.ftcap.
+    FACE_TOUCH_CAPTURE_DIR: str = ""
+    # Latency breakdown: per-stage histograms at GET /api/face-touch/metrics; frames slower
+    # than this are also logged with their stage breakdown and face path.
+    FACE_TOUCH_SLOW_FRAME_LOG_MS: float = 250.0
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -9,6 +9,8 @@ from .request import (
     GenerateRoadmapRequest,
     NodeDetailRequest,
     FaceTouchAnalyzeRequest,
+    FaceTouchBatchFrame,
+    FaceTouchBatchRequest,
 )
 from .response import (
     RoadmapPhase,
@@ -25,9 +27,17 @@ from .response import (
     DetectionOverlayBox,
     DetectionOverlayPoint,
     DetectionOverlay,
+    CompactDetectionOverlay,
     FaceTouchDebugScores,
+    FaceTouchFaceResult,
     FaceTouchFrameSize,
     FaceTouchAnalyzeResponse,
+    FaceTouchBatchFrameResult,
+    FaceTouchEvent,
+    FaceTouchPersistence,
+    FaceTouchBatchResponse,
+    FaceTouchRegion,
+    FaceTouchState,
 )
 
 __all__ = [
@@ -37,6 +47,8 @@ __all__ = [
     "GenerateRoadmapRequest",
     "NodeDetailRequest",
     "FaceTouchAnalyzeRequest",
+    "FaceTouchBatchFrame",
+    "FaceTouchBatchRequest",
     "RoadmapPhase",
     "RoadmapSection",
     "RoadmapSubsection",
@@ -51,7 +63,15 @@ __all__ = [
     "DetectionOverlayBox",
     "DetectionOverlayPoint",
     "DetectionOverlay",
+    "CompactDetectionOverlay",
     "FaceTouchDebugScores",
+    "FaceTouchFaceResult",
     "FaceTouchFrameSize",
     "FaceTouchAnalyzeResponse",
+    "FaceTouchBatchFrameResult",
+    "FaceTouchEvent",
+    "FaceTouchPersistence",
+    "FaceTouchBatchResponse",
+    "FaceTouchRegion",
+    "FaceTouchState",
 ]
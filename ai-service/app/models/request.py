@@ -215,3 +215,59 @@ class FaceTouchAnalyzeRequest(BaseModel):
         le=30,
         description="Sampling rate used by the frontend",
     )
+    session_id: Optional[str] = Field(
+        default=None,
+        min_length=1,
+        max_length=128,
+        description="Stable id of the client stream; frames sharing it reuse one temporal tracker",
+    )
+    debug_timings: bool = Field(
+        default=False,
+        description="Return the per-stage latency breakdown in debug.stages",
+    )
+    overlay_mode: Literal["full", "compact", "none"] = Field(
+        default="full",
+        description="full: point/box objects; compact: flat integer pixel arrays; none: no overlay",
+    )
+    max_faces: int = Field(
+        default=1,
+        ge=1,
+        le=8,
+        description="Track up to N faces (capped by FACE_TOUCH_MULTI_FACE_MAX) and report per-face states",
+    )
+
+
+class FaceTouchBatchFrame(BaseModel):
+    """One recorded frame of a batch review request."""
+
+    image: str = Field(
+        ...,
+        description="Base64 encoded frame image or data URL",
+    )
+    timestamp: int = Field(
+        ...,
+        ge=0,
+        description="Capture timestamp in milliseconds",
+    )
+
+
+class FaceTouchBatchRequest(BaseModel):
+    """Ordered frames of one recorded session for offline review."""
+
+    frames: List[FaceTouchBatchFrame] = Field(
+        ...,
+        min_length=1,
+        description="Frames in capture order",
+    )
+    sample_rate_fps: int = Field(
+        default=10,
+        ge=1,
+        le=30,
+        description="Sampling rate the frames were captured at",
+    )
+    session_id: Optional[str] = Field(
+        default=None,
+        min_length=1,
+        max_length=128,
+        description="Recorded session id; only used to label the batch and its tracker sessions",
+    )
@@ -3,7 +3,7 @@ Response Models for API Endpoints
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Union
 from datetime import datetime, timezone
 
 
@@ -147,6 +147,13 @@ class GenerationMetadata(BaseModel):
         default_factory=lambda: datetime.now(timezone.utc).isoformat(),
         description="Timestamp of generation"
     )
+    cache_status: Optional[str] = Field(
+        None,
+        description=(
+            "Roadmap cache lookup: hit (served from cache) | coalesced (shared a concurrent identical "
+            "generation) | miss | disabled; hit and coalesced responses report 0 tokens"
+        ),
+    )
 
 
 class RoadmapResponse(BaseModel):
@@ -179,12 +186,57 @@ class DetectionOverlay(BaseModel):
     handPoints: List[DetectionOverlayPoint] = Field(default_factory=list)
 
 
+class CompactDetectionOverlay(BaseModel):
+    """Overlay as flat integer pixel arrays (``overlay_mode=compact``)."""
+
+    faceBox: Optional[List[int]] = Field(default=None, description="[x, y, width, height]")
+    handBoxes: List[List[int]] = Field(default_factory=list, description="[[x, y, width, height], ...]")
+    facePoints: List[int] = Field(default_factory=list, description="[x0, y0, x1, y1, ...]")
+    handPoints: List[int] = Field(default_factory=list, description="[x0, y0, x1, y1, ...]")
+
+
+FaceTouchState = Literal["safe", "near_face", "touching_face"]
+FaceTouchRegion = Literal["forehead", "left_cheek", "right_cheek", "nose", "mouth", "chin", "eye_zone"]
+
+
 class FaceTouchDebugScores(BaseModel):
     overlapScore: float = Field(..., ge=0, le=1)
     proximityScore: float = Field(..., ge=0, le=1)
     fingertipScore: float = Field(..., ge=0, le=1)
     inFrontScore: float = Field(0.0, ge=0, le=1)
     depthScore: float = Field(0.0, ge=0, le=1)
+    touchScore: float = Field(0.0, ge=0, le=1, description="Raw per-frame touch score")
+    nearScore: float = Field(0.0, ge=0, le=1, description="Raw per-frame near score")
+    faceReused: bool = Field(
+        False,
+        description="True when face landmarks were reused from the session's last keyframe",
+    )
+    processWidth: int = Field(0, ge=0, description="Width the frame was analyzed at")
+    facePath: Optional[str] = Field(
+        default=None,
+        description="How the face was found: reused, roi_hint, face_mesh, detection_roi, haar_roi, detection_box, haar_box",
+    )
+    handRoi: bool = Field(
+        False,
+        description="True when Hands ran on a crop around the session's last face box instead of the full frame",
+    )
+    stages: Optional[Dict[str, float]] = Field(
+        default=None,
+        description="Per-stage milliseconds (decode, resize, color, hands or hands_roi, face_mesh, face_detection, haar, roi_mesh, scoring); only with debug_timings",
+    )
+
+
+class FaceTouchFaceResult(BaseModel):
+    """Per-face result in multi-face mode (``max_faces`` > 1)."""
+
+    index: int = Field(..., ge=0, description="Face order in the frame, left to right")
+    state: FaceTouchState
+    score: float = Field(..., ge=0, le=1)
+    regions: List[FaceTouchRegion] = Field(default_factory=list)
+    hands: int = Field(..., ge=0, le=2, description="Hands assigned to this face")
+    touchScore: float = Field(0.0, ge=0, le=1)
+    nearScore: float = Field(0.0, ge=0, le=1)
+    faceBox: DetectionOverlayBox = Field(..., description="Face box in original-frame pixels")
 
 
 class FaceTouchFrameSize(BaseModel):
@@ -192,14 +244,42 @@ class FaceTouchFrameSize(BaseModel):
     height: int = Field(..., ge=1)
 
 
+class FaceTouchEvent(BaseModel):
+    """A debounced touching-face episode (alert event)."""
+
+    state: FaceTouchState = "touching_face"
+    startIndex: int = Field(..., ge=0, description="Frame index (within the session / batch)")
+    endIndex: int = Field(..., ge=0)
+    startMs: int = Field(..., ge=0)
+    endMs: int = Field(..., ge=0)
+    durationMs: int = Field(..., ge=0)
+    peakScore: float = Field(..., ge=0, le=1)
+    regions: List[FaceTouchRegion] = Field(default_factory=list)
+
+
+class FaceTouchPersistence(BaseModel):
+    """Server-side temporal state of a session (EMA + hysteresis + minimum duration)."""
+
+    state: FaceTouchState = Field(..., description="Debounced state")
+    touchScore: float = Field(..., ge=0, le=1, description="EMA of the per-frame touch score")
+    nearScore: float = Field(..., ge=0, le=1, description="EMA of the per-frame near score")
+    alertActive: bool = Field(..., description="A touching episode has lasted the minimum duration")
+    alertStarted: bool = Field(False, description="True only on the frame the debounced alert begins")
+    activeDurationMs: int = Field(0, ge=0, description="Duration of the current touching episode")
+    events: List[FaceTouchEvent] = Field(
+        default_factory=list,
+        description="Alert events that ended on this frame",
+    )
+
+
 class FaceTouchAnalyzeResponse(BaseModel):
-    state: Literal["safe", "near_face", "touching_face"] = Field(
+    state: FaceTouchState = Field(
         ...,
         description="Classified state for the current frame",
     )
     score: float = Field(..., ge=0, le=1)
     alert: bool = Field(..., description="Whether the frame crosses alert threshold")
-    regions: List[Literal["forehead", "left_cheek", "right_cheek", "nose", "mouth", "chin", "eye_zone"]] = Field(
+    regions: List[FaceTouchRegion] = Field(
         default_factory=list,
         description="Sensitive regions near or touched by the hand",
     )
@@ -208,5 +288,39 @@ class FaceTouchAnalyzeResponse(BaseModel):
     latencyMs: int = Field(..., ge=0)
     note: str = Field(...)
     frameSize: FaceTouchFrameSize = Field(...)
-    overlay: DetectionOverlay = Field(default_factory=DetectionOverlay)
+    overlay: Union[DetectionOverlay, CompactDetectionOverlay, None] = Field(
+        default_factory=DetectionOverlay,
+        description="Shape depends on overlay_mode; null for overlay_mode=none",
+    )
     debug: FaceTouchDebugScores = Field(...)
+    persistence: Optional[FaceTouchPersistence] = Field(
+        default=None,
+        description="Debounced session state; only present for requests with a session_id",
+    )
+    faces: Optional[List[FaceTouchFaceResult]] = Field(
+        default=None,
+        description="Per-face results when max_faces > 1; the top-level fields describe the most alarming face",
+    )
+
+
+class FaceTouchBatchFrameResult(BaseModel):
+    """Compact per-frame result of a batch review (no overlay / debug payload)."""
+
+    index: int = Field(..., ge=0)
+    timestamp: int = Field(..., ge=0, description="Frame timestamp in milliseconds")
+    state: FaceTouchState
+    score: float = Field(..., ge=0, le=1)
+    hands: int = Field(..., ge=0, le=2)
+    faceDetected: bool
+    regions: List[FaceTouchRegion] = Field(default_factory=list)
+    touchScore: float = Field(0.0, ge=0, le=1)
+    nearScore: float = Field(0.0, ge=0, le=1)
+
+
+class FaceTouchBatchResponse(BaseModel):
+    sessionId: str
+    frameCount: int = Field(..., ge=0)
+    segments: int = Field(..., ge=0, description="Independent tracker segments processed in parallel")
+    processingMs: int = Field(..., ge=0)
+    frames: List[FaceTouchBatchFrameResult] = Field(default_factory=list)
+    events: List[FaceTouchEvent] = Field(default_factory=list)
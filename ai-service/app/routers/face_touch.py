@@ -2,37 +2,128 @@
 Face touch alert API router
 """
 
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+import math
+import os
+import tempfile
+import time
+import uuid
+from typing import Dict, Literal, Optional, Tuple
 
-from app.models import FaceTouchAnalyzeRequest, FaceTouchAnalyzeResponse
+import orjson
+from fastapi import (
+    APIRouter,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from starlette.datastructures import UploadFile as FormUploadFile
+
+from app.config import settings
+from app.models import (
+    FaceTouchAnalyzeRequest,
+    FaceTouchAnalyzeResponse,
+    FaceTouchBatchRequest,
+    FaceTouchBatchResponse,
+)
+from app.services.face_touch_batch import run_face_touch_batch, run_face_touch_video_batch
+from app.services.face_touch_executor import FaceTouchBusyError, face_touch_executor
+from app.services.face_touch_limiter import FaceTouchRateLimitedError, face_touch_limiter
+from app.services.face_touch_metrics import face_touch_metrics
 from app.services.face_touch_service import (
     FaceTouchServiceError,
+    analyze_face_touch_bytes,
     analyze_face_touch_frame,
     get_face_touch_runtime_status,
+    release_face_touch_session,
 )
+from app.services.face_touch_warmup import face_touch_warmup
 
 logger = logging.getLogger(__name__)
 
+OverlayMode = Literal["full", "compact", "none"]
+
 
 router = APIRouter(prefix="/api/face-touch", tags=["face-touch"])
 
 
-@router.get("/health")
-async def face_touch_health():
-    status = get_face_touch_runtime_status()
-    return JSONResponse(
-        status_code=200 if status["available"] else 503,
-        content=status,
+def _busy_exception(error: FaceTouchBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after_s)))},
     )
 
 
-@router.post("/analyze-frame", response_model=FaceTouchAnalyzeResponse)
-async def analyze_frame(request: FaceTouchAnalyzeRequest):
-    """Analyze a webcam frame and classify whether a hand is near or touching the face."""
+def _rate_limited_exception(error: FaceTouchRateLimitedError) -> HTTPException:
+    # ``detail`` stays a string: the Next.js proxy shows it as the error text.
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={
+            "Retry-After": str(max(1, math.ceil(error.retry_after_s))),
+            "X-Suggested-Fps": str(error.suggested_fps),
+            "X-Rate-Limit-Reason": error.reason,
+        },
+    )
+
+
+def _client_address(request: Request) -> str:
+    # The Next.js proxy posts every student's frames from one address and
+    # forwards the student's own in X-Forwarded-For; only trust it from proxies.
+    peer = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded and peer in settings.FACE_TOUCH_RATE_TRUSTED_PROXIES:
+        return forwarded.split(",")[0].strip() or peer
+    return peer
+
+
+def _client_key(request: Request, session_id: Optional[str]) -> str:
+    if session_id:
+        return f"session:{session_id}"
+    return f"client:{_client_address(request)}"
+
+
+def _record_timings(response: FaceTouchAnalyzeResponse, debug_timings: bool) -> FaceTouchAnalyzeResponse:
+    # Stages are measured on the worker (thread or process) and recorded here,
+    # in the API process; they are only echoed to clients that asked for them.
+    face_touch_metrics.observe(response.debug.stages, response.debug.facePath, response.latencyMs)
+    if not debug_timings:
+        response.debug.stages = None
+    return response
+
+
+def _analysis_json(response: FaceTouchAnalyzeResponse) -> Response:
+    # The service already built (and validated) the model; serializing it
+    # directly skips FastAPI's response_model re-validation + jsonable_encoder,
+    # which cost more than the rest of the response path at webcam rates.
+    return Response(content=response.model_dump_json(), media_type="application/json")
+
+
+async def _run_analysis(
+    fn,
+    *args,
+    session_id: Optional[str],
+    client_key: str,
+    sample_rate_fps: int,
+    debug_timings: bool = False,
+):
     try:
-        return analyze_face_touch_frame(request)
+        async with face_touch_limiter.admit(client_key, sample_rate_fps, shared=not session_id):
+            response = await face_touch_executor.run(fn, *args, affinity=session_id)
+        return _analysis_json(_record_timings(response, debug_timings))
+    except FaceTouchRateLimitedError as error:
+        logger.info("Face touch frame limited (%s): %s", error.reason, client_key)
+        raise _rate_limited_exception(error) from error
+    except FaceTouchBusyError as error:
+        logger.warning("Face touch analysis shed: %s", error)
+        raise _busy_exception(error) from error
     except FaceTouchServiceError as error:
         logger.warning("Face touch analysis rejected: %s", error)
         raise HTTPException(status_code=400, detail=str(error)) from error
@@ -42,3 +133,318 @@ async def analyze_frame(request: FaceTouchAnalyzeRequest):
     except Exception as error:
         logger.exception("Unexpected face touch analysis error")
         raise HTTPException(status_code=500, detail=f"Internal error: {error}") from error
+
+
+async def _run_batch(coro):
+    try:
+        return await coro
+    except FaceTouchBusyError as error:
+        logger.warning("Face touch batch shed: %s", error)
+        raise _busy_exception(error) from error
+    except FaceTouchServiceError as error:
+        logger.warning("Face touch batch rejected: %s", error)
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    except RuntimeError as error:
+        logger.error("Face touch batch unavailable: %s", error)
+        raise HTTPException(status_code=503, detail=str(error)) from error
+    except Exception as error:
+        logger.exception("Unexpected face touch batch error")
+        raise HTTPException(status_code=500, detail=f"Internal error: {error}") from error
+
+
+async def _save_upload(upload: UploadFile, max_bytes: int) -> str:
+    """Spool an uploaded video to a temp file that OpenCV (and worker processes) can open."""
+    suffix = os.path.splitext(upload.filename or "")[1] or ".mp4"
+    handle = tempfile.NamedTemporaryFile(prefix="face-touch-", suffix=suffix, delete=False)
+    written = 0
+    try:
+        with handle:
+            while chunk := await upload.read(1 << 20):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(status_code=413, detail="Kích thước video vượt quá giới hạn cho phép.")
+                handle.write(chunk)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+    if written == 0:
+        os.unlink(handle.name)
+        raise HTTPException(status_code=400, detail="Video rỗng.")
+    return handle.name
+
+
+async def _read_raw_frame(request: Request) -> bytes:
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > settings.FACE_TOUCH_MAX_IMAGE_BYTES:
+            raise HTTPException(status_code=413, detail="Kích thước frame vượt quá giới hạn cho phép.")
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("image")
+        if not isinstance(upload, FormUploadFile):
+            raise HTTPException(status_code=400, detail="Thiếu file 'image' trong multipart form.")
+        return await upload.read()
+
+    return await request.body()
+
+
+@router.get("/health")
+async def face_touch_health():
+    # With warm-up on, the workers own the models: only check dependencies here
+    # and report ready once every worker has loaded and exercised them.
+    status = get_face_touch_runtime_status(load_models=not face_touch_warmup.enabled)
+    if face_touch_warmup.enabled:
+        status["warmup"] = face_touch_warmup.status()
+        if status["available"] and not face_touch_warmup.ready:
+            status["available"] = False
+            status["message"] = (
+                f"Face-touch warm-up thất bại: {face_touch_warmup.error}"
+                if face_touch_warmup.state == "failed"
+                else "Face-touch runtime đang warm-up."
+            )
+    status["executor"] = face_touch_executor.stats()
+    return JSONResponse(
+        status_code=200 if status["available"] else 503,
+        content=status,
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def face_touch_metrics_endpoint():
+    """Prometheus text format: per-stage latency histograms, face paths and pool gauges."""
+    stats = face_touch_executor.stats()
+    gauges: Dict[str, float] = {
+        "face_touch_executor_in_flight": float(stats["inFlight"]),
+        "face_touch_executor_capacity": float(stats["capacity"]),
+        "face_touch_executor_completed": float(stats["completed"]),
+        "face_touch_executor_rejected": float(stats["rejected"]),
+    }
+    limiter_stats = face_touch_limiter.stats()
+    gauges.update(
+        {
+            "face_touch_rate_active_sessions": float(limiter_stats["activeSessions"]),
+            "face_touch_rate_fair_share_fps": float(limiter_stats["fairShareFps"]),
+            "face_touch_rate_limited": float(limiter_stats["limited"]),
+            "face_touch_rate_superseded": float(limiter_stats["superseded"]),
+        }
+    )
+    return PlainTextResponse(
+        face_touch_metrics.render(gauges),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.post("/analyze-frame", response_model=FaceTouchAnalyzeResponse)
+async def analyze_frame(request: FaceTouchAnalyzeRequest, http_request: Request):
+    """Analyze a webcam frame and classify whether a hand is near or touching the face.
+
+    Frames over the session's rate budget, or superseded by a newer frame of
+    the same session while queued, get 429 with an ``X-Suggested-Fps`` header.
+    """
+    return await _run_analysis(
+        analyze_face_touch_frame,
+        request,
+        face_touch_executor.utilization,
+        session_id=request.session_id,
+        client_key=_client_key(http_request, request.session_id),
+        sample_rate_fps=request.sample_rate_fps,
+        debug_timings=request.debug_timings,
+    )
+
+
+@router.post("/analyze-frame/raw", response_model=FaceTouchAnalyzeResponse)
+async def analyze_frame_raw(
+    request: Request,
+    session_id: Optional[str] = None,
+    timestamp: Optional[int] = Query(default=None, ge=0),
+    sample_rate_fps: int = Query(default=10, ge=1, le=30),
+    debug_timings: bool = False,
+    overlay_mode: OverlayMode = "full",
+    max_faces: int = Query(default=1, ge=1, le=8),
+):
+    """Binary variant of analyze-frame.
+
+    Accepts the encoded frame as the request body (``application/octet-stream``,
+    ``image/jpeg``, ``image/webp``) or as the ``image`` part of a multipart
+    form. The bytes go straight to ``cv2.imdecode`` without base64 or JSON.
+    """
+    image_bytes = await _read_raw_frame(request)
+    return await _run_analysis(
+        analyze_face_touch_bytes,
+        image_bytes,
+        session_id,
+        timestamp,
+        sample_rate_fps,
+        face_touch_executor.utilization,
+        overlay_mode,
+        max_faces,
+        session_id=session_id,
+        client_key=_client_key(request, session_id),
+        sample_rate_fps=sample_rate_fps,
+        debug_timings=debug_timings,
+    )
+
+
+@router.post("/analyze-batch", response_model=FaceTouchBatchResponse)
+async def analyze_batch(request: FaceTouchBatchRequest):
+    """Analyze an ordered list of recorded frames of one session (offline review).
+
+    Returns compact per-frame results plus aggregated touching-face events.
+    """
+    return await _run_batch(run_face_touch_batch(request))
+
+
+@router.post("/analyze-batch/video", response_model=FaceTouchBatchResponse)
+async def analyze_batch_video(
+    video: UploadFile = File(...),
+    session_id: Optional[str] = Query(default=None, min_length=1, max_length=128),
+    sample_rate_fps: int = Query(default=10, ge=1, le=30),
+):
+    """Batch variant for a recorded video file, sampled at ``sample_rate_fps``."""
+    video_path = await _save_upload(video, settings.FACE_TOUCH_BATCH_MAX_VIDEO_BYTES)
+    try:
+        return await _run_batch(
+            run_face_touch_video_batch(video_path, session_id, sample_rate_fps)
+        )
+    finally:
+        os.unlink(video_path)
+
+
+class _LatestFrameSlot:
+    """Single-slot mailbox: a newer frame replaces one that was not picked up yet."""
+
+    def __init__(self) -> None:
+        self._frame: Optional[Tuple[int, float, bytes]] = None
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, data: bytes) -> None:
+        if self._frame is not None:
+            self.dropped += 1
+        self.received += 1
+        # Receive time drives the session's face keyframe clock.
+        self._frame = (self.received, time.monotonic() * 1000.0, data)
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    def poll(self) -> Optional[Tuple[int, float, bytes]]:
+        """Take the pending frame, if any, without waiting."""
+        self._ready.clear()
+        frame, self._frame = self._frame, None
+        return frame
+
+    async def take(self) -> Optional[Tuple[int, float, bytes]]:
+        await self._ready.wait()
+        self._ready.clear()
+        frame, self._frame = self._frame, None
+        return frame
+
+
+async def _receive_frames(websocket: WebSocket, slot: _LatestFrameSlot) -> None:
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("bytes")
+            if data:
+                slot.put(data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        slot.close()
+
+
+@router.websocket("/stream")
+async def stream_frames(
+    websocket: WebSocket,
+    session_id: Optional[str] = None,
+    sample_rate_fps: int = Query(default=10, ge=1, le=30),
+    debug_timings: bool = False,
+    overlay_mode: OverlayMode = "full",
+    max_faces: int = Query(default=1, ge=1, le=8),
+):
+    """Stream raw JPEG/WebP frames as binary messages; results come back as JSON.
+
+    Each result mirrors ``FaceTouchAnalyzeResponse`` plus ``frameSeq`` and
+    ``droppedFrames``. When inference falls behind, only the newest pending
+    frame is analyzed and older ones are dropped. A stream sending faster than
+    its rate budget is paced the same way (newest frame wins) and its results
+    carry ``suggestedFps``.
+    """
+    await websocket.accept()
+    stream_session_id = session_id or f"ws-{uuid.uuid4().hex}"
+    slot = _LatestFrameSlot()
+    receiver = asyncio.create_task(_receive_frames(websocket, slot))
+
+    try:
+        while True:
+            frame = await slot.take()
+            if frame is None:
+                if slot.closed:
+                    break
+                continue
+            wait_s, suggested_fps = face_touch_limiter.reserve(
+                f"session:{stream_session_id}", sample_rate_fps
+            )
+            if wait_s > 0:
+                await asyncio.sleep(wait_s)
+                newer = slot.poll()
+                if newer is not None:
+                    slot.dropped += 1
+                    frame = newer
+            frame_seq, received_ms, data = frame
+            try:
+                response = await face_touch_executor.run(
+                    analyze_face_touch_bytes,
+                    data,
+                    stream_session_id,
+                    received_ms,
+                    sample_rate_fps,
+                    face_touch_executor.utilization,
+                    overlay_mode,
+                    max_faces,
+                    affinity=stream_session_id,
+                )
+            except FaceTouchBusyError as error:
+                await websocket.send_json(
+                    {
+                        "frameSeq": frame_seq,
+                        "error": str(error),
+                        "retryAfterS": error.retry_after_s,
+                    }
+                )
+                continue
+            except (FaceTouchServiceError, RuntimeError) as error:
+                await websocket.send_json({"frameSeq": frame_seq, "error": str(error)})
+                continue
+            if slot.closed:
+                break
+
+            _record_timings(response, debug_timings)
+            payload = response.model_dump(mode="json")
+            payload["frameSeq"] = frame_seq
+            payload["droppedFrames"] = slot.dropped
+            if wait_s > 0 or suggested_fps < sample_rate_fps:
+                payload["suggestedFps"] = suggested_fps
+            await websocket.send_text(orjson.dumps(payload).decode("utf-8"))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        try:
+            await face_touch_executor.run(
+                release_face_touch_session,
+                stream_session_id,
+                affinity=stream_session_id,
+            )
+        except FaceTouchBusyError:
+            # Idle TTL reclaims the runtime if the pool is saturated right now.
+            pass
@@ -0,0 +1,374 @@
+"""Offline batch analysis of recorded face-touch sessions.
+
+Reviewing a recorded exam used to mean replaying thousands of analyze-frame
+POSTs one by one. A batch is instead split into contiguous segments; every
+segment is decoded and analyzed in capture order by one worker with its own
+tracker session, and segments run in parallel on ``face_touch_executor``.
+Only a compact per-frame result is kept (no overlay / debug payload).
+
+A segment holds a worker for seconds, so all batches together may occupy
+at most ``batch_slots()`` workers (``FACE_TOUCH_BATCH_MAX_WORKERS``, by
+default one less than the pool): live analyze-frame requests always keep
+a worker of their own.
+
+Segment boundaries reset the temporal trackers, so segments are kept large
+(``FACE_TOUCH_BATCH_SEGMENT_FRAMES``) and only split further when that is
+needed to give every worker something to do.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+import uuid
+from typing import Any, Callable, List, Sequence, Tuple
+
+from app.config import settings
+from app.models import (
+    FaceTouchAnalyzeResponse,
+    FaceTouchBatchFrameResult,
+    FaceTouchBatchRequest,
+    FaceTouchBatchResponse,
+    FaceTouchEvent,
+)
+from app.services.face_touch_events import FaceTouchEventTracker
+from app.services.face_touch_executor import FaceTouchBusyError, face_touch_executor
+from app.services.face_touch_service import (
+    FaceTouchServiceError,
+    analyze_decoded_frame,
+    decode_frame,
+    release_face_touch_session,
+)
+
+try:
+    import cv2
+except ImportError:  # pragma: no cover - handled by runtime checks
+    cv2 = None
+
+logger = logging.getLogger(__name__)
+
+_MIN_SEGMENT_FRAMES = 8
+
+# Shared by every batch in the process; created on first use in the running loop.
+_batch_semaphore: asyncio.Semaphore | None = None
+_batch_semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+
+def batch_slots() -> int:
+    """Workers that batch segments may occupy at once, across all batches."""
+    if settings.FACE_TOUCH_BATCH_MAX_WORKERS > 0:
+        return min(settings.FACE_TOUCH_BATCH_MAX_WORKERS, face_touch_executor.workers)
+    # A single-worker pool cannot reserve one for live frames; segments still
+    # run one at a time there.
+    return max(face_touch_executor.workers - 1, 1)
+
+
+def _batch_slots_semaphore() -> asyncio.Semaphore:
+    global _batch_semaphore, _batch_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _batch_semaphore is None or _batch_semaphore_loop is not loop:
+        _batch_semaphore = asyncio.Semaphore(batch_slots())
+        _batch_semaphore_loop = loop
+    return _batch_semaphore
+
+
+def _compact_result(
+    index: int,
+    timestamp_ms: int,
+    response: FaceTouchAnalyzeResponse,
+) -> FaceTouchBatchFrameResult:
+    return FaceTouchBatchFrameResult(
+        index=index,
+        timestamp=timestamp_ms,
+        state=response.state,
+        score=response.score,
+        hands=response.hands,
+        faceDetected=response.faceDetected,
+        regions=response.regions,
+        touchScore=response.debug.touchScore,
+        nearScore=response.debug.nearScore,
+    )
+
+
+def analyze_face_touch_segment(
+    session_id: str,
+    first_index: int,
+    payloads: Sequence[str | bytes],
+    timestamps: Sequence[int],
+    sample_rate_fps: int = 10,
+) -> List[FaceTouchBatchFrameResult]:
+    """Decode and analyze consecutive frames in order on one tracker session.
+
+    ``payloads`` are base64 strings / data URLs or raw encoded image bytes.
+    Runs on an executor worker; the segment session is released at the end.
+    """
+    results: List[FaceTouchBatchFrameResult] = []
+    try:
+        for offset, (payload, timestamp_ms) in enumerate(zip(payloads, timestamps)):
+            index = first_index + offset
+            started_at = time.perf_counter()
+            try:
+                frame = decode_frame(payload)
+            except FaceTouchServiceError as error:
+                raise FaceTouchServiceError(f"Frame {index}: {error}") from error
+            response = analyze_decoded_frame(
+                frame,
+                session_id,
+                timestamp_ms=timestamp_ms,
+                sample_rate_fps=sample_rate_fps,
+                overlay_mode="none",
+                started_at=started_at,
+            )
+            results.append(_compact_result(index, timestamp_ms, response))
+    finally:
+        release_face_touch_session(session_id)
+    return results
+
+
+def _opencv():
+    if cv2 is None:
+        raise RuntimeError("opencv-python chưa được cài đặt cho AI service.")
+    return cv2
+
+
+def probe_face_touch_video(video_path: str) -> Tuple[int, float]:
+    """Return (frame_count, fps) of a video file; frame_count is 0 when unknown."""
+    cv = _opencv()
+
+    capture = cv.VideoCapture(video_path)
+    try:
+        if not capture.isOpened():
+            raise FaceTouchServiceError("Không thể đọc video đã gửi.")
+        frame_count = int(capture.get(cv.CAP_PROP_FRAME_COUNT) or 0)
+        fps = float(capture.get(cv.CAP_PROP_FPS) or 0.0)
+    finally:
+        capture.release()
+    return max(frame_count, 0), fps if fps > 0 else 30.0
+
+
+def analyze_face_touch_video_segment(
+    session_id: str,
+    video_path: str,
+    first_index: int,
+    stop_index: int,
+    stride: int,
+    video_fps: float,
+    sample_rate_fps: int = 10,
+) -> List[FaceTouchBatchFrameResult]:
+    """Analyze sampled frames ``[first_index, stop_index)`` of a video file.
+
+    Sampled frame ``k`` is video frame ``k * stride``; frames in between are
+    only grabbed (not converted). Every segment opens its own capture, so
+    segments decode in parallel.
+    """
+    cv = _opencv()
+
+    results: List[FaceTouchBatchFrameResult] = []
+    capture = cv.VideoCapture(video_path)
+    try:
+        if not capture.isOpened():
+            raise FaceTouchServiceError("Không thể đọc video đã gửi.")
+        start_position = first_index * stride
+        if start_position:
+            capture.set(cv.CAP_PROP_POS_FRAMES, start_position)
+
+        for index in range(first_index, stop_index):
+            if index > first_index:
+                skipped = [capture.grab() for _ in range(stride - 1)]
+                if not all(skipped):
+                    break
+            ok, frame = capture.read()
+            if not ok or frame is None:
+                break
+            started_at = time.perf_counter()
+            timestamp_ms = int(round(index * stride * 1000.0 / video_fps))
+            response = analyze_decoded_frame(
+                frame,
+                session_id,
+                timestamp_ms=timestamp_ms,
+                sample_rate_fps=sample_rate_fps,
+                overlay_mode="none",
+                started_at=started_at,
+            )
+            results.append(_compact_result(index, timestamp_ms, response))
+    finally:
+        capture.release()
+        release_face_touch_session(session_id)
+    return results
+
+
+def aggregate_touch_events(frames: Sequence[FaceTouchBatchFrameResult]) -> List[FaceTouchEvent]:
+    """Debounced alert events over the whole batch, in frame order.
+
+    Runs one ``FaceTouchEventTracker`` across all segments, so an episode that
+    spans a segment boundary is still reported as a single event.
+    """
+    tracker = FaceTouchEventTracker()
+    events: List[FaceTouchEvent] = []
+    for frame in frames:
+        events.extend(
+            tracker.update(frame.timestamp, frame.touchScore, frame.nearScore, frame.regions).events
+        )
+    events.extend(tracker.flush())
+    # Tracker indices count frames fed to it; map them back to batch frame indices.
+    return [
+        event.model_copy(
+            update={
+                "startIndex": frames[event.startIndex].index,
+                "endIndex": frames[event.endIndex].index,
+            }
+        )
+        for event in events
+    ]
+
+
+def _segment_bounds(frame_count: int) -> List[Tuple[int, int]]:
+    """Split ``frame_count`` frames into contiguous segments, one or more per batch slot."""
+    if frame_count <= 0:
+        return []
+    per_worker = math.ceil(frame_count / batch_slots())
+    size = max(
+        _MIN_SEGMENT_FRAMES,
+        min(settings.FACE_TOUCH_BATCH_SEGMENT_FRAMES, per_worker),
+    )
+    return [(start, min(start + size, frame_count)) for start in range(0, frame_count, size)]
+
+
+async def _run_with_retry(fn: Callable[..., Any], *args: Any, affinity: str) -> Any:
+    # A busy pool only delays offline work: back off and retry instead of failing.
+    attempt = 0
+    while True:
+        try:
+            return await face_touch_executor.run(fn, *args, affinity=affinity)
+        except FaceTouchBusyError as error:
+            attempt += 1
+            if attempt > settings.FACE_TOUCH_BATCH_BUSY_RETRIES:
+                raise
+            await asyncio.sleep(error.retry_after_s)
+
+
+async def _run_segments(
+    calls: Sequence[Tuple[Callable[..., List[FaceTouchBatchFrameResult]], Tuple[Any, ...], str]],
+) -> List[FaceTouchBatchFrameResult]:
+    # Batch segments of every batch share ``batch_slots()`` workers, so they
+    # never fill the admission queue or hold the whole pool while live webcam
+    # frames wait.
+    semaphore = _batch_slots_semaphore()
+
+    async def run_one(fn, args, affinity) -> List[FaceTouchBatchFrameResult]:
+        async with semaphore:
+            return await _run_with_retry(fn, *args, affinity=affinity)
+
+    segment_results = await asyncio.gather(
+        *(run_one(fn, args, affinity) for fn, args, affinity in calls)
+    )
+    return [result for segment in segment_results for result in segment]
+
+
+def _batch_session_id(session_id: str | None) -> str:
+    return session_id or f"batch-{uuid.uuid4().hex}"
+
+
+def _segment_session_id(batch_id: str, segment: int) -> str:
+    return f"{batch_id}#seg{segment}"
+
+
+async def run_face_touch_batch(request: FaceTouchBatchRequest) -> FaceTouchBatchResponse:
+    """Analyze an ordered list of frames; segments run in parallel on the pool."""
+    frame_count = len(request.frames)
+    if frame_count > settings.FACE_TOUCH_BATCH_MAX_FRAMES:
+        raise FaceTouchServiceError(
+            f"Batch vượt quá {settings.FACE_TOUCH_BATCH_MAX_FRAMES} frame cho phép."
+        )
+
+    started_at = time.perf_counter()
+    batch_id = _batch_session_id(request.session_id)
+    bounds = _segment_bounds(frame_count)
+    calls = [
+        (
+            analyze_face_touch_segment,
+            (
+                _segment_session_id(batch_id, segment),
+                start,
+                [frame.image for frame in request.frames[start:stop]],
+                [frame.timestamp for frame in request.frames[start:stop]],
+                request.sample_rate_fps,
+            ),
+            _segment_session_id(batch_id, segment),
+        )
+        for segment, (start, stop) in enumerate(bounds)
+    ]
+    frames = await _run_segments(calls)
+    return _batch_response(batch_id, frames, len(bounds), started_at)
+
+
+async def run_face_touch_video_batch(
+    video_path: str,
+    session_id: str | None = None,
+    sample_rate_fps: int = 10,
+) -> FaceTouchBatchResponse:
+    """Analyze a video file sampled at ``sample_rate_fps``."""
+    started_at = time.perf_counter()
+    batch_id = _batch_session_id(session_id)
+    video_frames, video_fps = await _run_with_retry(
+        probe_face_touch_video,
+        video_path,
+        affinity=batch_id,
+    )
+    stride = max(1, int(round(video_fps / sample_rate_fps)))
+
+    if video_frames > 0:
+        sampled_count = math.ceil(video_frames / stride)
+        if sampled_count > settings.FACE_TOUCH_BATCH_MAX_FRAMES:
+            raise FaceTouchServiceError(
+                f"Video vượt quá {settings.FACE_TOUCH_BATCH_MAX_FRAMES} frame sau khi lấy mẫu."
+            )
+        bounds = _segment_bounds(sampled_count)
+    else:
+        # Frame count unknown (some containers): read sequentially until EOF.
+        bounds = [(0, settings.FACE_TOUCH_BATCH_MAX_FRAMES)]
+
+    calls = [
+        (
+            analyze_face_touch_video_segment,
+            (
+                _segment_session_id(batch_id, segment),
+                video_path,
+                start,
+                stop,
+                stride,
+                video_fps,
+                sample_rate_fps,
+            ),
+            _segment_session_id(batch_id, segment),
+        )
+        for segment, (start, stop) in enumerate(bounds)
+    ]
+    frames = await _run_segments(calls)
+    return _batch_response(batch_id, frames, len(bounds), started_at)
+
+
+def _batch_response(
+    batch_id: str,
+    frames: List[FaceTouchBatchFrameResult],
+    segments: int,
+    started_at: float,
+) -> FaceTouchBatchResponse:
+    processing_ms = int((time.perf_counter() - started_at) * 1000)
+    logger.info(
+        "[FACE TOUCH] batch %s: %d frames in %d segments, %d ms",
+        batch_id,
+        len(frames),
+        segments,
+        processing_ms,
+    )
+    return FaceTouchBatchResponse(
+        sessionId=batch_id,
+        frameCount=len(frames),
+        segments=segments,
+        processingMs=processing_ms,
+        frames=frames,
+        events=aggregate_touch_events(frames),
+    )
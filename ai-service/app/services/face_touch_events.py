@@ -0,0 +1,148 @@
+"""Temporal touch-event state machine for face-touch sessions.
+
+Every frame is still classified on its own by ``face_touch_service``; this
+module turns that noisy per-frame signal into debounced session state:
+
+- EMA of the raw touch / near scores with a time constant (not a per-frame
+  factor), so the smoothing is the same whether a client sends 2 or 15 fps;
+- hysteresis: a state is entered at the normal threshold and only left when
+  the EMA drops below ``FACE_TOUCH_EVENT_EXIT_RATIO`` × that threshold;
+- minimum duration: a touching episode becomes an alert only once it has
+  lasted ``FACE_TOUCH_EVENT_MIN_DURATION_MS``; shorter blips are dropped.
+
+Used by live sessions (one tracker per session) and by batch review.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Iterable, List, Set
+
+from app.config import settings
+from app.models import FaceTouchEvent, FaceTouchPersistence, FaceTouchRegion, FaceTouchState
+
+
+@dataclass
+class _Episode:
+    start_index: int
+    start_ms: float
+    end_index: int
+    end_ms: float
+    peak_score: float
+    regions: Set[FaceTouchRegion] = field(default_factory=set)
+    confirmed: bool = False
+
+    @property
+    def duration_ms(self) -> float:
+        return max(self.end_ms - self.start_ms, 0.0)
+
+    def to_event(self) -> FaceTouchEvent:
+        return FaceTouchEvent(
+            startIndex=self.start_index,
+            endIndex=self.end_index,
+            startMs=int(round(self.start_ms)),
+            endMs=int(round(self.end_ms)),
+            durationMs=int(round(self.duration_ms)),
+            peakScore=round(min(max(self.peak_score, 0.0), 1.0), 4),
+            regions=sorted(self.regions),
+        )
+
+
+class FaceTouchEventTracker:
+    """Debounces per-frame touch/near scores into session state and alert events."""
+
+    def __init__(
+        self,
+        tau_ms: float | None = None,
+        exit_ratio: float | None = None,
+        min_duration_ms: float | None = None,
+    ) -> None:
+        self.tau_ms = max(tau_ms if tau_ms is not None else settings.FACE_TOUCH_EVENT_EMA_TAU_MS, 1.0)
+        self.exit_ratio = exit_ratio if exit_ratio is not None else settings.FACE_TOUCH_EVENT_EXIT_RATIO
+        self.min_duration_ms = (
+            min_duration_ms
+            if min_duration_ms is not None
+            else settings.FACE_TOUCH_EVENT_MIN_DURATION_MS
+        )
+
+        self.state: FaceTouchState = "safe"
+        self.touch_ema = 0.0
+        self.near_ema = 0.0
+        self.frame_index = -1
+        self.last_ms: float | None = None
+        self._episode: _Episode | None = None
+
+    def _smoothing(self, timestamp_ms: float) -> float:
+        if self.last_ms is None or timestamp_ms <= self.last_ms:
+            elapsed_ms = self.tau_ms
+        else:
+            elapsed_ms = timestamp_ms - self.last_ms
+        return 1.0 - math.exp(-elapsed_ms / self.tau_ms)
+
+    def _next_state(self) -> FaceTouchState:
+        touch_enter = settings.FACE_TOUCH_TOUCH_THRESHOLD
+        near_enter = settings.FACE_TOUCH_NEAR_THRESHOLD
+        touch_limit = touch_enter * self.exit_ratio if self.state == "touching_face" else touch_enter
+        near_limit = near_enter * self.exit_ratio if self.state != "safe" else near_enter
+
+        if self.touch_ema >= touch_limit:
+            return "touching_face"
+        if self.near_ema >= near_limit:
+            return "near_face"
+        return "safe"
+
+    def update(
+        self,
+        timestamp_ms: float,
+        touch_score: float,
+        near_score: float,
+        regions: Iterable[FaceTouchRegion] = (),
+    ) -> FaceTouchPersistence:
+        """Feed one frame; returns the debounced state after it."""
+        self.frame_index += 1
+        alpha = self._smoothing(timestamp_ms)
+        self.touch_ema += alpha * (touch_score - self.touch_ema)
+        self.near_ema += alpha * (near_score - self.near_ema)
+        self.last_ms = timestamp_ms if self.last_ms is None else max(self.last_ms, timestamp_ms)
+        self.state = self._next_state()
+
+        alert_started = False
+        events: List[FaceTouchEvent] = []
+        episode = self._episode
+        if self.state == "touching_face":
+            if episode is None:
+                episode = self._episode = _Episode(
+                    start_index=self.frame_index,
+                    start_ms=timestamp_ms,
+                    end_index=self.frame_index,
+                    end_ms=timestamp_ms,
+                    peak_score=touch_score,
+                )
+            episode.end_index = self.frame_index
+            episode.end_ms = max(episode.end_ms, timestamp_ms)
+            episode.peak_score = max(episode.peak_score, touch_score)
+            episode.regions.update(regions)
+            if not episode.confirmed and episode.duration_ms >= self.min_duration_ms:
+                episode.confirmed = True
+                alert_started = True
+        else:
+            events.extend(self.flush())
+            episode = None
+
+        return FaceTouchPersistence(
+            state=self.state,
+            touchScore=round(min(max(self.touch_ema, 0.0), 1.0), 4),
+            nearScore=round(min(max(self.near_ema, 0.0), 1.0), 4),
+            alertActive=bool(episode is not None and episode.confirmed),
+            alertStarted=alert_started,
+            activeDurationMs=int(round(episode.duration_ms)) if episode is not None else 0,
+            events=events,
+        )
+
+    def flush(self) -> List[FaceTouchEvent]:
+        """Close the open episode (end of stream); returns it if it was an alert."""
+        episode, self._episode = self._episode, None
+        if episode is None or not episode.confirmed:
+            return []
+        return [episode.to_event()]
@@ -0,0 +1,230 @@
+"""Execution backend for face-touch frame analysis.
+
+MediaPipe inference is CPU-bound and fully synchronous, so calling it directly
+from an ``async def`` route freezes the uvicorn event loop for every webcam
+frame and stalls concurrent roadmap / Ollama streams. This module moves the
+work onto a bounded worker pool:
+
+- ``thread``: one ThreadPoolExecutor; every worker thread owns its own
+  MediaPipe runtime (MediaPipe/OpenCV release the GIL during inference).
+- ``process``: one single-worker ProcessPoolExecutor per shard; every process
+  owns its runtimes, so throughput scales with cores without touching the GIL.
+- ``inline``: run on the caller (tests / debugging only).
+
+Admission is bounded: at most ``workers + max_pending`` frames may be in flight.
+Past that ``FaceTouchBusyError`` is raised immediately so the router can answer
+503 + Retry-After instead of queueing frames that would be stale on completion.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+EXECUTOR_BACKENDS = ("thread", "process", "inline")
+
+
+class FaceTouchBusyError(RuntimeError):
+    """Raised when the face-touch worker pool has no free admission slot."""
+
+    def __init__(self, message: str, retry_after_s: float = 1.0):
+        self.retry_after_s = retry_after_s
+        super().__init__(message)
+
+
+def _default_worker_count() -> int:
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _after_barrier(barrier: threading.Barrier, fn: Callable[..., T], *args: Any) -> T:
+    # Holding every task until all have started forces the pool to hand one
+    # to each of its threads instead of reusing the first idle one.
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    return fn(*args)
+
+
+class FaceTouchExecutor:
+    """Bounded thread/process pool that runs synchronous face-touch work."""
+
+    def __init__(
+        self,
+        backend: str = "thread",
+        workers: int = 0,
+        max_pending: int = 8,
+        retry_after_s: float = 1.0,
+    ) -> None:
+        if backend not in EXECUTOR_BACKENDS:
+            raise ValueError(
+                f"Unknown face-touch executor backend '{backend}'. "
+                f"Expected one of: {', '.join(EXECUTOR_BACKENDS)}"
+            )
+        self.backend = backend
+        self.workers = workers if workers > 0 else _default_worker_count()
+        self.max_pending = max(max_pending, 0)
+        self.retry_after_s = retry_after_s
+
+        self._shards: List[Executor] = []
+        self._shard_load: List[int] = []
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_settings(cls) -> "FaceTouchExecutor":
+        return cls(
+            backend=settings.FACE_TOUCH_EXECUTOR_BACKEND,
+            workers=settings.FACE_TOUCH_EXECUTOR_WORKERS,
+            max_pending=settings.FACE_TOUCH_EXECUTOR_MAX_PENDING,
+            retry_after_s=settings.FACE_TOUCH_EXECUTOR_RETRY_AFTER_S,
+        )
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of frames admitted at once (running + queued)."""
+        return self.workers + self.max_pending
+
+    @property
+    def started(self) -> bool:
+        return bool(self._shards) or self.backend == "inline"
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of worker slots currently busy; >1.0 means frames are queued."""
+        return self._in_flight / max(self.workers, 1)
+
+    def start(self) -> None:
+        if self.started:
+            return
+        if self.backend == "thread":
+            self._shards = [
+                ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="face-touch",
+                )
+            ]
+        else:
+            # spawn instead of fork: the parent already runs uvicorn threads and
+            # forking a multithreaded process can deadlock inside MediaPipe.
+            context = multiprocessing.get_context("spawn")
+            self._shards = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context)
+                for _ in range(self.workers)
+            ]
+        self._shard_load = [0] * len(self._shards)
+        logger.info(
+            "[FACE TOUCH] executor started: backend=%s workers=%d max_pending=%d",
+            self.backend,
+            self.workers,
+            self.max_pending,
+        )
+
+    def shutdown(self) -> None:
+        shards, self._shards = self._shards, []
+        for shard in shards:
+            shard.shutdown(wait=False, cancel_futures=True)
+        self._shard_load = []
+
+    def _select_shard(self, affinity: str | None) -> int:
+        # Process shards each keep their own session runtimes, so frames of
+        # one session must keep landing on the same process.
+        if affinity is not None and len(self._shards) > 1:
+            return hash(affinity) % len(self._shards)
+        # Least-loaded shard; ties resolve to the lowest index.
+        return min(range(len(self._shards)), key=self._shard_load.__getitem__)
+
+    def _release(self, shard_index: int, future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if shard_index < len(self._shard_load):
+                self._shard_load[shard_index] -= 1
+            if not future.cancelled():
+                self._completed += 1
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        affinity: str | None = None,
+    ) -> T:
+        """Run ``fn(*args)`` on the pool, raising FaceTouchBusyError when saturated.
+
+        ``affinity`` pins work with the same key (a session id) to one shard.
+        For the ``process`` backend ``fn`` and ``args`` must be picklable.
+        """
+        if self.backend == "inline":
+            return fn(*args)
+
+        self.start()
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise FaceTouchBusyError(
+                    "Face-touch service đang quá tải, vui lòng giảm tốc độ gửi frame.",
+                    retry_after_s=self.retry_after_s,
+                )
+            shard_index = self._select_shard(affinity)
+            self._in_flight += 1
+            self._shard_load[shard_index] += 1
+
+        try:
+            future = self._shards[shard_index].submit(functools.partial(fn, *args))
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+                self._shard_load[shard_index] -= 1
+            raise
+
+        # Release the slot when the worker actually finishes, not when the
+        # awaiting request is cancelled (e.g. client disconnect): the frame
+        # still occupies a worker until inference returns.
+        future.add_done_callback(functools.partial(self._release, shard_index))
+        return await asyncio.wrap_future(future)
+
+    async def run_on_every_worker(self, fn: Callable[..., T], *args: Any) -> List[T]:
+        """Run ``fn(*args)`` once on each worker thread / process (startup warm-up).
+
+        Bypasses admission control: it is meant to run before traffic arrives.
+        """
+        if self.backend == "inline":
+            return [fn(*args)]
+
+        self.start()
+        if self.backend == "thread":
+            barrier = threading.Barrier(self.workers, timeout=settings.FACE_TOUCH_WARMUP_TIMEOUT_S)
+            futures = [
+                self._shards[0].submit(_after_barrier, barrier, fn, *args)
+                for _ in range(self.workers)
+            ]
+        else:
+            futures = [shard.submit(functools.partial(fn, *args)) for shard in self._shards]
+        return list(await asyncio.gather(*(asyncio.wrap_future(future) for future in futures)))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "inFlight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+face_touch_executor = FaceTouchExecutor.from_settings()
@@ -0,0 +1,246 @@
+"""Per-client rate control for face-touch frames.
+
+The executor bounds global concurrency, but on its own one client posting
+faster than the ``sample_rate_fps`` it advertises (or a whole classroom at
+once) fills every slot and everyone else gets 503. Two guards sit in front
+of it:
+
+- a token bucket per session. Its rate is the advertised fps plus
+  ``FACE_TOUCH_RATE_SLACK``, capped at a fair share of
+  ``FACE_TOUCH_RATE_GLOBAL_FPS`` across the sessions active in the last
+  ``FACE_TOUCH_RATE_ACTIVE_WINDOW_S``. A frame over budget is rejected with
+  the fps the client should drop to. Session-less frames get one bucket
+  per client address (``shared=True``; behind the Next.js proxy the router
+  uses the forwarded student address) at the fair share of the global
+  budget rather than the advertised fps, as one address may still front
+  several clients;
+- a per-session gate: one frame per session runs at a time and at most one
+  waits behind it. A newer frame supersedes the waiting one, so the session
+  always analyzes its newest frame. Without it, a second frame of the same
+  session would hold a worker while it sat on the session lock. Shared
+  (session-less) keys skip the gate: their frames come from different
+  students and must not supersede each other.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Optional
+
+from app.config import settings
+from app.services.face_touch_executor import face_touch_executor
+
+
+class FaceTouchRateLimitedError(RuntimeError):
+    """Raised when a frame is over its session budget or superseded by a newer one."""
+
+    def __init__(
+        self,
+        message: str,
+        retry_after_s: float = 1.0,
+        suggested_fps: int = 1,
+        reason: str = "rate",
+    ):
+        self.retry_after_s = retry_after_s
+        self.suggested_fps = suggested_fps
+        self.reason = reason
+        super().__init__(message)
+
+
+@dataclass
+class _Bucket:
+    updated: float
+    last_seen: float
+    tokens: float = math.inf  # clamped to capacity by the first refill, which knows the rate
+    rate: float = 1.0
+    # Per-session gate (event-loop side only).
+    in_flight: bool = False
+    waiter: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class FaceTouchLimiter:
+    """Token bucket per client key with a fair share of a global fps budget."""
+
+    def __init__(
+        self,
+        global_fps: float,
+        enabled: bool = True,
+        slack: float = 0.25,
+        burst_s: float = 1.0,
+        active_window_s: float = 5.0,
+        max_keys: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.global_fps = global_fps
+        self.enabled = enabled
+        self.slack = max(slack, 0.0)
+        self.burst_s = max(burst_s, 0.1)
+        self.active_window_s = active_window_s
+        self.max_keys = max(max_keys, 1)
+        self._clock = clock
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+        self._lock = threading.Lock()
+        self.limited = 0
+        self.superseded = 0
+
+    @classmethod
+    def from_settings(cls, workers: int) -> "FaceTouchLimiter":
+        global_fps = settings.FACE_TOUCH_RATE_GLOBAL_FPS or workers * settings.FACE_TOUCH_RATE_FPS_PER_WORKER
+        return cls(
+            global_fps=global_fps,
+            enabled=settings.FACE_TOUCH_RATE_LIMIT_ENABLED,
+            slack=settings.FACE_TOUCH_RATE_SLACK,
+            burst_s=settings.FACE_TOUCH_RATE_BURST_S,
+            active_window_s=settings.FACE_TOUCH_RATE_ACTIVE_WINDOW_S,
+            max_keys=settings.FACE_TOUCH_RATE_MAX_KEYS,
+        )
+
+    def _active_sessions(self, now: float) -> int:
+        return sum(1 for bucket in self._buckets.values() if now - bucket.last_seen <= self.active_window_s)
+
+    def _fair_share(self, now: float) -> float:
+        return max(self.global_fps / max(self._active_sessions(now), 1), 1.0)
+
+    def _bucket(self, key: str, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            while len(self._buckets) >= self.max_keys:
+                # OrderedDict order is least → most recently used; never evict a busy gate.
+                idle_key = next((k for k, b in self._buckets.items() if not b.in_flight), None)
+                if idle_key is None:
+                    break
+                del self._buckets[idle_key]
+            bucket = self._buckets[key] = _Bucket(updated=now, last_seen=now)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _refill(self, bucket: _Bucket, advertised_fps: float, now: float, shared: bool = False) -> float:
+        bucket.last_seen = now
+        share = self._fair_share(now)
+        if shared:
+            rate = max(share, 1.0)
+        else:
+            rate = max(min(advertised_fps * (1.0 + self.slack), share), 1.0)
+        capacity = max(rate * self.burst_s, 1.0)
+        bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * bucket.rate)
+        bucket.updated = now
+        bucket.rate = rate
+        return share
+
+    def suggested_fps(self, advertised_fps: float, share: float) -> int:
+        return max(1, int(math.floor(min(advertised_fps, share))))
+
+    def try_acquire(self, key: str, advertised_fps: float, shared: bool = False) -> None:
+        """Take one token or raise ``FaceTouchRateLimitedError`` (nothing is consumed then)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            now = self._clock()
+            bucket = self._bucket(key, now)
+            share = self._refill(bucket, advertised_fps, now, shared)
+            if bucket.tokens >= 1.0:
+                bucket.tokens -= 1.0
+                return
+            self.limited += 1
+            retry_after_s = (1.0 - bucket.tokens) / bucket.rate
+            suggested = self.suggested_fps(advertised_fps, share)
+        raise FaceTouchRateLimitedError(
+            f"Client gửi frame nhanh hơn mức cho phép, vui lòng giảm xuống {suggested} fps.",
+            retry_after_s=retry_after_s,
+            suggested_fps=suggested,
+        )
+
+    def reserve(self, key: str, advertised_fps: float) -> tuple[float, int]:
+        """Consume one token, borrowing if needed; returns (seconds to wait, suggested fps).
+
+        Used by streams that can wait and then analyze whatever frame is newest.
+        """
+        if not self.enabled:
+            return 0.0, max(1, int(advertised_fps))
+        with self._lock:
+            now = self._clock()
+            bucket = self._bucket(key, now)
+            share = self._refill(bucket, advertised_fps, now)
+            bucket.tokens -= 1.0
+            wait_s = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+            if wait_s > 0:
+                self.limited += 1
+            return wait_s, self.suggested_fps(advertised_fps, share)
+
+    @asynccontextmanager
+    async def admit(self, key: str, advertised_fps: float, shared: bool = False) -> AsyncIterator[None]:
+        """Rate-check a frame, then hold the session gate while it runs.
+
+        Must be used from the event loop; raises ``FaceTouchRateLimitedError``
+        when over budget or when a newer frame of the same key superseded it.
+        The gate applies even with rate limiting disabled, but never to
+        ``shared`` keys.
+        """
+        self.try_acquire(key, advertised_fps, shared)
+        if shared:
+            yield
+            return
+        with self._lock:
+            bucket = self._bucket(key, self._clock())
+            waiter = None
+            if bucket.in_flight:
+                if bucket.waiter is not None and not bucket.waiter.done():
+                    bucket.waiter.set_exception(
+                        FaceTouchRateLimitedError(
+                            "Frame đã bị thay thế bởi frame mới hơn của cùng phiên.",
+                            retry_after_s=0.0,
+                            suggested_fps=self.suggested_fps(advertised_fps, self._fair_share(self._clock())),
+                            reason="superseded",
+                        )
+                    )
+                    self.superseded += 1
+                waiter = bucket.waiter = asyncio.get_running_loop().create_future()
+            else:
+                bucket.in_flight = True
+
+        if waiter is not None:
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Client went away while waiting: pass the turn on if we already got it.
+                with self._lock:
+                    if bucket.waiter is waiter:
+                        bucket.waiter = None
+                    handed_over = waiter.done() and not waiter.cancelled() and waiter.exception() is None
+                if handed_over:
+                    self._release(bucket)
+                raise
+        try:
+            yield
+        finally:
+            self._release(bucket)
+
+    def _release(self, bucket: _Bucket) -> None:
+        with self._lock:
+            waiter, bucket.waiter = bucket.waiter, None
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)  # gate stays in flight, now owned by the waiter
+            else:
+                bucket.in_flight = False
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            now = self._clock()
+            return {
+                "keys": len(self._buckets),
+                "activeSessions": self._active_sessions(now),
+                "globalFps": self.global_fps,
+                "fairShareFps": round(self._fair_share(now), 2),
+                "limited": self.limited,
+                "superseded": self.superseded,
+            }
+
+
+face_touch_limiter = FaceTouchLimiter.from_settings(face_touch_executor.workers)
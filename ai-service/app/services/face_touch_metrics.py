@@ -0,0 +1,109 @@
+"""Per-stage latency histograms for face-touch analysis.
+
+Stage timings are measured where the frame runs (worker thread or worker
+process) and travel back in ``FaceTouchAnalyzeResponse.debug.stages``; the
+router records them here, in the API process, so one scrape of
+``GET /api/face-touch/metrics`` covers every backend. Rendered in the
+Prometheus text exposition format without depending on prometheus_client.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+class FaceTouchMetrics:
+    """Thread-safe stage histograms plus face-path counters."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS) -> None:
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Histogram] = {}
+        self._face_paths: Dict[str, int] = {}
+        self._frames = 0
+
+    def observe(
+        self,
+        stages: Mapping[str, float] | None,
+        face_path: str | None,
+        latency_ms: float,
+    ) -> None:
+        with self._lock:
+            self._frames += 1
+            path = face_path or "none"
+            self._face_paths[path] = self._face_paths.get(path, 0) + 1
+            for name, value in {**(stages or {}), "total": latency_ms}.items():
+                histogram = self._stages.get(name)
+                if histogram is None:
+                    histogram = self._stages[name] = _Histogram(self.buckets_ms)
+                histogram.observe(value)
+
+        if latency_ms >= settings.FACE_TOUCH_SLOW_FRAME_LOG_MS:
+            logger.warning(
+                "[FACE TOUCH] slow frame %.0f ms path=%s stages=%s",
+                latency_ms,
+                face_path,
+                {name: round(value, 1) for name, value in (stages or {}).items()},
+            )
+
+    def render(self, gauges: Mapping[str, float] | None = None) -> str:
+        lines: List[str] = [
+            "# HELP face_touch_frames_total Frames analyzed by the face-touch pipeline.",
+            "# TYPE face_touch_frames_total counter",
+        ]
+        with self._lock:
+            lines.append(f"face_touch_frames_total {self._frames}")
+
+            lines.append("# HELP face_touch_face_path_total Frames by face landmark path.")
+            lines.append("# TYPE face_touch_face_path_total counter")
+            for path, count in sorted(self._face_paths.items()):
+                lines.append(f'face_touch_face_path_total{{path="{path}"}} {count}')
+
+            lines.append("# HELP face_touch_stage_ms Per-stage face-touch latency in milliseconds.")
+            lines.append("# TYPE face_touch_stage_ms histogram")
+            for name, histogram in sorted(self._stages.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'face_touch_stage_ms_bucket{{stage="{name}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'face_touch_stage_ms_bucket{{stage="{name}",le="+Inf"}} {histogram.count}')
+                lines.append(f'face_touch_stage_ms_sum{{stage="{name}"}} {histogram.total:.3f}')
+                lines.append(f'face_touch_stage_ms_count{{stage="{name}"}} {histogram.count}')
+
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._face_paths.clear()
+            self._frames = 0
+
+
+face_touch_metrics = FaceTouchMetrics()
@@ -0,0 +1,512 @@
+"""ONNX Runtime CPU backend for the face-touch landmark providers.
+
+``OnnxFaceTouchRuntime`` is a drop-in for ``_MediaPipeRuntime``: the same
+graph accessors (``face_mesh()``, ``hands()``, ``face_detection()`` ...)
+return objects whose ``process(rgb)`` yields MediaPipe-shaped results, so
+face extraction, hand ROI, keyframing and scoring run unchanged on either
+backend (``FACE_TOUCH_BACKEND``).
+
+It runs the MediaPipe models exported to ONNX (BlazeFace full range, FaceMesh,
+palm detection, hand landmark; file names in settings, provenance and export
+steps in ``models/face_touch/README.md``) with the same
+two-stage scheme as the legacy graphs: a detector proposes rotated ROIs, the
+landmark model runs on each crop, and in video mode the next frame's ROI is
+derived from the landmarks so the detector only runs while fewer than the
+maximum number of faces / hands are tracked.
+
+``InferenceSession.run`` is thread-safe, so each model is loaded once per
+process and shared by every runtime; a runtime only holds per-stream
+tracking ROIs, which keeps per-session runtimes cheap.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Sequence, Tuple, TypeVar, cast
+
+import numpy as np
+
+from app.config import settings
+
+try:
+    import cv2
+except ImportError:  # pragma: no cover - handled by runtime checks
+    cv2 = None
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - handled by runtime checks
+    ort = None
+
+
+@dataclass(frozen=True)
+class _DetectorSpec:
+    setting: str
+    strides: Tuple[int, ...]
+    interpolated_anchors: bool
+    keypoints: int
+    value_range: Tuple[float, float]
+
+
+@dataclass(frozen=True)
+class _LandmarkSpec:
+    setting: str
+    landmarks: int
+    value_range: Tuple[float, float]
+    presence_logit: bool
+
+
+# Anchor layouts mirror the SsdAnchorsCalculator options of the legacy graphs.
+_FACE_DETECTOR = _DetectorSpec("FACE_TOUCH_ONNX_FACE_DETECTOR", (4,), False, 6, (-1.0, 1.0))
+_PALM_DETECTOR = _DetectorSpec("FACE_TOUCH_ONNX_PALM_DETECTOR", (8, 16, 16, 16), True, 7, (0.0, 1.0))
+_FACE_LANDMARK = _LandmarkSpec("FACE_TOUCH_ONNX_FACE_LANDMARK", 468, (0.0, 1.0), True)
+_HAND_LANDMARK = _LandmarkSpec("FACE_TOUCH_ONNX_HAND_LANDMARK", 21, (0.0, 1.0), False)
+_MODEL_SETTINGS = (_FACE_DETECTOR.setting, _PALM_DETECTOR.setting, _FACE_LANDMARK.setting, _HAND_LANDMARK.setting)
+
+
+def _model_path(setting: str) -> str:
+    return os.path.join(settings.FACE_TOUCH_ONNX_MODEL_DIR, getattr(settings, setting))
+
+
+def onnx_backend_error() -> str | None:
+    """Why the ONNX backend cannot run here, or None when it can."""
+    if ort is None:
+        return "onnxruntime chưa được cài đặt cho FACE_TOUCH_BACKEND=onnx."
+    missing = [path for path in map(_model_path, _MODEL_SETTINGS) if not os.path.isfile(path)]
+    if missing:
+        return f"Thiếu model ONNX cho face-touch: {', '.join(missing)}"
+    return None
+
+
+class _OnnxModel:
+    """One shared InferenceSession plus its input layout."""
+
+    def __init__(self, path: str) -> None:
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(settings.FACE_TOUCH_ONNX_THREADS, 1)
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        shape = model_input.shape
+        self.channels_first = shape[1] == 3
+        self.size = int(shape[2] if self.channels_first else shape[1])
+
+    def run(self, image: np.ndarray, value_range: Tuple[float, float]) -> List[np.ndarray]:
+        low, high = value_range
+        tensor = image.astype(np.float32) * np.float32((high - low) / 255.0) + np.float32(low)
+        if self.channels_first:
+            tensor = tensor.transpose(2, 0, 1)
+        return self.session.run(None, {self.input_name: tensor[None]})
+
+
+_models: Dict[str, _OnnxModel] = {}
+_models_lock = threading.Lock()
+
+
+def _model(setting: str) -> _OnnxModel:
+    path = _model_path(setting)
+    with _models_lock:
+        model = _models.get(path)
+        if model is None:
+            model = _models[path] = _OnnxModel(path)
+        return model
+
+
+# --- Detector post-processing (pure NumPy) ---
+
+
+def ssd_anchors(input_size: int, strides: Sequence[int], interpolated: bool) -> np.ndarray:
+    """(N, 2) normalized anchor centers, as SsdAnchorsCalculator with fixed_anchor_size.
+
+    Consecutive layers with the same stride share one feature map; each layer
+    adds one anchor per cell, two with an interpolated scale.
+    """
+    centers = []
+    layer = 0
+    while layer < len(strides):
+        stride = strides[layer]
+        layers = 0
+        while layer < len(strides) and strides[layer] == stride:
+            layers += 1
+            layer += 1
+        grid = math.ceil(input_size / stride)
+        ys, xs = np.mgrid[0:grid, 0:grid]
+        cells = np.stack(((xs + 0.5) / grid, (ys + 0.5) / grid), axis=-1).reshape(-1, 2)
+        centers.append(np.repeat(cells, layers * (2 if interpolated else 1), axis=0))
+    return np.concatenate(centers)
+
+
+def decode_detections(
+    raw_boxes: np.ndarray,
+    raw_scores: np.ndarray,
+    anchors: np.ndarray,
+    input_size: int,
+    keypoints: int,
+    min_score: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Scores (K,), boxes (K, 4) as normalized xmin, ymin, w, h and keypoints (K, P, 2)."""
+    scores = 1.0 / (1.0 + np.exp(-np.clip(raw_scores.reshape(-1), -100.0, 100.0)))
+    keep = scores >= min_score
+    raw_boxes = raw_boxes.reshape(len(anchors), -1)[keep]
+    anchors = anchors[keep]
+    center = raw_boxes[:, 0:2] / input_size + anchors
+    size = raw_boxes[:, 2:4] / input_size
+    boxes = np.concatenate((center - size / 2, size), axis=1)
+    points = raw_boxes[:, 4 : 4 + 2 * keypoints].reshape(-1, keypoints, 2) / input_size + anchors[:, None, :]
+    return scores[keep], boxes, points
+
+
+def _iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[0] + box[2], boxes[:, 0] + boxes[:, 2])
+    y2 = np.minimum(box[1] + box[3], boxes[:, 1] + boxes[:, 3])
+    intersection = np.maximum(x2 - x1, 0.0) * np.maximum(y2 - y1, 0.0)
+    union = box[2] * box[3] + boxes[:, 2] * boxes[:, 3] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+def weighted_nms(
+    scores: np.ndarray,
+    boxes: np.ndarray,
+    points: np.ndarray,
+    iou_threshold: float = 0.3,
+) -> List[Tuple[float, np.ndarray, np.ndarray]]:
+    """MediaPipe-style weighted NMS: overlapping candidates are score-averaged."""
+    order = np.argsort(-scores)
+    results = []
+    while len(order):
+        overlaps = _iou(boxes[order[0]], boxes[order]) > iou_threshold
+        cluster = order[overlaps]
+        weights = scores[cluster][:, None]
+        total = float(weights.sum())
+        results.append(
+            (
+                float(scores[order[0]]),
+                (boxes[cluster] * weights).sum(axis=0) / total,
+                (points[cluster] * weights[:, :, None]).sum(axis=0) / total,
+            )
+        )
+        order = order[~overlaps]
+    return results
+
+
+def letterbox(rgb: np.ndarray, size: int) -> Tuple[np.ndarray, float, float]:
+    """Square input keeping aspect ratio; returns image and normalized x / y padding."""
+    height, width = rgb.shape[:2]
+    scale = size / max(height, width)
+    resized_w, resized_h = max(round(width * scale), 1), max(round(height * scale), 1)
+    resized = cv2.resize(rgb, (resized_w, resized_h), interpolation=cv2.INTER_AREA)
+    pad_x, pad_y = (size - resized_w) // 2, (size - resized_h) // 2
+    canvas = np.zeros((size, size, 3), dtype=np.uint8)
+    canvas[pad_y : pad_y + resized_h, pad_x : pad_x + resized_w] = resized
+    return canvas, pad_x / size, pad_y / size
+
+
+def unletterbox(points: np.ndarray, pad_x: float, pad_y: float) -> np.ndarray:
+    """Map normalized (..., 2) coordinates of the square input back to the frame."""
+    return (points - (pad_x, pad_y)) / (1.0 - 2 * pad_x, 1.0 - 2 * pad_y)
+
+
+# --- Rotated ROIs ---
+
+
+@dataclass
+class _Roi:
+    """Square crop in frame pixels rotated by ``angle`` radians around its center."""
+
+    center_x: float
+    center_y: float
+    size: float
+    angle: float
+
+    def matrix(self, output_size: int) -> np.ndarray:
+        """2x3 affine from crop pixels to frame pixels."""
+        cos, sin = math.cos(self.angle), math.sin(self.angle)
+        unit = self.size / output_size
+        half = output_size / 2
+        return np.array(
+            [
+                [cos * unit, -sin * unit, self.center_x - (cos * half - sin * half) * unit],
+                [sin * unit, cos * unit, self.center_y - (sin * half + cos * half) * unit],
+            ]
+        )
+
+    def box(self) -> np.ndarray:
+        half = self.size / 2
+        return np.array([self.center_x - half, self.center_y - half, self.size, self.size])
+
+
+def _rotation(start: np.ndarray, end: np.ndarray, target: float) -> float:
+    angle = target - math.atan2(-(end[1] - start[1]), end[0] - start[0])
+    return angle - 2 * math.pi * math.floor((angle + math.pi) / (2 * math.pi))
+
+
+def roi_from_points(points: np.ndarray, angle: float, scale: float, shift_y: float = 0.0) -> _Roi:
+    """Square ROI around ``points`` (frame pixels) in the frame rotated by ``angle``."""
+    cos, sin = math.cos(angle), math.sin(angle)
+    # Rotate into the ROI frame, take the box there, then rotate its center back.
+    local_x = points[:, 0] * cos + points[:, 1] * sin
+    local_y = -points[:, 0] * sin + points[:, 1] * cos
+    min_x, max_x = float(local_x.min()), float(local_x.max())
+    min_y, max_y = float(local_y.min()), float(local_y.max())
+    width, height = max_x - min_x, max_y - min_y
+    center_local_x = (min_x + max_x) / 2
+    center_local_y = (min_y + max_y) / 2 + shift_y * height
+    return _Roi(
+        center_x=center_local_x * cos - center_local_y * sin,
+        center_y=center_local_x * sin + center_local_y * cos,
+        size=max(width, height) * scale,
+        angle=angle,
+    )
+
+
+def _crop(rgb: np.ndarray, roi: _Roi, output_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    matrix = roi.matrix(output_size)
+    crop = cv2.warpAffine(
+        rgb,
+        matrix,
+        (output_size, output_size),
+        flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+        borderMode=cv2.BORDER_CONSTANT,
+    )
+    return crop, matrix
+
+
+def _run_detector(spec: _DetectorSpec, rgb: np.ndarray, min_score: float):
+    model = _model(spec.setting)
+    anchors = _anchor_cache(spec, model.size)
+    image, pad_x, pad_y = letterbox(rgb, model.size)
+    outputs = model.run(image, spec.value_range)
+    raw_scores = next(output for output in outputs if output.shape[-1] == 1)
+    raw_boxes = next(output for output in outputs if output.shape[-1] != 1)
+    scores, boxes, points = decode_detections(raw_boxes, raw_scores, anchors, model.size, spec.keypoints, min_score)
+    height, width = rgb.shape[:2]
+    detections = []
+    for score, box, keypoints in weighted_nms(scores, boxes, points):
+        corners = unletterbox(np.array([box[:2], box[:2] + box[2:]]), pad_x, pad_y)
+        detections.append(
+            (
+                score,
+                np.array([*corners[0], *(corners[1] - corners[0])]),
+                unletterbox(keypoints, pad_x, pad_y) * (width, height),
+            )
+        )
+    return detections
+
+
+_anchors: Dict[Tuple[_DetectorSpec, int], np.ndarray] = {}
+
+
+def _anchor_cache(spec: _DetectorSpec, input_size: int) -> np.ndarray:
+    anchors = _anchors.get((spec, input_size))
+    if anchors is None:
+        anchors = _anchors[(spec, input_size)] = ssd_anchors(input_size, spec.strides, spec.interpolated_anchors)
+    return anchors
+
+
+def _run_landmarks(spec: _LandmarkSpec, rgb: np.ndarray, roi: _Roi) -> Tuple[np.ndarray, float]:
+    """Landmarks in frame pixels (z scaled like x) and the presence score."""
+    model = _model(spec.setting)
+    crop, matrix = _crop(rgb, roi, model.size)
+    outputs = [output.reshape(-1) for output in model.run(crop, spec.value_range)]
+    raw = next(output for output in outputs if output.size >= spec.landmarks * 3)
+    presence = float(next(output for output in outputs if output.size == 1)[0])
+    if spec.presence_logit:
+        presence = 1.0 / (1.0 + math.exp(-max(min(presence, 100.0), -100.0)))
+
+    local = raw[: spec.landmarks * 3].reshape(-1, 3).astype(np.float64)
+    points = np.empty_like(local)
+    points[:, :2] = local[:, :2] @ matrix[:, :2].T + matrix[:, 2]
+    points[:, 2] = local[:, 2] * roi.size / model.size
+    return points, presence
+
+
+def _normalized(points: np.ndarray, width: int, height: int) -> np.ndarray:
+    return points / (width, height, width)
+
+
+# --- MediaPipe-shaped graphs ---
+
+
+class _OnnxFaceMesh:
+    """FaceMesh: eye-aligned ROI from BlazeFace (1.5x), then tracked from landmarks."""
+
+    def __init__(self, max_faces: int, static: bool, min_detection: float, min_tracking: float) -> None:
+        self.max_faces = max_faces
+        self.static = static
+        self.min_detection = min_detection
+        self.min_tracking = min_tracking
+        self._rois: List[_Roi] = []
+
+    def process(self, rgb: np.ndarray):
+        height, width = rgb.shape[:2]
+        rois = [] if self.static else list(self._rois)
+        tracked = len(rois)
+        if tracked < self.max_faces:
+            for _, box, keypoints in _run_detector(_FACE_DETECTOR, rgb, self.min_detection):
+                if len(rois) >= self.max_faces:
+                    break
+                pixel_box = box * (width, height, width, height)
+                if rois and float(_iou(pixel_box, np.array([roi.box() for roi in rois])).max()) > 0.5:
+                    continue
+                corners = np.array([pixel_box[:2], pixel_box[:2] + pixel_box[2:]])
+                # Keypoints 0 / 1: right / left eye → level the eyes.
+                rois.append(roi_from_points(corners, _rotation(keypoints[0], keypoints[1], 0.0), 1.5))
+
+        faces = []
+        next_rois = []
+        for index, roi in enumerate(rois):
+            points, presence = _run_landmarks(_FACE_LANDMARK, rgb, roi)
+            threshold = self.min_tracking if index < tracked else self.min_detection
+            if presence < threshold:
+                continue
+            faces.append(SimpleNamespace(landmark=_normalized(points, width, height)))
+            # Landmarks 33 / 263: outer eye corners.
+            next_rois.append(roi_from_points(points[:, :2], _rotation(points[33], points[263], 0.0), 1.5))
+        self._rois = [] if self.static else next_rois
+        return SimpleNamespace(multi_face_landmarks=faces or None)
+
+    def close(self) -> None:
+        self._rois = []
+
+
+class _OnnxHands:
+    """Hands: palm ROI (2.6x, shifted toward the fingers), then tracked from landmarks."""
+
+    def __init__(self, max_hands: int, min_detection: float, min_tracking: float) -> None:
+        self.max_hands = max_hands
+        self.min_detection = min_detection
+        self.min_tracking = min_tracking
+        self._rois: List[_Roi] = []
+
+    def process(self, rgb: np.ndarray):
+        height, width = rgb.shape[:2]
+        rois = list(self._rois)
+        tracked = len(rois)
+        if tracked < self.max_hands:
+            for _, box, keypoints in _run_detector(_PALM_DETECTOR, rgb, self.min_detection):
+                if len(rois) >= self.max_hands:
+                    break
+                pixel_box = box * (width, height, width, height)
+                if rois and float(_iou(pixel_box, np.array([roi.box() for roi in rois])).max()) > 0.5:
+                    continue
+                corners = np.array([pixel_box[:2], pixel_box[:2] + pixel_box[2:]])
+                # Keypoints 0 / 2: wrist / middle-finger MCP → fingers up.
+                angle = _rotation(keypoints[0], keypoints[2], math.pi / 2)
+                rois.append(roi_from_points(corners, angle, 2.6, shift_y=-0.5))
+
+        hands = []
+        next_rois = []
+        for index, roi in enumerate(rois):
+            points, presence = _run_landmarks(_HAND_LANDMARK, rgb, roi)
+            threshold = self.min_tracking if index < tracked else self.min_detection
+            if presence < threshold:
+                continue
+            hands.append(SimpleNamespace(landmark=_normalized(points, width, height)))
+            knuckles = (points[5] + points[13]) / 2
+            angle = _rotation(points[0], (knuckles + points[9]) / 2, math.pi / 2)
+            next_rois.append(roi_from_points(points[:, :2], angle, 2.0, shift_y=-0.1))
+        self._rois = next_rois
+        return SimpleNamespace(multi_hand_landmarks=hands or None)
+
+    def close(self) -> None:
+        self._rois = []
+
+
+class _OnnxFaceDetection:
+    def __init__(self, min_detection: float) -> None:
+        self.min_detection = min_detection
+
+    def process(self, rgb: np.ndarray):
+        detections = [
+            SimpleNamespace(
+                score=[score],
+                location_data=SimpleNamespace(
+                    relative_bounding_box=SimpleNamespace(
+                        xmin=float(box[0]),
+                        ymin=float(box[1]),
+                        width=float(box[2]),
+                        height=float(box[3]),
+                    )
+                ),
+            )
+            for score, box, _ in _run_detector(_FACE_DETECTOR, rgb, self.min_detection)
+        ]
+        return SimpleNamespace(detections=detections or None)
+
+    def close(self) -> None:
+        pass
+
+
+_Graph = TypeVar("_Graph", _OnnxFaceMesh, _OnnxHands, _OnnxFaceDetection)
+
+
+class OnnxFaceTouchRuntime:
+    """``_MediaPipeRuntime`` interface on ONNX Runtime; see the module docstring."""
+
+    def __init__(self) -> None:
+        self._graphs: Dict[str, _OnnxFaceMesh | _OnnxHands | _OnnxFaceDetection] = {}
+
+    def _graph(self, name: str, factory: Callable[[], _Graph]) -> _Graph:
+        graph = self._graphs.get(name)
+        if graph is None:
+            graph = self._graphs[name] = factory()
+        # Each name is only ever built by one factory, so it maps to one graph type.
+        return cast(_Graph, graph)
+
+    def face_mesh(self) -> _OnnxFaceMesh:
+        return self._graph("face_mesh", lambda: self._face_mesh(1, static=False))
+
+    def face_mesh_multi(self) -> _OnnxFaceMesh:
+        return self._graph(
+            "face_mesh_multi",
+            lambda: self._face_mesh(max(settings.FACE_TOUCH_MULTI_FACE_MAX, 1), static=False),
+        )
+
+    def face_mesh_static(self) -> _OnnxFaceMesh:
+        return self._graph("face_mesh_static", lambda: self._face_mesh(1, static=True))
+
+    def hands(self) -> _OnnxHands:
+        return self._graph("hands", lambda: self._hands(2))
+
+    def hands_roi(self) -> _OnnxHands:
+        return self._graph("hands_roi", lambda: self._hands(2))
+
+    def hands_multi(self) -> _OnnxHands:
+        return self._graph("hands_multi", lambda: self._hands(2 * max(settings.FACE_TOUCH_MULTI_FACE_MAX, 1)))
+
+    def face_detection(self) -> _OnnxFaceDetection:
+        return self._graph(
+            "face_detection",
+            lambda: _OnnxFaceDetection(max(settings.FACE_TOUCH_FACE_DETECT_CONFIDENCE - 0.15, 0.35)),
+        )
+
+    @staticmethod
+    def _face_mesh(max_faces: int, static: bool) -> _OnnxFaceMesh:
+        return _OnnxFaceMesh(
+            max_faces,
+            static,
+            settings.FACE_TOUCH_FACE_DETECT_CONFIDENCE,
+            settings.FACE_TOUCH_FACE_TRACK_CONFIDENCE,
+        )
+
+    @staticmethod
+    def _hands(max_hands: int) -> _OnnxHands:
+        return _OnnxHands(
+            max_hands,
+            settings.FACE_TOUCH_HAND_DETECT_CONFIDENCE,
+            settings.FACE_TOUCH_HAND_TRACK_CONFIDENCE,
+        )
+
+    def reset(self) -> None:
+        for graph in self._graphs.values():
+            graph.close()
+        self._graphs.clear()
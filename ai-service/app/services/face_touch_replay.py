@@ -0,0 +1,397 @@
+"""Landmark capture and scoring-only replay for face-touch threshold tuning.
+
+Capture (``FACE_TOUCH_CAPTURE_DIR``): every session writes one ``.ftcap``
+file with a fixed-size record per single-face frame: the session clock, the
+processed frame size, the face points / box and up to two hands, all in
+processed-frame pixels — exactly what ``_score_face_touch`` consumed. The
+file is a small header followed by packed ``CAPTURE_DTYPE`` records, so
+``open_capture`` memory-maps millions of frames without loading them.
+
+Replay runs the real scoring code (``_score_face_touch``) and the real
+``FaceTouchEventTracker`` over captures under temporary settings overrides:
+
+- frames without a face or without hands score 0 under any settings and are
+  skipped; the rest is split into chunks scored on a process pool, each
+  worker memory-mapping the capture itself;
+- the touch / near thresholds and the ``FACE_TOUCH_EVENT_*`` settings only
+  act after scoring, so ``sweep`` scores each capture once per combination of
+  the other settings and replays only the event tracker for the rest;
+- labels come from a ``<capture>.labels.json`` sidecar listing touch
+  intervals (``{"touches": [[start_ms, end_ms], ...]}``) on the same clock,
+  and are scored as frame-level and event-level precision / recall.
+
+Settings that act before scoring (detection, ROI, keyframing) cannot be
+tuned this way: their effect is baked into the captured landmarks.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.face_touch_events import FaceTouchEventTracker
+
+CAPTURE_SUFFIX = ".ftcap"
+_MAGIC = b"FTCAP001"
+_HEADER_SIZE = 512
+MAX_FACE_POINTS = 478
+MAX_HANDS = 2
+HAND_POINTS = 21
+
+CAPTURE_DTYPE = np.dtype(
+    [
+        ("timestamp_ms", "<f8"),
+        ("frame_width", "<u2"),
+        ("frame_height", "<u2"),
+        ("face_points", "<u2"),  # valid rows of ``face``; 0 = no face in this frame
+        ("hands", "u1"),
+        ("face_box", "<f4", (4,)),
+        ("face", "<f4", (MAX_FACE_POINTS, 3)),
+        ("hand", "<f4", (MAX_HANDS, HAND_POINTS, 3)),
+    ],
+    align=True,
+)
+
+# Read by the event tracker / state classification only, never by the geometry scoring.
+POST_SCORING_SETTINGS = frozenset(
+    {
+        "FACE_TOUCH_TOUCH_THRESHOLD",
+        "FACE_TOUCH_NEAR_THRESHOLD",
+        "FACE_TOUCH_EVENT_EMA_TAU_MS",
+        "FACE_TOUCH_EVENT_EXIT_RATIO",
+        "FACE_TOUCH_EVENT_MIN_DURATION_MS",
+    }
+)
+
+_STATE_CODES = {"safe": 0, "near_face": 1, "touching_face": 2}
+
+
+class FaceTouchCaptureWriter:
+    """Appends one ``CAPTURE_DTYPE`` record per frame to a capture file.
+
+    Not thread-safe on its own; live sessions only write under their lock.
+    """
+
+    def __init__(self, path: str, metadata: Mapping[str, object] | None = None) -> None:
+        self.path = path
+        self.frames = 0
+        self._record = np.zeros(1, dtype=CAPTURE_DTYPE)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        if new_file:
+            header = json.dumps(
+                {
+                    "version": 1,
+                    "dtype": CAPTURE_DTYPE.descr,
+                    "createdAt": time.time(),
+                    **(metadata or {}),
+                }
+            ).encode("utf-8")
+            if len(_MAGIC) + 4 + len(header) > _HEADER_SIZE:
+                raise ValueError("Capture metadata quá lớn cho header.")
+            self._file.write(
+                (_MAGIC + len(header).to_bytes(4, "little") + header).ljust(_HEADER_SIZE, b"\0")
+            )
+
+    def append(
+        self,
+        timestamp_ms: float,
+        frame_width: int,
+        frame_height: int,
+        face: Tuple[np.ndarray, object] | None,
+        hand_point_sets: Sequence[np.ndarray],
+    ) -> None:
+        record = self._record[0]
+        record["timestamp_ms"] = timestamp_ms
+        record["frame_width"] = frame_width
+        record["frame_height"] = frame_height
+        record["face_points"] = 0
+        record["face"] = 0.0
+        if face is not None:
+            face_points, face_box = face
+            count = min(len(face_points), MAX_FACE_POINTS)
+            record["face_points"] = count
+            record["face"][:count] = face_points[:count]
+            record["face_box"] = (face_box.x, face_box.y, face_box.width, face_box.height)
+        hands = [points for points in hand_point_sets[:MAX_HANDS] if len(points) == HAND_POINTS]
+        record["hands"] = len(hands)
+        record["hand"] = 0.0
+        for index, points in enumerate(hands):
+            record["hand"][index] = points
+        self._file.write(self._record.tobytes())
+        self.frames += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _safe_name(session_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)[:80] or "session"
+
+
+def open_session_capture(session_id: str) -> FaceTouchCaptureWriter | None:
+    """Capture writer for a new tracking session, or None when capture is off."""
+    directory = settings.FACE_TOUCH_CAPTURE_DIR
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{_safe_name(session_id)}-{int(time.time() * 1000)}{CAPTURE_SUFFIX}")
+    return FaceTouchCaptureWriter(
+        path,
+        {"sessionId": session_id, "processWidth": settings.FACE_TOUCH_PROCESS_WIDTH},
+    )
+
+
+def read_capture_metadata(path: str) -> Dict[str, object]:
+    with open(path, "rb") as handle:
+        header = handle.read(_HEADER_SIZE)
+    if len(header) < _HEADER_SIZE or not header.startswith(_MAGIC):
+        raise ValueError(f"{path} không phải file capture face-touch.")
+    length = int.from_bytes(header[len(_MAGIC) : len(_MAGIC) + 4], "little")
+    return json.loads(header[len(_MAGIC) + 4 : len(_MAGIC) + 4 + length])
+
+
+def open_capture(path: str) -> np.ndarray:
+    """Memory-mapped records of a capture (a trailing partial record is ignored)."""
+    read_capture_metadata(path)
+    frames = (os.path.getsize(path) - _HEADER_SIZE) // CAPTURE_DTYPE.itemsize
+    if frames <= 0:
+        return np.zeros(0, dtype=CAPTURE_DTYPE)
+    return np.memmap(path, dtype=CAPTURE_DTYPE, mode="r", offset=_HEADER_SIZE, shape=(frames,))
+
+
+def load_labels(path: str) -> np.ndarray | None:
+    """(K, 2) labelled touch intervals from the capture's sidecar, or None."""
+    sidecar = path[: -len(CAPTURE_SUFFIX)] if path.endswith(CAPTURE_SUFFIX) else path
+    sidecar += ".labels.json"
+    if not os.path.exists(sidecar):
+        return None
+    with open(sidecar, encoding="utf-8") as handle:
+        touches = json.load(handle).get("touches", [])
+    return np.asarray(touches, dtype=np.float64).reshape(-1, 2)
+
+
+# --- Replay ---
+
+_override_lock = threading.RLock()
+
+
+@contextmanager
+def settings_override(overrides: Mapping[str, object]) -> Iterator[None]:
+    """Temporarily set ``settings`` attributes (process-wide; replay only)."""
+    unknown = [name for name in overrides if not hasattr(settings, name)]
+    if unknown:
+        raise ValueError(f"Setting không tồn tại: {', '.join(unknown)}")
+    with _override_lock:
+        saved = {name: getattr(settings, name) for name in overrides}
+        try:
+            for name, value in overrides.items():
+                setattr(settings, name, value)
+            yield
+        finally:
+            for name, value in saved.items():
+                setattr(settings, name, value)
+
+
+def _score_records(records: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    from app.services.face_touch_service import Box, _score_face_touch
+
+    touch = np.zeros(len(rows), dtype=np.float32)
+    near = np.zeros(len(rows), dtype=np.float32)
+    for position, row in enumerate(rows):
+        record = records[row]
+        count = int(record["face_points"])
+        x, y, width, height = record["face_box"].tolist()
+        hands = record["hand"][: int(record["hands"])].astype(np.float64)
+        scores = _score_face_touch(
+            record["face"][:count].astype(np.float64),
+            Box(x=x, y=y, width=width, height=height),
+            list(hands),
+            int(record["frame_width"]),
+            int(record["frame_height"]),
+        )
+        touch[position] = scores.touch_score
+        near[position] = scores.near_score
+    return touch, near
+
+
+def _score_chunk(
+    path: str,
+    rows: np.ndarray,
+    overrides: Mapping[str, object],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Process-pool entry point: memory-maps the capture on the worker side."""
+    with settings_override(overrides):
+        return _score_records(open_capture(path), rows)
+
+
+def scorable_rows(records: np.ndarray) -> np.ndarray:
+    """Frames with a face and at least one hand; all others score 0 under any settings."""
+    return np.flatnonzero((records["face_points"] > 0) & (records["hands"] > 0))
+
+
+def score_capture(
+    path: str,
+    overrides: Mapping[str, object] | None = None,
+    pool: ProcessPoolExecutor | None = None,
+    chunk_frames: int = 2048,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Raw per-frame (touch, near) scores of a capture under ``overrides``."""
+    overrides = dict(overrides or {})
+    records = open_capture(path)
+    touch = np.zeros(len(records), dtype=np.float32)
+    near = np.zeros(len(records), dtype=np.float32)
+    rows = scorable_rows(records)
+    chunks = [rows[start : start + chunk_frames] for start in range(0, len(rows), chunk_frames)]
+    if pool is None:
+        with settings_override(overrides):
+            results = [_score_records(records, chunk) for chunk in chunks]
+    else:
+        results = list(pool.map(_score_chunk, itertools.repeat(path), chunks, itertools.repeat(overrides)))
+    for chunk, (chunk_touch, chunk_near) in zip(chunks, results):
+        touch[chunk] = chunk_touch
+        near[chunk] = chunk_near
+    return touch, near
+
+
+@dataclass
+class ReplayResult:
+    states: np.ndarray  # per-frame debounced state codes (0 safe, 1 near, 2 touching)
+    events: np.ndarray  # (E, 2) confirmed alert intervals in ms
+
+
+def replay_events(
+    timestamps_ms: np.ndarray,
+    touch: np.ndarray,
+    near: np.ndarray,
+    overrides: Mapping[str, object] | None = None,
+) -> ReplayResult:
+    """Run the session event tracker over raw scores, as a live session would."""
+    with settings_override(overrides or {}):
+        tracker = FaceTouchEventTracker()
+        states = np.zeros(len(touch), dtype=np.int8)
+        events: List[Tuple[int, int]] = []
+        for index, (timestamp_ms, touch_score, near_score) in enumerate(
+            zip(timestamps_ms.tolist(), touch.tolist(), near.tolist())
+        ):
+            persistence = tracker.update(timestamp_ms, touch_score, near_score)
+            states[index] = _STATE_CODES[persistence.state]
+            events.extend((event.startMs, event.endMs) for event in persistence.events)
+        events.extend((event.startMs, event.endMs) for event in tracker.flush())
+    return ReplayResult(states=states, events=np.asarray(events, dtype=np.float64).reshape(-1, 2))
+
+
+def _overlaps(intervals: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Per interval of ``intervals``: does it overlap any of ``others``."""
+    if not len(intervals) or not len(others):
+        return np.zeros(len(intervals), dtype=bool)
+    return (
+        (intervals[:, None, 0] <= others[None, :, 1]) & (intervals[:, None, 1] >= others[None, :, 0])
+    ).any(axis=1)
+
+
+def _ratio(numerator: float, denominator: float) -> float | None:
+    return numerator / denominator if denominator else None
+
+
+def _with_ratios(counts: Dict[str, int]) -> Dict[str, object]:
+    return {
+        **counts,
+        "frame_precision": _ratio(counts["frame_hits"], counts["frames_predicted"]),
+        "frame_recall": _ratio(counts["frame_hits"], counts["frames_labelled"]),
+        "event_precision": _ratio(counts["event_hits"], counts["events"]),
+        "event_recall": _ratio(counts["touch_hits"], counts["labelled_touches"]),
+    }
+
+
+def evaluate(timestamps_ms: np.ndarray, result: ReplayResult, labels: np.ndarray) -> Dict[str, object]:
+    """Frame-level and event-level precision / recall against labelled touches.
+
+    A frame is positive when its timestamp falls in a labelled interval; an
+    alert event is a hit when it overlaps one, and a labelled touch is found
+    when any alert overlaps it.
+    """
+    truth = _overlaps(np.column_stack((timestamps_ms, timestamps_ms)), labels)
+    predicted = result.states == _STATE_CODES["touching_face"]
+    return _with_ratios(
+        {
+            "frames": len(timestamps_ms),
+            "frames_predicted": int(predicted.sum()),
+            "frames_labelled": int(truth.sum()),
+            "frame_hits": int((truth & predicted).sum()),
+            "events": len(result.events),
+            "event_hits": int(_overlaps(result.events, labels).sum()),
+            "labelled_touches": len(labels),
+            "touch_hits": int(_overlaps(labels, result.events).sum()),
+        }
+    )
+
+
+_COUNT_KEYS = (
+    "frames",
+    "frames_predicted",
+    "frames_labelled",
+    "frame_hits",
+    "events",
+    "event_hits",
+    "labelled_touches",
+    "touch_hits",
+)
+
+
+def _merge_metrics(rows: Sequence[Dict[str, object]]) -> Dict[str, object]:
+    """Micro-averaged metrics over several captures."""
+    return _with_ratios({key: sum(int(row[key]) for row in rows) for key in _COUNT_KEYS})
+
+
+def sweep(
+    paths: Sequence[str],
+    grid: Mapping[str, Sequence[object]],
+    workers: int = 1,
+) -> List[Dict[str, object]]:
+    """Metrics for every combination of ``grid`` over labelled captures.
+
+    Captures are scored once per combination of the scoring settings in
+    ``grid``; post-scoring settings (``POST_SCORING_SETTINGS``) only replay
+    the event tracker on those cached scores.
+    """
+    labelled = [(path, load_labels(path)) for path in paths]
+    labelled = [(path, labels) for path, labels in labelled if labels is not None]
+    if not labelled:
+        raise ValueError("Không có capture nào có file .labels.json.")
+    timestamps = {path: np.asarray(open_capture(path)["timestamp_ms"]) for path, _ in labelled}
+
+    scoring_names = [name for name in grid if name not in POST_SCORING_SETTINGS]
+    post_names = [name for name in grid if name in POST_SCORING_SETTINGS]
+    rows: List[Dict[str, object]] = []
+    pool = None
+    if workers > 1:
+        # spawn, like face_touch_executor: workers only import the scoring code.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        for scoring_values in itertools.product(*(grid[name] for name in scoring_names)):
+            scoring_overrides = dict(zip(scoring_names, scoring_values))
+            scored = {path: score_capture(path, scoring_overrides, pool) for path, _ in labelled}
+            for post_values in itertools.product(*(grid[name] for name in post_names)):
+                overrides = {**scoring_overrides, **dict(zip(post_names, post_values))}
+                per_capture = [
+                    evaluate(timestamps[path], replay_events(timestamps[path], *scored[path], overrides), labels)
+                    for path, labels in labelled
+                ]
+                rows.append({"settings": overrides, **_merge_metrics(per_capture)})
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return rows
@@ -9,20 +9,39 @@ Optimized for higher FPS and more accurate detection:
 - Region-weighted scoring (eye_zone/nose nhạy hơn)
 - Palm center proximity làm tín hiệu bổ sung
 - Proximity normalization bằng face diagonal
+- Scoring chạy trên landmark arrays (N×3 float64) và 7 regions vectorized bằng NumPy
 """
 
 from __future__ import annotations
 
 import base64
 import math
+import os
+import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Iterable, List, Sequence, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, NamedTuple, Sequence, Tuple
 
 import numpy as np
 
 from app.config import settings
-from app.models import FaceTouchAnalyzeRequest, FaceTouchAnalyzeResponse
+from app.models import (
+    CompactDetectionOverlay,
+    DetectionOverlay,
+    DetectionOverlayBox,
+    FaceTouchAnalyzeRequest,
+    FaceTouchAnalyzeResponse,
+    FaceTouchFaceResult,
+    FaceTouchPersistence,
+    FaceTouchRegion,
+    FaceTouchState,
+)
+from app.services.face_touch_events import FaceTouchEventTracker
+from app.services.face_touch_executor import FaceTouchBusyError
+from app.services.face_touch_onnx import OnnxFaceTouchRuntime, onnx_backend_error
+from app.services.face_touch_replay import open_session_capture
 
 try:
     import cv2
@@ -36,7 +55,7 @@ except ImportError:  # pragma: no cover - handled by runtime checks
 
 
 # --- Region definitions with sensitivity weights ---
-SENSITIVE_REGIONS: dict[str, Tuple[float, float, float, float]] = {
+SENSITIVE_REGIONS: dict[FaceTouchRegion, Tuple[float, float, float, float]] = {
     "forehead": (0.25, 0.00, 0.75, 0.22),
     "left_cheek": (0.00, 0.20, 0.30, 0.70),
     "right_cheek": (0.70, 0.20, 1.00, 0.70),
@@ -70,6 +89,9 @@ ALL_CONTACT_INDICES = (
     5, 9, 13, 17,        # MCP/knuckle joints
 )
 
+# Fingertips + knuckles + wrist: hand box and overlay points
+HAND_SUBSET_INDICES = tuple(sorted(set(FINGERTIP_INDICES) | set(KNUCKLE_INDICES) | {WRIST_INDEX}))
+
 # Face landmarks: jawline contour + key points cho bounding box chính xác ở mọi khoảng cách
 FACE_CONTOUR_INDICES = (
     10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288,
@@ -82,6 +104,14 @@ FACE_KEY_INDICES = (1, 4, 5, 6, 168, 195, 197, 5, 4, 1, 61, 291, 199)
 _FACE_BOUNDING_SET = set(FACE_CONTOUR_INDICES) | set(FACE_KEY_INDICES)
 FACE_BOUNDING_INDICES_FULL = tuple(sorted(_FACE_BOUNDING_SET))
 
+# Array-backed region table (same order as SENSITIVE_REGIONS) for vectorized scoring
+REGION_NAMES: Tuple[FaceTouchRegion, ...] = tuple(SENSITIVE_REGIONS)
+_REGION_BOUNDS = np.array([SENSITIVE_REGIONS[name] for name in REGION_NAMES], dtype=np.float64)
+_REGION_WEIGHT_ARRAY = np.array(
+    [REGION_WEIGHTS.get(name, 1.0) for name in REGION_NAMES],
+    dtype=np.float64,
+)
+
 # Overlay output: subset of contour for visualization
 FACE_OVERLAY_INDICES = (10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288,
                         397, 365, 379, 378, 400, 377, 152, 148, 176, 149, 150, 136,
@@ -89,6 +119,34 @@ FACE_OVERLAY_INDICES = (10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 28
                         1, 61, 291, 199)
 
 
+class _LandmarkIndex(NamedTuple):
+    """Index tuple materialized once as an int array for fancy indexing."""
+
+    rows: np.ndarray
+    end: int  # landmark count needed for every row to exist
+
+
+def _landmark_index(indices: Sequence[int]) -> _LandmarkIndex:
+    rows = np.asarray(indices, dtype=np.intp)
+    rows.setflags(write=False)
+    return _LandmarkIndex(rows=rows, end=int(rows.max()) + 1 if len(rows) else 0)
+
+
+_FINGERTIP_ROWS = _landmark_index(FINGERTIP_INDICES)
+_FINGERTIP_PRIORITY_ROWS = _landmark_index(FINGERTIP_PRIORITY)
+_PALM_CENTER_ROWS = _landmark_index(PALM_CENTER_INDICES)
+_CONTACT_ROWS = _landmark_index(ALL_CONTACT_INDICES)
+_HAND_SUBSET_ROWS = _landmark_index(HAND_SUBSET_INDICES)
+_FACE_BOUNDING_ROWS = _landmark_index(FACE_BOUNDING_INDICES_FULL)
+_FACE_OVERLAY_ROWS = _landmark_index(FACE_OVERLAY_INDICES)
+
+# Unit ellipse for _approximate_face_points, starting at the top and going clockwise
+_APPROX_FACE_ANGLES = (
+    2 * np.pi * np.arange(max(len(FACE_OVERLAY_INDICES), 24)) / max(len(FACE_OVERLAY_INDICES), 24) - np.pi / 2
+)
+_APPROX_FACE_UNIT = np.column_stack((np.cos(_APPROX_FACE_ANGLES), np.sin(_APPROX_FACE_ANGLES)))
+
+
 class FaceTouchServiceError(ValueError):
     """Raised when a frame request is invalid."""
 
@@ -120,6 +178,12 @@ class Point:
     z: float = 0.0
 
 
+# Landmarks are carried through scoring as (N, 3) float64 arrays of pixel x,
+# pixel y and MediaPipe-relative z. float64 keeps every score bit-identical to
+# the former per-Point Python arithmetic.
+LandmarkArray = np.ndarray
+
+
 @dataclass
 class DepthAssessment:
     foreground_score: float
@@ -130,10 +194,36 @@ class DepthAssessment:
     projection_score: float
 
 
+@dataclass
+class FaceTouchScores:
+    """Result of the pure scoring stage for one face and up to two hands."""
+
+    state: FaceTouchState
+    score: float
+    regions: List[FaceTouchRegion]
+    hand_boxes: List[Box]
+    face_overlay_points: LandmarkArray
+    hand_overlay_points: LandmarkArray
+    overlap_score: float
+    proximity_score: float
+    fingertip_score: float
+    in_front_score: float
+    depth_score: float
+    touch_score: float
+    near_score: float
+    largest_hand_face_ratio: float
+
+
 def _require_dependencies() -> None:
     if cv2 is None:
         raise RuntimeError("opencv-python chưa được cài đặt cho AI service.")
-    if mp is None or not settings.FACE_TOUCH_ENABLE_MEDIAPIPE:
+    if settings.FACE_TOUCH_BACKEND == "onnx":
+        error = onnx_backend_error()
+        if error is not None:
+            raise RuntimeError(error)
+    elif settings.FACE_TOUCH_BACKEND != "mediapipe":
+        raise RuntimeError(f"FACE_TOUCH_BACKEND không hợp lệ: {settings.FACE_TOUCH_BACKEND!r}")
+    elif mp is None or not settings.FACE_TOUCH_ENABLE_MEDIAPIPE:
         raise RuntimeError("MediaPipe chưa sẵn sàng cho face-touch detection.")
 
 
@@ -146,21 +236,116 @@ def _strip_data_url(image_payload: str) -> str:
     return image_payload
 
 
-def _decode_image(image_payload: str) -> np.ndarray:
+def _payload_bytes(image_payload: str) -> bytes:
     encoded = _strip_data_url(image_payload)
     try:
-        raw_bytes = base64.b64decode(encoded, validate=True)
+        return base64.b64decode(encoded, validate=True)
     except Exception as error:  # pragma: no cover
         raise FaceTouchServiceError("Không thể giải mã frame base64.") from error
 
+
+def _decode_image(image_payload: str) -> np.ndarray:
+    return _decode_image_bytes(_payload_bytes(image_payload))
+
+
+def _decode_image_bytes(raw_bytes: bytes) -> np.ndarray:
+    """Decode encoded JPEG/WebP/PNG bytes to a BGR frame."""
+    return _decode_frame(raw_bytes).bgr
+
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) do not.
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_REDUCED_DECODE_FLAGS = ((8, "IMREAD_REDUCED_COLOR_8"), (4, "IMREAD_REDUCED_COLOR_4"), (2, "IMREAD_REDUCED_COLOR_2"))
+_TIFF_BYTE_ORDERS: Dict[bytes, Literal["little", "big"]] = {b"II": "little", b"MM": "big"}
+
+
+def _exif_orientation(segment: bytes) -> int:
+    """EXIF Orientation tag (1-8) from an APP1 payload; 1 when absent or unreadable."""
+    if segment[:6] != b"Exif\x00\x00":
+        return 1
+    tiff = segment[6:]
+    byte_order = _TIFF_BYTE_ORDERS.get(tiff[:2])
+    if byte_order is None or len(tiff) < 8:
+        return 1
+    ifd = int.from_bytes(tiff[4:8], byte_order)
+    if ifd + 2 > len(tiff):
+        return 1
+    for entry in range(int.from_bytes(tiff[ifd : ifd + 2], byte_order)):
+        offset = ifd + 2 + entry * 12
+        if offset + 12 > len(tiff):
+            break
+        if int.from_bytes(tiff[offset : offset + 2], byte_order) == 0x0112:
+            orientation = int.from_bytes(tiff[offset + 8 : offset + 10], byte_order)
+            return orientation if 1 <= orientation <= 8 else 1
+    return 1
+
+
+def _jpeg_size(raw_bytes: bytes) -> Tuple[int, int] | None:
+    """(width, height) as decoded, from the JPEG headers without decoding; None if not a JPEG.
+
+    ``cv2.imdecode`` applies the EXIF orientation, so orientations 5-8
+    (rotated 90°) swap the SOF width and height.
+    """
+    if raw_bytes[:2] != b"\xff\xd8":
+        return None
+    orientation = 1
+    index = 2
+    while index + 9 <= len(raw_bytes):
+        if raw_bytes[index] != 0xFF:
+            return None
+        marker = raw_bytes[index + 1]
+        if marker == 0xFF:
+            index += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            index += 2
+            continue
+        length = int.from_bytes(raw_bytes[index + 2 : index + 4], "big")
+        if marker == 0xE1:
+            orientation = _exif_orientation(raw_bytes[index + 4 : index + 2 + length])
+        if marker in _JPEG_SOF_MARKERS:
+            height = int.from_bytes(raw_bytes[index + 5 : index + 7], "big")
+            width = int.from_bytes(raw_bytes[index + 7 : index + 9], "big")
+            if not (width and height):
+                return None
+            return (height, width) if orientation >= 5 else (width, height)
+        index += 2 + length
+    return None
+
+
+def _reduced_decode_flag(raw_bytes: bytes, min_width: int | None) -> Tuple[int, Tuple[int, int] | None]:
+    """imdecode flag that shrinks a large JPEG by 1/2, 1/4 or 1/8 inside the DCT.
+
+    Only used while the reduced image stays at least ``min_width`` wide, so no
+    processing width ever has to upscale.
+    """
+    if min_width is None or not settings.FACE_TOUCH_REDUCED_DECODE_ENABLED:
+        return cv2.IMREAD_COLOR, None
+    size = _jpeg_size(raw_bytes)
+    if size is None:
+        return cv2.IMREAD_COLOR, None
+    for factor, flag_name in _REDUCED_DECODE_FLAGS:
+        if math.ceil(size[0] / factor) >= min_width:
+            return getattr(cv2, flag_name), size
+    return cv2.IMREAD_COLOR, size
+
+
+def _decode_frame(raw_bytes: bytes, min_width: int | None = None) -> "_FrameContext":
+    """Decode once into a frame context; large JPEGs may decode at reduced scale."""
+    if not raw_bytes:
+        raise FaceTouchServiceError("Frame rỗng.")
     if len(raw_bytes) > settings.FACE_TOUCH_MAX_IMAGE_BYTES:
         raise FaceTouchServiceError("Kích thước frame vượt quá giới hạn cho phép.")
 
+    flag, source_size = _reduced_decode_flag(raw_bytes, min_width)
     image_np = np.frombuffer(raw_bytes, dtype=np.uint8)
-    frame = cv2.imdecode(image_np, cv2.IMREAD_COLOR)
+    frame = cv2.imdecode(image_np, flag)
     if frame is None:
         raise FaceTouchServiceError("Không thể đọc frame từ ảnh đã gửi.")
-    return frame
+    if source_size is not None and (frame.shape[1] > frame.shape[0]) != (source_size[0] > source_size[1]):
+        # Rotation the header walk could not see (e.g. unusual EXIF layout).
+        source_size = (source_size[1], source_size[0])
+    return _FrameContext(frame, source_size=source_size)
 
 
 def _downscale_frame(frame: np.ndarray, max_width: int) -> Tuple[np.ndarray, float]:
@@ -175,11 +360,79 @@ def _downscale_frame(frame: np.ndarray, max_width: int) -> Tuple[np.ndarray, flo
     return resized, scale
 
 
+class _FrameContext:
+    """One frame under analysis and the planes derived from it.
+
+    Every consumer used to convert on its own (RGB for Hands/FaceMesh, RGB
+    again for face ROI crops, gray for Haar and the keyframe motion patch).
+    The context converts each plane at most once per frame and hands out
+    crops as views of those planes. ``source_size`` is the original client
+    frame size and ``scale`` maps original pixels to this frame's pixels,
+    including any reduced-scale decode.
+    """
+
+    def __init__(
+        self,
+        bgr: np.ndarray,
+        source_size: Tuple[int, int] | None = None,
+        scale: float | None = None,
+    ) -> None:
+        self.bgr = bgr
+        self.height, self.width = bgr.shape[:2]
+        self.source_size = source_size or (self.width, self.height)
+        self.scale = scale if scale is not None else self.width / self.source_size[0]
+        self._rgb: np.ndarray | None = None
+        self._gray: np.ndarray | None = None
+        self._rgb_crops: dict[Tuple[int, int, int, int], np.ndarray] = {}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.height, self.width)
+
+    @property
+    def rgb(self) -> np.ndarray:
+        if self._rgb is None:
+            with _stage("color"):
+                self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            with _stage("color"):
+                self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    def rgb_crop(self, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+        """Contiguous RGB crop (MediaPipe needs contiguous input), cached per bounds."""
+        key = (left, top, right, bottom)
+        crop = self._rgb_crops.get(key)
+        if crop is None:
+            crop = self._rgb_crops[key] = np.ascontiguousarray(self.rgb[top:bottom, left:right])
+        return crop
+
+    def gray_crop(self, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+        # Converting only the crop is cheaper unless the full gray plane exists already.
+        if self._gray is not None:
+            return self._gray[top:bottom, left:right]
+        return cv2.cvtColor(self.bgr[top:bottom, left:right], cv2.COLOR_BGR2GRAY)
+
+    def downscaled(self, max_width: int) -> "_FrameContext":
+        if self.width <= max_width:
+            return self
+        with _stage("resize"):
+            resized, scale = _downscale_frame(self.bgr, max_width)
+        return _FrameContext(resized, source_size=self.source_size, scale=self.scale * scale)
+
+
 class _MediaPipeRuntime:
     """Lazy-initialized MediaPipe models.
 
     Sử dụng video streaming mode (static_image_mode=False) để tận dụng
     temporal tracking giữa các frame liên tiếp → FPS cao hơn đáng kể.
+    MediaPipe graphs are not thread-safe, so a runtime must only be used by
+    one thread at a time (see ``_thread_runtime``). ``OnnxFaceTouchRuntime``
+    implements the same accessors for ``FACE_TOUCH_BACKEND=onnx``.
     """
 
     def __init__(self) -> None:
@@ -187,6 +440,9 @@ class _MediaPipeRuntime:
         self._face_mesh_static = None
         self._face_detection = None
         self._hands = None
+        self._hands_roi = None
+        self._face_mesh_multi = None
+        self._hands_multi = None
 
     def face_mesh(self):
         if self._face_mesh is None:
@@ -209,6 +465,41 @@ class _MediaPipeRuntime:
             )
         return self._hands
 
+    def hands_roi(self):
+        # Separate graph: its tracking state lives in crop coordinates, which
+        # would confuse the full-frame graph between re-detection frames.
+        if self._hands_roi is None:
+            self._hands_roi = mp.solutions.hands.Hands(
+                static_image_mode=False,
+                max_num_hands=2,
+                min_detection_confidence=settings.FACE_TOUCH_HAND_DETECT_CONFIDENCE,
+                min_tracking_confidence=settings.FACE_TOUCH_HAND_TRACK_CONFIDENCE,
+            )
+        return self._hands_roi
+
+    def face_mesh_multi(self):
+        # Multi-face mode only: max_num_faces is fixed per graph, and the
+        # single-face path must not pay for searching extra faces.
+        if self._face_mesh_multi is None:
+            self._face_mesh_multi = mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=max(settings.FACE_TOUCH_MULTI_FACE_MAX, 1),
+                refine_landmarks=True,
+                min_detection_confidence=settings.FACE_TOUCH_FACE_DETECT_CONFIDENCE,
+                min_tracking_confidence=settings.FACE_TOUCH_FACE_TRACK_CONFIDENCE,
+            )
+        return self._face_mesh_multi
+
+    def hands_multi(self):
+        if self._hands_multi is None:
+            self._hands_multi = mp.solutions.hands.Hands(
+                static_image_mode=False,
+                max_num_hands=2 * max(settings.FACE_TOUCH_MULTI_FACE_MAX, 1),
+                min_detection_confidence=settings.FACE_TOUCH_HAND_DETECT_CONFIDENCE,
+                min_tracking_confidence=settings.FACE_TOUCH_HAND_TRACK_CONFIDENCE,
+            )
+        return self._hands_multi
+
     def face_mesh_static(self):
         if self._face_mesh_static is None:
             self._face_mesh_static = mp.solutions.face_mesh.FaceMesh(
@@ -244,32 +535,588 @@ class _MediaPipeRuntime:
         if self._hands is not None:
             self._hands.close()
             self._hands = None
+        if self._hands_roi is not None:
+            self._hands_roi.close()
+            self._hands_roi = None
+        if self._face_mesh_multi is not None:
+            self._face_mesh_multi.close()
+            self._face_mesh_multi = None
+        if self._hands_multi is not None:
+            self._hands_multi.close()
+            self._hands_multi = None
 
 
-_runtime = _MediaPipeRuntime()
+# Runtime of either landmark backend (FACE_TOUCH_BACKEND); both expose the accessors above.
+LandmarkRuntime = _MediaPipeRuntime | OnnxFaceTouchRuntime
+
+
+_runtime_local = threading.local()
 _face_cascade = None
+_face_cascade_lock = threading.Lock()
 
+# Session runtimes pre-warmed at startup (see warm_up_face_touch_worker); new
+# sessions adopt one instead of paying graph creation on their first frame.
+_spare_runtimes: List[LandmarkRuntime] = []
+_spare_runtimes_pending = 0
+_spare_runtimes_lock = threading.Lock()
 
-def _landmarks_to_points(landmarks: Sequence, width: int, height: int) -> List[Point]:
-    return [
-        Point(
-            x=min(max(landmark.x * width, 0), width),
-            y=min(max(landmark.y * height, 0), height),
-            z=float(getattr(landmark, "z", 0.0)),
+
+_timing_local = threading.local()
+
+
+@contextmanager
+def _stage_timings() -> Iterator[dict[str, float]]:
+    """Collect per-stage milliseconds for the frame analyzed on this thread."""
+    stages: dict[str, float] = {}
+    previous = getattr(_timing_local, "stages", None)
+    _timing_local.stages = stages
+    try:
+        yield stages
+    finally:
+        _timing_local.stages = previous
+
+
+@contextmanager
+def _stage(name: str) -> Iterator[None]:
+    """Time one pipeline stage; a no-op outside ``_stage_timings``."""
+    stages = getattr(_timing_local, "stages", None)
+    if stages is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + (time.perf_counter() - started_at) * 1000
+
+
+def _current_stages() -> dict[str, float] | None:
+    stages = getattr(_timing_local, "stages", None)
+    if stages is None:
+        return None
+    return {name: round(value, 3) for name, value in stages.items()}
+
+
+def _new_runtime() -> LandmarkRuntime:
+    """Landmark runtime of the configured backend; both share one interface."""
+    if settings.FACE_TOUCH_BACKEND == "onnx":
+        return OnnxFaceTouchRuntime()
+    return _MediaPipeRuntime()
+
+
+def _take_spare_runtime() -> LandmarkRuntime:
+    with _spare_runtimes_lock:
+        if _spare_runtimes:
+            return _spare_runtimes.pop()
+    return _new_runtime()
+
+
+def _thread_runtime() -> LandmarkRuntime:
+    """Return the landmark runtime owned by the calling worker thread."""
+    runtime: LandmarkRuntime | None = getattr(_runtime_local, "runtime", None)
+    if runtime is None:
+        runtime = _new_runtime()
+        _runtime_local.runtime = runtime
+    return runtime
+
+
+class _FaceTrackState:
+    """Per-session scheduler for the heavy FaceMesh pass.
+
+    Hands run on every frame. FaceMesh only runs on keyframes; in between, the
+    last face landmarks/box are reused as long as nothing could change the
+    classification: the previous frame was ``safe``, no hand box reaches the
+    (doubly expanded) face box, and the face patch has not changed visibly.
+    Any of those conditions, the frame interval or the max age forces a
+    fresh FaceMesh pass, so safe/near/touching decisions are always made with
+    fresh landmarks whenever a hand is close to the face.
+    """
+
+    def __init__(self) -> None:
+        self.points: LandmarkArray | None = None
+        self.box: Box | None = None
+        self.frame_shape: Tuple[int, int] | None = None
+        self.patch: np.ndarray | None = None
+        self.keyframe_ms = 0.0
+        self.frames_since_keyframe = 0
+        self.last_ms: float | None = None
+        self.last_state = "safe"
+
+    def advance_clock(self, timestamp_ms: float | None, sample_rate_fps: int) -> float:
+        """Frame time in ms: client timestamp, or a sample-rate estimate when unusable."""
+        step_ms = 1000.0 / max(sample_rate_fps, 1)
+        if timestamp_ms is None or (self.last_ms is not None and timestamp_ms <= self.last_ms):
+            now_ms = self.last_ms + step_ms if self.last_ms is not None else 0.0
+        else:
+            now_ms = float(timestamp_ms)
+        self.last_ms = now_ms
+        return now_ms
+
+    def reuse(
+        self,
+        frame: _FrameContext,
+        hand_point_sets: Sequence[LandmarkArray],
+        now_ms: float,
+    ) -> Tuple[LandmarkArray, Box] | None:
+        interval = settings.FACE_TOUCH_FACE_REFRESH_INTERVAL
+        if interval <= 1 or self.points is None or self.box is None:
+            return None
+        if self.frame_shape != frame.shape or self.last_state != "safe":
+            return None
+        if self.frames_since_keyframe + 1 >= interval:
+            return None
+        if now_ms - self.keyframe_ms > settings.FACE_TOUCH_FACE_REFRESH_MAX_AGE_MS:
+            return None
+
+        frame_height, frame_width = frame.shape
+        guard_box = _expand_box(
+            self.box,
+            frame_width,
+            frame_height,
+            _adaptive_face_margin(self.box, frame_width, frame_height) * 2,
         )
-        for landmark in landmarks
-    ]
+        for hand_points in hand_point_sets:
+            hand_box = _points_box(hand_points)
+            if hand_box is not None and _intersection_ratio(hand_box, guard_box) > 0:
+                return None
+
+        patch = _face_patch(frame, self.box)
+        if patch is None or self.patch is None:
+            return None
+        if float(cv2.absdiff(patch, self.patch).mean()) > settings.FACE_TOUCH_FACE_MOTION_THRESHOLD:
+            return None
+
+        self.frames_since_keyframe += 1
+        return self.points, self.box
+
+    def refresh(
+        self,
+        frame: _FrameContext,
+        face_data: Tuple[LandmarkArray, Box] | None,
+        now_ms: float,
+    ) -> None:
+        self.frame_shape = frame.shape
+        self.keyframe_ms = now_ms
+        self.frames_since_keyframe = 0
+        if face_data is None:
+            self.points = None
+            self.box = None
+            self.patch = None
+            return
+        self.points, self.box = face_data
+        self.patch = _face_patch(frame, self.box)
+
+
+def _face_patch(frame: _FrameContext, face_box: Box) -> np.ndarray | None:
+    """32x32 gray thumbnail of the face box, used as a cheap motion probe."""
+    left, top, right, bottom = _box_bounds(face_box, frame.width, frame.height)
+    if right - left < 2 or bottom - top < 2:
+        return None
+    gray = frame.gray_crop(left, top, right, bottom)
+    return cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA)
 
 
-def _roi_landmarks_to_points(landmarks: Sequence, crop_box: Box) -> List[Point]:
-    return [
-        Point(
-            x=min(max(crop_box.x + landmark.x * crop_box.width, 0), crop_box.x + crop_box.width),
-            y=min(max(crop_box.y + landmark.y * crop_box.height, 0), crop_box.y + crop_box.height),
-            z=float(getattr(landmark, "z", 0.0)),
+_ROI_FACE_PATHS = ("roi_hint", "detection_roi", "haar_roi")
+
+
+class _ResolutionController:
+    """Per-session processing width.
+
+    Picks the smallest width rung that still keeps the previous frame's face
+    (and smallest hand) above ``FACE_TOUCH_ADAPTIVE_MIN_FACE_PX`` /
+    ``_MIN_HAND_PX``: a close-up face runs at 320px, a distant one at the full
+    ``FACE_TOUCH_PROCESS_WIDTH``. One rung is shed while the session's latency
+    EMA exceeds ``FACE_TOUCH_LATENCY_BUDGET_MS`` or the worker pool is
+    saturated. Width changes one rung at a time and at most once every
+    ``FACE_TOUCH_ADAPTIVE_HOLD_FRAMES`` frames (each change invalidates the
+    reused face keyframe), except that losing the face jumps straight back to
+    full width.
+
+    Faces that only the ROI fallback could find are remembered in
+    original-frame pixels so the next frame crops around them directly.
+    """
+
+    def __init__(self) -> None:
+        self.width: int | None = None
+        self.frames_since_change = 0
+        self.latency_ema_ms: float | None = None
+        self.face_width: float | None = None
+        self.hand_width: float | None = None
+        self.roi_box: Box | None = None
+
+    @staticmethod
+    def rungs() -> List[int]:
+        maximum = settings.FACE_TOUCH_PROCESS_WIDTH
+        return sorted({width for width in settings.FACE_TOUCH_ADAPTIVE_WIDTHS if width < maximum} | {maximum})
+
+    def _target(self, frame_width: int, load_hint: float) -> int:
+        rungs = self.rungs()
+        if self.face_width is None or self.roi_box is not None:
+            return rungs[-1]
+
+        needed = frame_width * settings.FACE_TOUCH_ADAPTIVE_MIN_FACE_PX / max(self.face_width, 1.0)
+        if self.hand_width is not None:
+            needed = max(
+                needed,
+                frame_width * settings.FACE_TOUCH_ADAPTIVE_MIN_HAND_PX / max(self.hand_width, 1.0),
+            )
+        index = next((i for i, width in enumerate(rungs) if width >= needed), len(rungs) - 1)
+
+        over_budget = (
+            self.latency_ema_ms is not None
+            and self.latency_ema_ms > settings.FACE_TOUCH_LATENCY_BUDGET_MS
         )
-        for landmark in landmarks
-    ]
+        if over_budget or load_hint >= 1.0:
+            index = max(index - 1, 0)
+        return rungs[index]
+
+    def choose(self, frame_width: int, load_hint: float = 0.0) -> int:
+        if not settings.FACE_TOUCH_ADAPTIVE_WIDTH_ENABLED:
+            return settings.FACE_TOUCH_PROCESS_WIDTH
+
+        target = self._target(frame_width, load_hint)
+        rungs = self.rungs()
+        # Lost or tiny face: go back to full width at once, detection needs it.
+        searching = self.face_width is None or self.roi_box is not None
+        if self.width is None or self.width not in rungs or searching:
+            self.width = target
+            self.frames_since_change = 0
+        elif target != self.width and self.frames_since_change >= settings.FACE_TOUCH_ADAPTIVE_HOLD_FRAMES:
+            step = 1 if target > self.width else -1
+            self.width = rungs[rungs.index(self.width) + step]
+            self.frames_since_change = 0
+        self.frames_since_change += 1
+        return self.width
+
+    def roi_hint(self, scale: float) -> Box | None:
+        if self.roi_box is None:
+            return None
+        return Box(
+            x=self.roi_box.x * scale,
+            y=self.roi_box.y * scale,
+            width=self.roi_box.width * scale,
+            height=self.roi_box.height * scale,
+        )
+
+    def observe(
+        self,
+        scale: float,
+        face_box: Box | None,
+        hand_boxes: Sequence[Box],
+        face_path: str | None,
+        latency_ms: float,
+    ) -> None:
+        self.latency_ema_ms = (
+            latency_ms
+            if self.latency_ema_ms is None
+            else self.latency_ema_ms + 0.2 * (latency_ms - self.latency_ema_ms)
+        )
+        if face_box is None:
+            self.face_width = None
+            self.hand_width = None
+            self.roi_box = None
+            return
+
+        self.face_width = face_box.width / scale
+        self.hand_width = min((box.width / scale for box in hand_boxes), default=None)
+        if face_path == "reused":
+            return
+        if face_path in _ROI_FACE_PATHS:
+            self.roi_box = Box(
+                x=face_box.x / scale,
+                y=face_box.y / scale,
+                width=face_box.width / scale,
+                height=face_box.height / scale,
+            )
+        else:
+            self.roi_box = None
+
+
+class _HandRoiState:
+    """Per-session crop for Hands inference.
+
+    Only hands around the face can change the classification, so once a face
+    box is known the next frames run Hands on a crop of that box expanded by
+    ``FACE_TOUCH_HAND_ROI_MARGIN_RATIO`` × face size on each side. The full
+    frame is re-scanned every ``FACE_TOUCH_HAND_ROI_FULL_FRAME_INTERVAL``
+    frames to catch hands entering from elsewhere, on the frame after a hand
+    reached the crop edge, and whenever the face is lost.
+
+    The face box is kept in original-frame pixels so it survives processing
+    width changes.
+    """
+
+    def __init__(self) -> None:
+        self.face_box: Box | None = None
+        self.frames_since_full = 0
+        self.force_full = True
+
+    def crop(self, scale: float, frame_width: int, frame_height: int) -> Box | None:
+        """Crop for this frame in processed pixels, or None for a full-frame pass."""
+        if not settings.FACE_TOUCH_HAND_ROI_ENABLED or self.face_box is None or self.force_full:
+            return None
+        if self.frames_since_full + 1 >= settings.FACE_TOUCH_HAND_ROI_FULL_FRAME_INTERVAL:
+            return None
+
+        margin = max(self.face_box.width, self.face_box.height) * scale * settings.FACE_TOUCH_HAND_ROI_MARGIN_RATIO
+        left, top, right, bottom = _box_bounds(
+            Box(
+                x=self.face_box.x * scale - margin,
+                y=self.face_box.y * scale - margin,
+                width=self.face_box.width * scale + 2 * margin,
+                height=self.face_box.height * scale + 2 * margin,
+            ),
+            frame_width,
+            frame_height,
+        )
+        crop_area = (right - left) * (bottom - top)
+        if crop_area <= 0 or crop_area >= settings.FACE_TOUCH_HAND_ROI_MAX_AREA_RATIO * frame_width * frame_height:
+            return None
+        return Box(x=float(left), y=float(top), width=float(right - left), height=float(bottom - top))
+
+    def observe(
+        self,
+        scale: float,
+        face_box: Box | None,
+        crop: Box | None,
+        hand_point_sets: Sequence[LandmarkArray],
+        frame_width: int,
+        frame_height: int,
+    ) -> None:
+        self.frames_since_full = 0 if crop is None else self.frames_since_full + 1
+        self.force_full = crop is not None and any(
+            _reaches_crop_edge(points, crop, frame_width, frame_height) for points in hand_point_sets
+        )
+        if face_box is None:
+            self.face_box = None
+            return
+        self.face_box = Box(
+            x=face_box.x / scale,
+            y=face_box.y / scale,
+            width=face_box.width / scale,
+            height=face_box.height / scale,
+        )
+
+
+def _reaches_crop_edge(points: LandmarkArray, crop: Box, frame_width: int, frame_height: int) -> bool:
+    """True when a hand touches a crop edge that is not also a frame edge."""
+    tolerance = 2.0
+    left, top = crop.x, crop.y
+    right, bottom = crop.x + crop.width, crop.y + crop.height
+    return bool(
+        (left > 0 and points[:, 0].min() <= left + tolerance)
+        or (top > 0 and points[:, 1].min() <= top + tolerance)
+        or (right < frame_width and points[:, 0].max() >= right - tolerance)
+        or (bottom < frame_height and points[:, 1].max() >= bottom - tolerance)
+    )
+
+
+class _FaceTouchSession:
+    """Tracking state owned by one client stream.
+
+    Only the temporal-tracking graphs (FaceMesh + Hands in video mode, plus
+    the hand ROI graph) are session-specific; static fallbacks stay on the
+    worker-thread runtime.
+    """
+
+    def __init__(self, session_id: str, now: float) -> None:
+        self.session_id = session_id
+        self.runtime: LandmarkRuntime = _take_spare_runtime()
+        self.face_track = _FaceTrackState()
+        self.events = FaceTouchEventTracker()
+        self.resolution = _ResolutionController()
+        self.hand_roi = _HandRoiState()
+        self.capture = open_session_capture(session_id)
+        self.lock = threading.Lock()
+        self.last_used = now
+        self.active = 0
+
+    def close(self) -> None:
+        self.runtime.reset()
+        if self.capture is not None:
+            self.capture.close()
+
+
+class _FaceTouchSessionPool:
+    """Session-keyed runtimes with idle-TTL + LRU eviction and a resident cap.
+
+    Frames from different students must not interleave through one temporal
+    tracker: that degrades tracking into repeated full re-detection. Each
+    session id gets its own runtime, serialized by ``session.lock``.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int,
+        idle_ttl_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_sessions = max(max_sessions, 1)
+        self.idle_ttl_s = idle_ttl_s
+        self._clock = clock
+        self._sessions: OrderedDict[str, _FaceTouchSession] = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def _pop_idle(self, now: float) -> List[_FaceTouchSession]:
+        if self.idle_ttl_s <= 0:
+            return []
+        expired = [
+            session
+            for session in self._sessions.values()
+            if session.active == 0 and now - session.last_used >= self.idle_ttl_s
+        ]
+        for session in expired:
+            del self._sessions[session.session_id]
+        return expired
+
+    def _pop_lru(self) -> _FaceTouchSession:
+        # OrderedDict order is least → most recently used.
+        for session in self._sessions.values():
+            if session.active == 0:
+                del self._sessions[session.session_id]
+                return session
+        raise FaceTouchBusyError(
+            "Đã đạt giới hạn số phiên face-touch đồng thời, vui lòng thử lại sau.",
+        )
+
+    @contextmanager
+    def acquire(self, session_id: str) -> Iterator[_FaceTouchSession]:
+        """Pin the session for the duration of one frame and hold its lock."""
+        victims: List[_FaceTouchSession] = []
+        try:
+            with self._lock:
+                now = self._clock()
+                victims.extend(self._pop_idle(now))
+                session = self._sessions.get(session_id)
+                if session is None:
+                    while len(self._sessions) >= self.max_sessions:
+                        victims.append(self._pop_lru())
+                    session = _FaceTouchSession(session_id, now)
+                    self._sessions[session_id] = session
+                    self.created += 1
+                else:
+                    self._sessions.move_to_end(session_id)
+                session.active += 1
+                session.last_used = now
+                self.evicted += len(victims)
+        finally:
+            # Closing MediaPipe graphs is slow; never do it under the pool lock.
+            for victim in victims:
+                victim.close()
+
+        try:
+            with session.lock:
+                yield session
+        finally:
+            with self._lock:
+                session.active -= 1
+                session.last_used = self._clock()
+
+    def release(self, session_id: str) -> bool:
+        """Drop a session explicitly (e.g. when its stream ends)."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.active > 0:
+                return False
+            del self._sessions[session_id]
+        session.close()
+        return True
+
+    def sweep(self) -> int:
+        with self._lock:
+            expired = self._pop_idle(self._clock())
+            self.evicted += len(expired)
+        for session in expired:
+            session.close()
+        return len(expired)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "resident": len(self._sessions),
+                "maxResident": self.max_sessions,
+                "created": self.created,
+                "evicted": self.evicted,
+            }
+
+
+_session_pool = _FaceTouchSessionPool(
+    max_sessions=settings.FACE_TOUCH_SESSION_MAX_RESIDENT,
+    idle_ttl_s=settings.FACE_TOUCH_SESSION_IDLE_TTL_S,
+)
+
+
+@contextmanager
+def _tracking_session(session_id: str | None) -> Iterator[_FaceTouchSession | None]:
+    """Locked session for ``session_id``; None for stateless (session-less) frames."""
+    if not session_id:
+        yield None
+        return
+    with _session_pool.acquire(session_id) as session:
+        yield session
+
+
+def release_face_touch_session(session_id: str) -> bool:
+    return _session_pool.release(session_id)
+
+
+def _normalized_landmarks(landmarks: Sequence | np.ndarray) -> LandmarkArray:
+    if isinstance(landmarks, np.ndarray):
+        # ONNX backend: already an (N, 3) normalized array.
+        return landmarks.astype(np.float64, copy=True)
+    return np.array(
+        [(landmark.x, landmark.y, getattr(landmark, "z", 0.0)) for landmark in landmarks],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+
+
+def _landmarks_to_array(landmarks: Sequence | np.ndarray, width: int, height: int) -> LandmarkArray:
+    points = _normalized_landmarks(landmarks)
+    points[:, 0] = np.clip(points[:, 0] * width, 0, width)
+    points[:, 1] = np.clip(points[:, 1] * height, 0, height)
+    return points
+
+
+def _roi_landmarks_to_array(landmarks: Sequence | np.ndarray, crop_box: Box) -> LandmarkArray:
+    points = _normalized_landmarks(landmarks)
+    points[:, 0] = np.clip(
+        crop_box.x + points[:, 0] * crop_box.width, 0, crop_box.x + crop_box.width
+    )
+    points[:, 1] = np.clip(
+        crop_box.y + points[:, 1] * crop_box.height, 0, crop_box.y + crop_box.height
+    )
+    return points
+
+
+def _as_landmark_array(points: LandmarkArray | Iterable[Point]) -> LandmarkArray:
+    """Accept either a landmark array or a sequence of ``Point`` (tests, callers)."""
+    if isinstance(points, np.ndarray):
+        return points
+    return np.array(
+        [(point.x, point.y, point.z) for point in points],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+
+
+def _landmark_rows(points: LandmarkArray, indices: _LandmarkIndex | Sequence[int]) -> LandmarkArray:
+    """Rows of ``points`` at ``indices``, skipping indices past the end.
+
+    Pass a precomputed ``_LandmarkIndex`` on per-frame paths: full landmark
+    sets then take a single fancy-indexing op with no Python-level loop.
+    """
+    if not isinstance(indices, _LandmarkIndex):
+        indices = _landmark_index(indices)
+    if len(points) >= indices.end:
+        return points[indices.rows]
+    return points[indices.rows[indices.rows < len(points)]]
 
 
 def _relative_box_to_box(relative_box, width: int, height: int) -> Box | None:
@@ -310,19 +1157,22 @@ def _opencv_face_cascade():
     return _face_cascade
 
 
-def _opencv_face_box(frame: np.ndarray) -> Box | None:
+def _opencv_face_box(frame: _FrameContext) -> Box | None:
     cascade = _opencv_face_cascade()
     if cascade is None:
         return None
 
-    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    min_edge = max(24, int(round(min(frame.shape[:2]) * 0.05)))
-    detections = cascade.detectMultiScale(
-        gray_frame,
-        scaleFactor=1.05,
-        minNeighbors=3,
-        minSize=(min_edge, min_edge),
-    )
+    gray_frame = frame.gray
+    min_edge = max(24, int(round(min(frame.shape) * 0.05)))
+    # CascadeClassifier keeps internal scratch buffers; share one instance
+    # across worker threads but serialize detection.
+    with _stage("haar"), _face_cascade_lock:
+        detections = cascade.detectMultiScale(
+            gray_frame,
+            scaleFactor=1.05,
+            minNeighbors=3,
+            minSize=(min_edge, min_edge),
+        )
     if len(detections) == 0:
         return None
 
@@ -335,8 +1185,9 @@ def _opencv_face_box(frame: np.ndarray) -> Box | None:
     )
 
 
-def _prepare_face_roi(frame: np.ndarray, face_box: Box) -> Tuple[np.ndarray, Box] | None:
-    frame_height, frame_width = frame.shape[:2]
+def _prepare_face_roi(frame: _FrameContext, face_box: Box) -> Tuple[np.ndarray, Box] | None:
+    """RGB crop around ``face_box`` (upsampled when small) and its box in frame pixels."""
+    frame_height, frame_width = frame.shape
     roi_box = _expand_box(
         face_box,
         frame_width,
@@ -350,59 +1201,75 @@ def _prepare_face_roi(frame: np.ndarray, face_box: Box) -> Tuple[np.ndarray, Box
     if right <= left or bottom <= top:
         return None
 
-    roi_frame = frame[top:bottom, left:right]
-    if roi_frame.size == 0:
-        return None
-
     crop_box = Box(
         x=float(left),
         y=float(top),
         width=float(right - left),
         height=float(bottom - top),
     )
-    longest_edge = max(roi_frame.shape[0], roi_frame.shape[1])
+    roi_width, roi_height = right - left, bottom - top
+    longest_edge = max(roi_width, roi_height)
     min_size = settings.FACE_TOUCH_FACE_ROI_MIN_SIZE
-    if longest_edge < min_size:
-        scale = min_size / max(longest_edge, 1)
-        roi_frame = cv2.resize(
-            roi_frame,
-            (
-                max(1, int(round(roi_frame.shape[1] * scale))),
-                max(1, int(round(roi_frame.shape[0] * scale))),
-            ),
-            interpolation=cv2.INTER_CUBIC,
-        )
-
+    if longest_edge >= min_size:
+        return frame.rgb_crop(left, top, right, bottom), crop_box
+
+    # Resizing commutes with the BGR→RGB channel swap, so upsample the RGB
+    # plane's view directly instead of converting the crop again.
+    scale = min_size / max(longest_edge, 1)
+    roi_frame = cv2.resize(
+        frame.rgb[top:bottom, left:right],
+        (
+            max(1, int(round(roi_width * scale))),
+            max(1, int(round(roi_height * scale))),
+        ),
+        interpolation=cv2.INTER_CUBIC,
+    )
     return roi_frame, crop_box
 
 
-def _approximate_face_points(face_box: Box) -> List[Point]:
-    points: List[Point] = []
+def _approximate_face_points(face_box: Box) -> LandmarkArray:
     center_x, center_y = face_box.center
     radius_x = max(face_box.width * 0.5, 1.0)
     radius_y = max(face_box.height * 0.5, 1.0)
-    count = max(len(FACE_OVERLAY_INDICES), 24)
-
-    for index in range(count):
-        angle = (2 * math.pi * index / count) - (math.pi / 2)
-        points.append(
-            Point(
-                x=center_x + math.cos(angle) * radius_x,
-                y=center_y + math.sin(angle) * radius_y,
-            )
-        )
-
+    points = np.zeros((len(_APPROX_FACE_UNIT), 3), dtype=np.float64)
+    points[:, :2] = _APPROX_FACE_UNIT * (radius_x, radius_y) + (center_x, center_y)
     return points
 
 
-def _fallback_face_points(processed_frame: np.ndarray, rgb_frame: np.ndarray) -> Tuple[List[Point], Box] | None:
-    proc_h, proc_w = processed_frame.shape[:2]
-    detection_results = _runtime.face_detection().process(rgb_frame)
-    detections = detection_results.detections or []
-    best_face_box = None
-    best_score = -1.0
-
-    for detection in detections:
+def _roi_face_points(
+    static_runtime: LandmarkRuntime,
+    frame: _FrameContext,
+    face_box: Box,
+) -> Tuple[LandmarkArray, Box] | None:
+    """Static FaceMesh on an (upsampled) crop around ``face_box``."""
+    roi = _prepare_face_roi(frame, face_box)
+    if roi is None:
+        return None
+    roi_rgb, crop_box = roi
+    with _stage("roi_mesh"):
+        roi_results = static_runtime.face_mesh_static().process(roi_rgb)
+    if not roi_results.multi_face_landmarks:
+        return None
+    roi_points = _roi_landmarks_to_array(
+        roi_results.multi_face_landmarks[0].landmark,
+        crop_box,
+    )
+    roi_face_box = _points_box(_face_landmark_subset(roi_points))
+    if roi_face_box is None:
+        return None
+    return roi_points, roi_face_box
+
+
+def _detected_face_boxes(
+    static_runtime: LandmarkRuntime,
+    frame: _FrameContext,
+) -> List[Box]:
+    """Full-range FaceDetection boxes, most confident first."""
+    proc_h, proc_w = frame.shape
+    with _stage("face_detection"):
+        detection_results = static_runtime.face_detection().process(frame.rgb)
+    scored_boxes = []
+    for detection in detection_results.detections or []:
         relative_box = getattr(getattr(detection, "location_data", None), "relative_bounding_box", None)
         if relative_box is None:
             continue
@@ -410,53 +1277,123 @@ def _fallback_face_points(processed_frame: np.ndarray, rgb_frame: np.ndarray) ->
         if face_box is None:
             continue
         score = float(detection.score[0]) if getattr(detection, "score", None) else 0.0
-        if score > best_score:
-            best_face_box = face_box
-            best_score = score
+        scored_boxes.append((score, face_box))
+    # Stable sort: equal scores keep detector order, as the former strict-max scan did.
+    scored_boxes.sort(key=lambda item: -item[0])
+    return [face_box for _, face_box in scored_boxes]
+
+
+def _fallback_face_points(
+    static_runtime: LandmarkRuntime,
+    frame: _FrameContext,
+) -> Tuple[LandmarkArray, Box, str] | None:
+    detected_boxes = _detected_face_boxes(static_runtime, frame)
+    best_face_box = detected_boxes[0] if detected_boxes else None
+    detector = "detection"
 
     if best_face_box is None:
-        best_face_box = _opencv_face_box(processed_frame)
+        best_face_box = _opencv_face_box(frame)
+        detector = "haar"
     if best_face_box is None:
         return None
 
-    roi = _prepare_face_roi(processed_frame, best_face_box)
-    if roi is not None:
-        roi_frame, crop_box = roi
-        roi_rgb = cv2.cvtColor(roi_frame, cv2.COLOR_BGR2RGB)
-        roi_results = _runtime.face_mesh_static().process(roi_rgb)
-        if roi_results.multi_face_landmarks:
-            roi_points = _roi_landmarks_to_points(
-                roi_results.multi_face_landmarks[0].landmark,
-                crop_box,
-            )
-            face_box = _points_box(_face_landmark_subset(roi_points))
-            if face_box is not None:
-                return roi_points, face_box
+    roi_face = _roi_face_points(static_runtime, frame, best_face_box)
+    if roi_face is not None:
+        return roi_face[0], roi_face[1], f"{detector}_roi"
+
+    return _approximate_face_points(best_face_box), best_face_box, f"{detector}_box"
 
-    return _approximate_face_points(best_face_box), best_face_box
 
+def _extract_face_points(
+    runtime: LandmarkRuntime,
+    static_runtime: LandmarkRuntime,
+    frame: _FrameContext,
+    roi_hint: Box | None = None,
+) -> Tuple[LandmarkArray, Box, str] | None:
+    """Face landmarks + box + the path that produced them.
 
-def _extract_face_points(processed_frame: np.ndarray, rgb_frame: np.ndarray) -> Tuple[List[Point], Box] | None:
-    proc_h, proc_w = processed_frame.shape[:2]
-    face_results = _runtime.face_mesh().process(rgb_frame)
+    Paths: ``face_mesh`` (video FaceMesh on the full frame), ``roi_hint``
+    (static FaceMesh on a crop around the session's last tiny face),
+    ``detection_roi`` / ``haar_roi`` (detector box → crop → FaceMesh) and
+    ``detection_box`` / ``haar_box`` (detector box with approximate points).
+    """
+    if roi_hint is not None:
+        # Tiny distant face: full-frame FaceMesh already failed on it last
+        # frame, so go straight to the crop around where it was.
+        roi_face = _roi_face_points(static_runtime, frame, roi_hint)
+        if roi_face is not None:
+            return roi_face[0], roi_face[1], "roi_hint"
+
+    proc_h, proc_w = frame.shape
+    with _stage("face_mesh"):
+        face_results = runtime.face_mesh().process(frame.rgb)
     if face_results.multi_face_landmarks:
         face_landmarks = face_results.multi_face_landmarks[0].landmark
-        face_points = _landmarks_to_points(face_landmarks, proc_w, proc_h)
+        face_points = _landmarks_to_array(face_landmarks, proc_w, proc_h)
         face_box = _points_box(_face_landmark_subset(face_points))
         if face_box is not None:
-            return face_points, face_box
+            return face_points, face_box, "face_mesh"
 
-    return _fallback_face_points(processed_frame, rgb_frame)
+    return _fallback_face_points(static_runtime, frame)
 
 
-def _points_box(points: Iterable[Point]) -> Box | None:
-    point_list = list(points)
-    if not point_list:
+def _extract_faces(
+    runtime: LandmarkRuntime,
+    static_runtime: LandmarkRuntime,
+    frame: _FrameContext,
+    max_faces: int,
+) -> Tuple[List[Tuple[LandmarkArray, Box]], str | None]:
+    """Up to ``max_faces`` faces ordered left to right, plus the path that found them.
+
+    The multi-face FaceMesh's short-range detector misses small faces in
+    wide frames, so when it returns fewer than ``max_faces`` the full-range
+    detections that do not overlap a found face get the crop → static
+    FaceMesh treatment of the single-face fallback.
+    """
+    proc_h, proc_w = frame.shape
+    with _stage("face_mesh"):
+        face_results = runtime.face_mesh_multi().process(frame.rgb)
+    faces = []
+    for face_landmarks in (face_results.multi_face_landmarks or [])[:max_faces]:
+        face_points = _landmarks_to_array(face_landmarks.landmark, proc_w, proc_h)
+        face_box = _points_box(_face_landmark_subset(face_points))
+        if face_box is not None:
+            faces.append((face_points, face_box))
+    face_path = "face_mesh_multi" if faces else None
+
+    if len(faces) < max_faces:
+        for detected_box in _detected_face_boxes(static_runtime, frame):
+            if len(faces) >= max_faces:
+                break
+            if any(_intersection_ratio(detected_box, face_box) > 0.3 for _, face_box in faces):
+                continue
+            roi_face = _roi_face_points(static_runtime, frame, detected_box)
+            if roi_face is not None:
+                faces.append(roi_face)
+                face_path = face_path or "detection_roi"
+            else:
+                faces.append((_approximate_face_points(detected_box), detected_box))
+                face_path = face_path or "detection_box"
+
+    if not faces:
+        haar_box = _opencv_face_box(frame)
+        if haar_box is None:
+            return [], None
+        roi_face = _roi_face_points(static_runtime, frame, haar_box)
+        if roi_face is not None:
+            return [roi_face], "haar_roi"
+        return [(_approximate_face_points(haar_box), haar_box)], "haar_box"
+
+    faces.sort(key=lambda face: face[1].center[0])
+    return faces, face_path
+
+
+def _points_box(points: LandmarkArray | Iterable[Point]) -> Box | None:
+    point_array = _as_landmark_array(points)
+    if len(point_array) == 0:
         return None
-    min_x = min(point.x for point in point_list)
-    max_x = max(point.x for point in point_list)
-    min_y = min(point.y for point in point_list)
-    max_y = max(point.y for point in point_list)
+    min_x, min_y = point_array[:, :2].min(axis=0).tolist()
+    max_x, max_y = point_array[:, :2].max(axis=0).tolist()
     return Box(x=min_x, y=min_y, width=max_x - min_x, height=max_y - min_y)
 
 
@@ -500,28 +1437,74 @@ def _intersection_ratio(box_a: Box, box_b: Box) -> float:
     return min(intersection / denominator, 1.0)
 
 
+def _intersection_ratios(box: Box, boxes: np.ndarray) -> np.ndarray:
+    """``_intersection_ratio(box, b)`` for every row (x, y, w, h) of ``boxes``."""
+    xs, ys, widths, heights = boxes.T
+    x_left = np.maximum(box.x, xs)
+    y_top = np.maximum(box.y, ys)
+    x_right = np.minimum(box.x + box.width, xs + widths)
+    y_bottom = np.minimum(box.y + box.height, ys + heights)
+
+    overlapping = (x_right > x_left) & (y_bottom > y_top)
+    intersection = np.where(overlapping, (x_right - x_left) * (y_bottom - y_top), 0.0)
+    areas = np.maximum(widths, 0) * np.maximum(heights, 0)
+    return np.minimum(intersection / np.maximum(areas, 1.0), 1.0)
+
+
 def _point_to_box_distance(point: Point, box: Box) -> float:
     dx = max(box.x - point.x, 0, point.x - (box.x + box.width))
     dy = max(box.y - point.y, 0, point.y - (box.y + box.height))
     return math.sqrt(dx * dx + dy * dy)
 
 
-def _normalized_proximity(points: Sequence[Point], box: Box) -> float:
+def _box_distances(points: LandmarkArray, boxes: np.ndarray) -> np.ndarray:
+    """(P, K) distances from every point to every box row (x, y, w, h)."""
+    xs = points[:, 0:1]
+    ys = points[:, 1:2]
+    dx = np.maximum(np.maximum(boxes[:, 0] - xs, 0.0), xs - (boxes[:, 0] + boxes[:, 2]))
+    dy = np.maximum(np.maximum(boxes[:, 1] - ys, 0.0), ys - (boxes[:, 1] + boxes[:, 3]))
+    return np.sqrt(dx * dx + dy * dy)
+
+
+def _normalized_proximities(points: LandmarkArray, boxes: np.ndarray) -> np.ndarray:
+    """``_normalized_proximity`` of one point set against every box row."""
+    if len(points) == 0:
+        return np.zeros(len(boxes), dtype=np.float64)
+    references = np.maximum(np.sqrt(boxes[:, 2] ** 2 + boxes[:, 3] ** 2), 1.0)
+    minimum_distances = _box_distances(points, boxes).min(axis=0)
+    return np.maximum(1.0 - minimum_distances / references, 0.0)
+
+
+def _normalized_proximity(points: LandmarkArray | Sequence[Point], box: Box) -> float:
     """Proximity score dùng face diagonal thay vì avg(w,h) cho chuẩn hơn."""
-    if not points:
+    point_array = _as_landmark_array(points)
+    if len(point_array) == 0:
         return 0.0
     reference = max(box.diagonal, 1.0)
-    minimum_distance = min(_point_to_box_distance(point, box) for point in points)
+    minimum_distance = float(_box_distances(point_array, _box_row(box)).min())
     return max(0.0, 1.0 - minimum_distance / reference)
 
 
-def _palm_center(hand_points: Sequence[Point]) -> Point | None:
+def _box_row(box: Box) -> np.ndarray:
+    return np.array([[box.x, box.y, box.width, box.height]], dtype=np.float64)
+
+
+def _inside_box_mask(points: LandmarkArray, box: Box) -> np.ndarray:
+    xs = points[:, 0]
+    ys = points[:, 1]
+    return (
+        (box.x <= xs) & (xs <= box.x + box.width)
+        & (box.y <= ys) & (ys <= box.y + box.height)
+    )
+
+
+def _palm_center(hand_points: LandmarkArray | Sequence[Point]) -> Point | None:
     """Tính tâm lòng bàn tay từ wrist + MCP joints."""
-    centers = [hand_points[i] for i in PALM_CENTER_INDICES if i < len(hand_points)]
-    if not centers:
+    centers = _landmark_rows(_as_landmark_array(hand_points), _PALM_CENTER_ROWS)
+    if len(centers) == 0:
         return None
-    cx = sum(p.x for p in centers) / len(centers)
-    cy = sum(p.y for p in centers) / len(centers)
+    cx = float(centers[:, 0].sum()) / len(centers)
+    cy = float(centers[:, 1].sum()) / len(centers)
     return Point(x=cx, y=cy)
 
 
@@ -588,7 +1571,7 @@ def _face_coverage_by_hand(hand_box: Box, face_box: Box) -> float:
     return ((x_right - x_left) * (y_bottom - y_top)) / max(face_box.area, 1.0)
 
 
-def _hand_z_protrusion_score(hand_points: Sequence[Point]) -> float:
+def _hand_z_protrusion_score(hand_points: LandmarkArray | Sequence[Point]) -> float:
     """Estimate how much the hand protrudes toward the camera.
 
     MediaPipe hand z is relative to the wrist and smaller values are closer to
@@ -596,23 +1579,20 @@ def _hand_z_protrusion_score(hand_points: Sequence[Point]) -> float:
     hand-internal depth: fingertips/joints far in front of the wrist are a
     strong signal that the hand is being held toward the lens.
     """
-    if not hand_points or WRIST_INDEX >= len(hand_points):
+    hand = _as_landmark_array(hand_points)
+    if len(hand) == 0 or WRIST_INDEX >= len(hand):
         return 0.0
 
-    wrist_z = hand_points[WRIST_INDEX].z
-    contact_z_values = [
-        hand_points[index].z for index in ALL_CONTACT_INDICES if index < len(hand_points)
-    ]
-    palm_z_values = [
-        hand_points[index].z for index in PALM_CENTER_INDICES if index < len(hand_points)
-    ]
-    if not contact_z_values:
+    wrist_z = float(hand[WRIST_INDEX, 2])
+    contact_z_values = _landmark_rows(hand, _CONTACT_ROWS)[:, 2]
+    palm_z_values = _landmark_rows(hand, _PALM_CENTER_ROWS)[:, 2]
+    if len(contact_z_values) == 0:
         return 0.0
 
-    closest_contact_z = min(contact_z_values)
+    closest_contact_z = float(contact_z_values.min())
     avg_palm_z = (
-        sum(palm_z_values) / len(palm_z_values)
-        if palm_z_values
+        float(palm_z_values.sum()) / len(palm_z_values)
+        if len(palm_z_values)
         else wrist_z
     )
     protrusion = max(wrist_z - closest_contact_z, avg_palm_z - closest_contact_z, 0.0)
@@ -646,7 +1626,7 @@ def _hand_projection_score(hand_box: Box, face_box: Box) -> float:
 
 
 def _hand_depth_assessment(
-    hand_points: Sequence[Point],
+    hand_points: LandmarkArray | Sequence[Point],
     hand_box: Box,
     face_box: Box,
 ) -> DepthAssessment:
@@ -701,26 +1681,26 @@ def _hand_depth_assessment(
     )
 
 
-def _face_points_occluded_by_hand(face_points: Sequence[Point], hand_box: Box) -> float:
+def _face_points_occluded_by_hand(
+    face_points: LandmarkArray | Sequence[Point],
+    hand_box: Box,
+) -> float:
     """Tỉ lệ face contour points nằm trong hand bounding box.
 
     Khi tay ở TRƯỚC mặt (giữa camera và mặt), phần lớn face landmarks
     bị hand box bao phủ (>40%). Khi chạm mặt thật từ bên cạnh, chỉ có
     một phần nhỏ face landmarks nằm trong hand box (<30%).
     """
-    if not face_points:
+    face = _as_landmark_array(face_points)
+    if len(face) == 0:
         return 0.0
-    inside = sum(
-        1 for p in face_points
-        if (hand_box.x <= p.x <= hand_box.x + hand_box.width
-            and hand_box.y <= p.y <= hand_box.y + hand_box.height)
-    )
-    return inside / len(face_points)
+    inside = int(np.count_nonzero(_inside_box_mask(face, hand_box)))
+    return inside / len(face)
 
 
 def _fingertip_contact_score(
-    hand_points: Sequence[Point],
-    face_points: Sequence[Point],
+    hand_points: LandmarkArray | Sequence[Point],
+    face_points: LandmarkArray | Sequence[Point],
     face_box: Box,
 ) -> float:
     """Kiểm tra xem bất kỳ điểm nào trên bàn tay có chạm vào gần khuôn mặt không.
@@ -730,37 +1710,29 @@ def _fingertip_contact_score(
     Dùng toàn bộ 468 face landmarks để phát hiện tiếp xúc ở bất kỳ vùng nào.
     Trả về score 0-1: 1.0 nếu có điểm tay sát mặt, 0.0 nếu xa.
     """
-    if not hand_points or not face_points:
+    hand = _as_landmark_array(hand_points)
+    face = _as_landmark_array(face_points)
+    if len(hand) == 0 or len(face) == 0:
         return 0.0
 
-    contact_joints = [hand_points[i] for i in ALL_CONTACT_INDICES if i < len(hand_points)]
-    if not contact_joints:
+    contact_joints = _landmark_rows(hand, _CONTACT_ROWS)
+    if len(contact_joints) == 0:
         return 0.0
 
     contact_dist = face_box.diagonal * settings.FACE_TOUCH_CONTACT_RATIO
     soft_dist = contact_dist * settings.FACE_TOUCH_CONTACT_SOFT_MULT
 
-    face_xs = [fp.x for fp in face_points]
-    face_ys = [fp.y for fp in face_points]
-
-    best_score = 0.0
-    for joint in contact_joints:
-        min_d_sq = float("inf")
-        jx, jy = joint.x, joint.y
-        for fx, fy in zip(face_xs, face_ys):
-            d_sq = (jx - fx) ** 2 + (jy - fy) ** 2
-            if d_sq < min_d_sq:
-                min_d_sq = d_sq
-        min_d = math.sqrt(min_d_sq)
+    # (joints × face points) squared distances; nearest face point per joint
+    dx = contact_joints[:, 0:1] - face[:, 0]
+    dy = contact_joints[:, 1:2] - face[:, 1]
+    min_d = np.sqrt((dx * dx + dy * dy).min(axis=1))
 
-        if min_d <= contact_dist:
-            return 1.0
-        if min_d <= soft_dist:
-            s = 1.0 - (min_d - contact_dist) / (soft_dist - contact_dist)
-            if s > best_score:
-                best_score = s
-
-    return best_score
+    if bool((min_d <= contact_dist).any()):
+        return 1.0
+    soft_d = min_d[min_d <= soft_dist]
+    if len(soft_d) == 0:
+        return 0.0
+    return max(0.0, float((1.0 - (soft_d - contact_dist) / (soft_dist - contact_dist)).max()))
 
 
 def _in_front_of_face_penalty(occlusion_ratio: float, hand_box: Box, face_box: Box) -> float:
@@ -795,7 +1767,7 @@ def _in_front_of_face_penalty(occlusion_ratio: float, hand_box: Box, face_box: B
 def _hand_in_front_confidence(
     hand_box: Box,
     face_box: Box,
-    face_points: Sequence[Point],
+    face_points: LandmarkArray | Sequence[Point],
 ) -> float:
     """Ước lượng xác suất tay đang ở TRƯỚC mặt thay vì chạm mặt.
 
@@ -831,21 +1803,13 @@ def _hand_in_front_confidence(
         face_coverage = 0.0
 
     # Signal 3: Đối xứng — hand che cả hai bên mặt đều nhau
-    left_occ = 0
-    right_occ = 0
-    left_total = 0
-    right_total = 0
-    for p in face_points:
-        inside = (hand_box.x <= p.x <= hand_box.x + hand_box.width
-                  and hand_box.y <= p.y <= hand_box.y + hand_box.height)
-        if p.x < face_cx:
-            left_total += 1
-            if inside:
-                left_occ += 1
-        else:
-            right_total += 1
-            if inside:
-                right_occ += 1
+    face = _as_landmark_array(face_points)
+    inside = _inside_box_mask(face, hand_box)
+    left_side = face[:, 0] < face_cx
+    left_total = int(np.count_nonzero(left_side))
+    right_total = len(face) - left_total
+    left_occ = int(np.count_nonzero(inside & left_side))
+    right_occ = int(np.count_nonzero(inside & ~left_side))
 
     left_ratio = left_occ / max(left_total, 1)
     right_ratio = right_occ / max(right_total, 1)
@@ -871,13 +1835,17 @@ def _hand_in_front_confidence(
     return _clamp_score(confidence)
 
 
-def _region_box(face_box: Box, relative_box: Tuple[float, float, float, float]) -> Box:
-    left, top, right, bottom = relative_box
-    return Box(
-        x=face_box.x + face_box.width * left,
-        y=face_box.y + face_box.height * top,
-        width=face_box.width * (right - left),
-        height=face_box.height * (bottom - top),
+def _region_boxes(face_box: Box) -> np.ndarray:
+    """All SENSITIVE_REGIONS of ``face_box`` as a (7, 4) array of x, y, w, h."""
+    left, top, right, bottom = _REGION_BOUNDS.T
+    return np.stack(
+        (
+            face_box.x + face_box.width * left,
+            face_box.y + face_box.height * top,
+            face_box.width * (right - left),
+            face_box.height * (bottom - top),
+        ),
+        axis=1,
     )
 
 
@@ -893,47 +1861,79 @@ def _clamp_score(score: float) -> float:
     return max(0.0, min(score, 1.0))
 
 
-def _face_landmark_subset(face_points: Sequence[Point]) -> List[Point]:
+def _face_landmark_subset(face_points: LandmarkArray) -> LandmarkArray:
     """Dùng full face contour + key points cho bounding box chính xác."""
-    subset = []
-    for index in FACE_BOUNDING_INDICES_FULL:
-        if index < len(face_points):
-            subset.append(face_points[index])
-    return subset or list(face_points)
+    subset = _landmark_rows(face_points, _FACE_BOUNDING_ROWS)
+    return subset if len(subset) else face_points
 
 
-def _face_overlay_subset(face_points: Sequence[Point]) -> List[Point]:
+def _face_overlay_subset(face_points: LandmarkArray) -> LandmarkArray:
     """Subset cho overlay visualization."""
-    subset = []
-    for index in FACE_OVERLAY_INDICES:
-        if index < len(face_points):
-            subset.append(face_points[index])
-    return subset or list(face_points)
+    subset = _landmark_rows(face_points, _FACE_OVERLAY_ROWS)
+    return subset if len(subset) else face_points
 
 
-def _hand_subset(hand_points: Sequence[Point]) -> List[Point]:
-    """Trả về fingertips + knuckles cho overlay và tính toán."""
-    indices = set(FINGERTIP_INDICES) | set(KNUCKLE_INDICES) | {WRIST_INDEX}
-    subset = []
-    for index in sorted(indices):
-        if index < len(hand_points):
-            subset.append(hand_points[index])
-    return subset or list(hand_points)
+def _hand_bounding_points(hand_points: LandmarkArray) -> LandmarkArray:
+    """Dùng tất cả fingertips + knuckles + wrist cho hand box chính xác hơn."""
+    return _landmark_rows(hand_points, _HAND_SUBSET_ROWS)
 
 
-def _hand_bounding_points(hand_points: Sequence[Point]) -> List[Point]:
-    """Dùng tất cả fingertips + knuckles + wrist cho hand box chính xác hơn."""
-    indices = set(FINGERTIP_INDICES) | set(KNUCKLE_INDICES) | {WRIST_INDEX}
-    return [hand_points[i] for i in sorted(indices) if i < len(hand_points)]
+def warm_up_face_touch_worker() -> dict[str, object]:
+    """Load and exercise every model on the calling worker thread / process.
 
+    The first ``process()`` of a MediaPipe graph costs tens to hundreds of ms
+    and the Haar cascade is parsed on first use, so without this the first
+    frames after a deploy pay for it. Also pre-warms up to
+    ``FACE_TOUCH_WARMUP_SESSION_RUNTIMES`` session runtimes in this process.
+    """
+    global _spare_runtimes_pending
 
-def get_face_touch_runtime_status() -> dict[str, object]:
+    _require_dependencies()
+    started_at = time.perf_counter()
+    frame = _FrameContext(np.full((240, 320, 3), 128, dtype=np.uint8))
+    rgb_frame = frame.rgb
+
+    runtime = _thread_runtime()
+    for model in (runtime.face_mesh(), runtime.face_mesh_static(), runtime.face_detection(), runtime.hands()):
+        model.process(rgb_frame)
+    _opencv_face_box(frame)
+
+    with _spare_runtimes_lock:
+        missing = settings.FACE_TOUCH_WARMUP_SESSION_RUNTIMES - len(_spare_runtimes) - _spare_runtimes_pending
+        missing = max(missing, 0)
+        _spare_runtimes_pending += missing
+    for _ in range(missing):
+        spare = _new_runtime()
+        try:
+            for model in (spare.face_mesh(), spare.hands(), spare.hands_roi()):
+                model.process(rgb_frame)
+        finally:
+            with _spare_runtimes_lock:
+                _spare_runtimes_pending -= 1
+                _spare_runtimes.append(spare)
+
+    return {
+        "pid": os.getpid(),
+        "thread": threading.current_thread().name,
+        "warmupMs": round((time.perf_counter() - started_at) * 1000, 1),
+        "spareRuntimes": missing,
+    }
+
+
+def get_face_touch_runtime_status(load_models: bool = True) -> dict[str, object]:
+    """Dependency / model readiness.
+
+    ``load_models=False`` only checks dependencies: once workers are warmed
+    up, building graphs on the caller (the event loop) would be wasted work.
+    """
     try:
         _require_dependencies()
-        _runtime.face_mesh()
-        _runtime.face_mesh_static()
-        _runtime.face_detection()
-        _runtime.hands()
+        if load_models:
+            runtime = _thread_runtime()
+            runtime.face_mesh()
+            runtime.face_mesh_static()
+            runtime.face_detection()
+            runtime.hands()
     except Exception as error:
         return {
             "available": False,
@@ -943,54 +1943,572 @@ def get_face_touch_runtime_status() -> dict[str, object]:
     return {
         "available": True,
         "message": "Face-touch runtime is ready.",
+        "backend": settings.FACE_TOUCH_BACKEND,
+        "sessions": _session_pool.stats(),
     }
 
 
-def analyze_face_touch_frame(request: FaceTouchAnalyzeRequest) -> FaceTouchAnalyzeResponse:
+def analyze_face_touch_frame(
+    request: FaceTouchAnalyzeRequest,
+    load_hint: float = 0.0,
+) -> FaceTouchAnalyzeResponse:
+    """Analyze one frame synchronously.
+
+    CPU-bound: routers must dispatch this through ``face_touch_executor``
+    instead of calling it on the event loop. When ``request.session_id`` is
+    set, the frame runs through that session's own temporal trackers and
+    face keyframe scheduler (driven by ``timestamp`` / ``sample_rate_fps``).
+    ``load_hint`` is the worker-pool utilization at submit time (>= 1.0 means
+    frames are queued); saturated pools make sessions shed resolution.
+    """
+    _require_dependencies()
+
+    started_at = time.perf_counter()
+    with _stage_timings():
+        with _stage("decode"):
+            frame = _decode_frame(_payload_bytes(request.image), settings.FACE_TOUCH_PROCESS_WIDTH)
+        return _analyze_decoded_frame(
+            frame,
+            request.session_id,
+            started_at,
+            timestamp_ms=request.timestamp,
+            sample_rate_fps=request.sample_rate_fps,
+            load_hint=load_hint,
+            overlay_mode=request.overlay_mode,
+            max_faces=request.max_faces,
+        )
+
+
+def analyze_face_touch_bytes(
+    image_bytes: bytes,
+    session_id: str | None = None,
+    timestamp_ms: float | None = None,
+    sample_rate_fps: int = 10,
+    load_hint: float = 0.0,
+    overlay_mode: str = "full",
+    max_faces: int = 1,
+) -> FaceTouchAnalyzeResponse:
+    """Same as ``analyze_face_touch_frame`` for raw encoded image bytes."""
     _require_dependencies()
 
     started_at = time.perf_counter()
-    frame = _decode_image(request.image)
-    original_height, original_width = frame.shape[:2]
+    with _stage_timings():
+        with _stage("decode"):
+            frame = _decode_frame(image_bytes, settings.FACE_TOUCH_PROCESS_WIDTH)
+        return _analyze_decoded_frame(
+            frame,
+            session_id,
+            started_at,
+            timestamp_ms=timestamp_ms,
+            sample_rate_fps=sample_rate_fps,
+            load_hint=load_hint,
+            overlay_mode=overlay_mode,
+            max_faces=max_faces,
+        )
+
+
+def decode_frame(payload: str | bytes) -> _FrameContext:
+    """Decode a base64 string / data URL or encoded image bytes for ``analyze_decoded_frame``.
+
+    For callers that keep decode and analysis apart (batch analysis);
+    decodes toward ``FACE_TOUCH_PROCESS_WIDTH`` like the request paths.
+    """
+    _require_dependencies()
+    raw_bytes = _payload_bytes(payload) if isinstance(payload, str) else payload
+    return _decode_frame(raw_bytes, settings.FACE_TOUCH_PROCESS_WIDTH)
+
+
+def analyze_decoded_frame(
+    frame: _FrameContext | np.ndarray,
+    session_id: str | None = None,
+    timestamp_ms: float | None = None,
+    sample_rate_fps: int = 10,
+    overlay_mode: str = "full",
+    started_at: float | None = None,
+) -> FaceTouchAnalyzeResponse:
+    """Same as ``analyze_face_touch_bytes`` for a ``decode_frame`` result or a BGR array (video frames).
+
+    ``started_at`` (``time.perf_counter()``) lets the reported latency
+    include work done before the call, such as decoding.
+    """
+    _require_dependencies()
+
+    if isinstance(frame, np.ndarray):
+        frame = _FrameContext(frame)
+    return _analyze_decoded_frame(
+        frame,
+        session_id,
+        time.perf_counter() if started_at is None else started_at,
+        timestamp_ms=timestamp_ms,
+        sample_rate_fps=sample_rate_fps,
+        overlay_mode=overlay_mode,
+    )
 
-    # Downscale cho processing nhanh hơn
-    processed_frame, scale = _downscale_frame(frame, settings.FACE_TOUCH_PROCESS_WIDTH)
-    proc_h, proc_w = processed_frame.shape[:2]
-    rgb_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
 
-    hand_results = _runtime.hands().process(rgb_frame)
-    face_data = _extract_face_points(processed_frame, rgb_frame)
+def _analyze_decoded_frame(
+    frame: _FrameContext,
+    session_id: str | None,
+    started_at: float,
+    timestamp_ms: float | None = None,
+    sample_rate_fps: int = 10,
+    load_hint: float = 0.0,
+    overlay_mode: str = "full",
+    max_faces: int = 1,
+) -> FaceTouchAnalyzeResponse:
+    original_width = frame.source_size[0]
+    max_faces = max(1, min(max_faces, settings.FACE_TOUCH_MULTI_FACE_MAX))
+
+    with _tracking_session(session_id) as session:
+        if session is None:
+            frame_ms = 0.0
+            process_width = settings.FACE_TOUCH_PROCESS_WIDTH
+        else:
+            frame_ms = session.face_track.advance_clock(timestamp_ms, sample_rate_fps)
+            process_width = session.resolution.choose(original_width, load_hint)
+
+        # Downscale cho processing nhanh hơn (width adaptive theo session)
+        analyze = _analyze_processed_frame if max_faces == 1 else _analyze_multi_face_frame
+        return analyze(
+            session,
+            frame.downscaled(process_width),
+            started_at,
+            frame_ms,
+            overlay_mode,
+            max_faces,
+        )
+
 
+def _detect_hands(
+    runtime: LandmarkRuntime,
+    frame: _FrameContext,
+    crop: Box | None,
+    max_hands: int = 2,
+) -> List[LandmarkArray]:
+    """Hand landmarks in processed-frame pixels, from the full frame or a crop."""
+    proc_h, proc_w = frame.shape
+    if crop is None:
+        rgb_frame = frame.rgb
+        hands = runtime.hands() if max_hands <= 2 else runtime.hands_multi()
+        with _stage("hands"):
+            hand_results = hands.process(rgb_frame)
+        return [
+            _landmarks_to_array(hand_landmarks.landmark, proc_w, proc_h)
+            for hand_landmarks in (hand_results.multi_hand_landmarks or [])[:max_hands]
+        ]
+
+    roi_rgb = frame.rgb_crop(*_box_bounds(crop, proc_w, proc_h))
+    with _stage("hands_roi"):
+        hand_results = runtime.hands_roi().process(roi_rgb)
+    hand_point_sets = []
+    for hand_landmarks in (hand_results.multi_hand_landmarks or [])[:2]:
+        points = _roi_landmarks_to_array(hand_landmarks.landmark, crop)
+        # Hand z shares the x scale of the image it was inferred on; bring it
+        # back to full-frame scale so the depth thresholds keep their meaning.
+        points[:, 2] *= crop.width / proc_w
+        hand_point_sets.append(points)
+    return hand_point_sets
+
+
+def _analyze_processed_frame(
+    session: _FaceTouchSession | None,
+    frame: _FrameContext,
+    started_at: float,
+    frame_ms: float,
+    overlay_mode: str = "full",
+    max_faces: int = 1,
+) -> FaceTouchAnalyzeResponse:
+    proc_h, proc_w = frame.shape
+    scale = frame.scale
+    runtime = session.runtime if session is not None else _thread_runtime()
+    face_track = session.face_track if session is not None else None
+
+    hand_crop = session.hand_roi.crop(scale, proc_w, proc_h) if session is not None else None
+    hand_point_sets = _detect_hands(runtime, frame, hand_crop)
+
+    face_data = None
+    face_path = None
+    if face_track is not None:
+        face_data = face_track.reuse(frame, hand_point_sets, frame_ms)
+        if face_data is not None:
+            face_path = "reused"
     if face_data is None:
-        latency_ms = int((time.perf_counter() - started_at) * 1000)
-        return FaceTouchAnalyzeResponse(
-            state="safe",
-            score=0,
-            alert=False,
-            regions=[],
-            hands=0,
-            faceDetected=False,
-            latencyMs=latency_ms,
-            note="Không phát hiện khuôn mặt trong frame hiện tại.",
-            frameSize={"width": original_width, "height": original_height},
-            overlay={"faceBox": None, "handBoxes": [], "facePoints": [], "handPoints": []},
-            debug={
-                "overlapScore": 0,
-                "proximityScore": 0,
-                "fingertipScore": 0,
-            },
+        extracted = _extract_face_points(
+            runtime,
+            _thread_runtime(),
+            frame,
+            roi_hint=session.resolution.roi_hint(scale) if session is not None else None,
         )
+        if extracted is not None:
+            face_points, face_box, face_path = extracted
+            face_data = (face_points, face_box)
+        if face_track is not None:
+            face_track.refresh(frame, face_data, frame_ms)
+
+    if session is not None and session.capture is not None:
+        session.capture.append(frame_ms, proc_w, proc_h, face_data, hand_point_sets)
+
+    if face_data is None:
+        return _no_face_response(session, frame, started_at, frame_ms, overlay_mode, hand_crop, hand_point_sets)
 
     face_points, face_box = face_data
+    with _stage("scoring"):
+        scores = _score_face_touch(face_points, face_box, hand_point_sets, proc_w, proc_h)
+
+    persistence = None
+    latency_ms = int((time.perf_counter() - started_at) * 1000)
+    if session is not None:
+        session.face_track.last_state = scores.state
+        persistence = session.events.update(
+            frame_ms,
+            scores.touch_score,
+            scores.near_score,
+            scores.regions,
+        )
+        session.resolution.observe(scale, face_box, scores.hand_boxes, face_path, latency_ms)
+        session.hand_roi.observe(scale, face_box, hand_crop, hand_point_sets, proc_w, proc_h)
+
+    return _face_response(
+        frame,
+        face_box,
+        scores,
+        latency_ms,
+        overlay_mode,
+        persistence,
+        face_path=face_path,
+        hand_roi=hand_crop is not None,
+    )
 
+
+def _analyze_multi_face_frame(
+    session: _FaceTouchSession | None,
+    frame: _FrameContext,
+    started_at: float,
+    frame_ms: float,
+    overlay_mode: str = "full",
+    max_faces: int = 2,
+) -> FaceTouchAnalyzeResponse:
+    """Up to ``max_faces`` faces, each scored only against the hands assigned to it.
+
+    One multi-face FaceMesh pass, one Hands pass for up to two hands per face
+    and one ``_score_face_touch`` per face, so the cost grows linearly with
+    the number of faces. Face keyframe reuse and the hand ROI crop assume a
+    single face and are skipped; the session's persistence follows the most
+    alarming face.
+    """
+    proc_h, proc_w = frame.shape
+    scale = frame.scale
+    runtime = session.runtime if session is not None else _thread_runtime()
+
+    hand_point_sets = _detect_hands(runtime, frame, None, max_hands=2 * max_faces)
+    faces, face_path = _extract_faces(runtime, _thread_runtime(), frame, max_faces)
+    if session is not None:
+        # Keep the single-face trackers from resuming on stale state.
+        session.face_track.refresh(frame, None, frame_ms)
+    if not faces:
+        return _no_face_response(session, frame, started_at, frame_ms, overlay_mode, None, hand_point_sets)
+
+    with _stage("scoring"):
+        assigned = _assign_hands_to_faces([box for _, box in faces], hand_point_sets, proc_w, proc_h)
+        face_scores = [
+            _score_face_touch(face_points, face_box, hands, proc_w, proc_h)
+            for (face_points, face_box), hands in zip(faces, assigned)
+        ]
+    primary = max(
+        range(len(faces)),
+        key=lambda index: (
+            _STATE_SEVERITY[face_scores[index].state],
+            face_scores[index].score,
+        ),
+    )
+    scores = face_scores[primary]
+    face_box = faces[primary][1]
+
+    persistence = None
+    latency_ms = int((time.perf_counter() - started_at) * 1000)
+    if session is not None:
+        session.face_track.last_state = scores.state
+        persistence = session.events.update(
+            frame_ms,
+            scores.touch_score,
+            scores.near_score,
+            scores.regions,
+        )
+        # The smallest face decides how much resolution the frame needs.
+        smallest = min((box for _, box in faces), key=lambda box: box.width)
+        session.resolution.observe(
+            scale,
+            smallest,
+            [box for face in face_scores for box in face.hand_boxes],
+            face_path,
+            latency_ms,
+        )
+        session.hand_roi.observe(scale, None, None, hand_point_sets, proc_w, proc_h)
+
+    inv_scale = 1.0 / scale if scale != 1.0 else 1.0
+    response = _face_response(
+        frame,
+        face_box,
+        scores,
+        latency_ms,
+        overlay_mode,
+        persistence,
+        face_path=face_path,
+        hand_roi=False,
+        overlay_scores=face_scores,
+    )
+    response.faces = [
+        FaceTouchFaceResult(
+            index=index,
+            state=face.state,
+            score=round(face.score, 4),
+            regions=face.regions,
+            hands=min(len(face.hand_boxes), 2),
+            touchScore=round(face.touch_score, 4),
+            nearScore=round(face.near_score, 4),
+            faceBox=DetectionOverlayBox(**_overlay_box(box, inv_scale)),
+        )
+        for index, ((_, box), face) in enumerate(zip(faces, face_scores))
+    ]
+    return response
+
+
+def _no_face_response(
+    session: _FaceTouchSession | None,
+    frame: _FrameContext,
+    started_at: float,
+    frame_ms: float,
+    overlay_mode: str,
+    hand_crop: Box | None,
+    hand_point_sets: Sequence[LandmarkArray],
+) -> FaceTouchAnalyzeResponse:
+    original_width, original_height = frame.source_size
+    proc_h, proc_w = frame.shape
+    persistence = None
+    latency_ms = int((time.perf_counter() - started_at) * 1000)
+    if session is not None:
+        session.face_track.last_state = "safe"
+        persistence = session.events.update(frame_ms, 0.0, 0.0)
+        session.resolution.observe(frame.scale, None, [], None, latency_ms)
+        session.hand_roi.observe(frame.scale, None, hand_crop, hand_point_sets, proc_w, proc_h)
+    return FaceTouchAnalyzeResponse(
+        state="safe",
+        score=0,
+        alert=False,
+        regions=[],
+        hands=0,
+        faceDetected=False,
+        latencyMs=latency_ms,
+        note="Không phát hiện khuôn mặt trong frame hiện tại.",
+        frameSize={"width": original_width, "height": original_height},
+        overlay=_build_overlay(overlay_mode, None, [], None, None, 1.0),
+        debug={
+            "overlapScore": 0,
+            "proximityScore": 0,
+            "fingertipScore": 0,
+            "processWidth": proc_w,
+            "facePath": None,
+            "handRoi": hand_crop is not None,
+            "stages": _current_stages(),
+        },
+        persistence=persistence,
+    )
+
+
+def _face_response(
+    frame: _FrameContext,
+    face_box: Box,
+    scores: FaceTouchScores,
+    latency_ms: int,
+    overlay_mode: str,
+    persistence: FaceTouchPersistence | None,
+    face_path: str | None,
+    hand_roi: bool,
+    overlay_scores: Sequence[FaceTouchScores] | None = None,
+) -> FaceTouchAnalyzeResponse:
+    original_width, original_height = frame.source_size
+    proc_w = frame.shape[1]
+    scale = frame.scale
+    state = scores.state
+    hand_boxes = scores.hand_boxes
+    alert = state == "touching_face"
+
+    if not hand_boxes:
+        note = "Đã phát hiện khuôn mặt nhưng chưa có bàn tay nào đi vào vùng phân tích."
+    elif state == "touching_face":
+        note = "Phát hiện tay chạm hoặc che vùng mặt nhạy cảm, nên phát cảnh báo tức thời."
+    elif state == "near_face":
+        note = "Có dấu hiệu tay tiến gần mặt. Persistence score được tích lũy theo session (xem persistence)."
+    elif scores.largest_hand_face_ratio > settings.FACE_TOUCH_HAND_FACE_RATIO_SOFT_MAX:
+        note = "Phát hiện tay ở rất gần camera nhưng chưa đủ bằng chứng để kết luận là chạm mặt."
+    else:
+        note = "Tay xuất hiện nhưng vẫn giữ khoảng cách an toàn với khuôn mặt."
+
+    # Scale tọa độ về kích thước frame gốc cho overlay
+    inv_scale = 1.0 / scale if scale != 1.0 else 1.0
+    if overlay_scores is None:
+        overlay_hand_boxes = hand_boxes
+        face_overlay_points = scores.face_overlay_points
+        hand_overlay_points = scores.hand_overlay_points
+    else:
+        overlay_hand_boxes = [box for face in overlay_scores for box in face.hand_boxes]
+        face_overlay_points = np.concatenate([face.face_overlay_points for face in overlay_scores])
+        hand_overlay_points = np.concatenate([face.hand_overlay_points for face in overlay_scores])
+
+    return FaceTouchAnalyzeResponse(
+        state=state,
+        score=round(scores.score, 4),
+        alert=alert,
+        regions=scores.regions,
+        hands=min(len(hand_boxes), 2),
+        faceDetected=True,
+        latencyMs=latency_ms,
+        note=note,
+        frameSize={"width": original_width, "height": original_height},
+        overlay=_build_overlay(
+            overlay_mode,
+            face_box,
+            overlay_hand_boxes,
+            face_overlay_points,
+            hand_overlay_points,
+            inv_scale,
+        ),
+        debug={
+            "overlapScore": round(_clamp_score(scores.overlap_score), 4),
+            "proximityScore": round(_clamp_score(scores.proximity_score), 4),
+            "fingertipScore": round(_clamp_score(scores.fingertip_score), 4),
+            "inFrontScore": round(_clamp_score(scores.in_front_score), 4),
+            "depthScore": round(_clamp_score(scores.depth_score), 4),
+            "touchScore": round(scores.touch_score, 4),
+            "nearScore": round(scores.near_score, 4),
+            "faceReused": face_path == "reused",
+            "processWidth": proc_w,
+            "facePath": face_path,
+            "handRoi": hand_roi,
+            "stages": _current_stages(),
+        },
+        persistence=persistence,
+    )
+
+
+def _build_overlay(
+    overlay_mode: str,
+    face_box: Box | None,
+    hand_boxes: Sequence[Box],
+    face_points: LandmarkArray | None,
+    hand_points: LandmarkArray | None,
+    inv_scale: float,
+) -> DetectionOverlay | CompactDetectionOverlay | None:
+    """Overlay in original-frame pixels, shaped by ``overlay_mode``."""
+    if overlay_mode == "none":
+        return None
+    if overlay_mode == "compact":
+        return CompactDetectionOverlay(
+            faceBox=_compact_box(face_box, inv_scale) if face_box is not None else None,
+            handBoxes=[_compact_box(box, inv_scale) for box in hand_boxes],
+            facePoints=_compact_points(face_points, inv_scale),
+            handPoints=_compact_points(hand_points, inv_scale),
+        )
+    return DetectionOverlay(
+        faceBox=_overlay_box(face_box, inv_scale) if face_box is not None else None,
+        handBoxes=[_overlay_box(box, inv_scale) for box in hand_boxes],
+        facePoints=_overlay_points(face_points, inv_scale),
+        handPoints=_overlay_points(hand_points, inv_scale),
+    )
+
+
+def _overlay_box(box: Box, inv_scale: float) -> dict[str, float]:
+    return {
+        "x": round(box.x * inv_scale, 2),
+        "y": round(box.y * inv_scale, 2),
+        "width": round(box.width * inv_scale, 2),
+        "height": round(box.height * inv_scale, 2),
+    }
+
+
+def _overlay_points(points: LandmarkArray | None, inv_scale: float) -> List[dict[str, float]]:
+    if points is None:
+        return []
+    return [
+        {"x": round(x * inv_scale, 2), "y": round(y * inv_scale, 2)}
+        for x, y in points[:, :2].tolist()
+    ]
+
+
+def _compact_box(box: Box, inv_scale: float) -> List[int]:
+    return [
+        int(round(value * inv_scale))
+        for value in (box.x, box.y, box.width, box.height)
+    ]
+
+
+def _compact_points(points: LandmarkArray | None, inv_scale: float) -> List[int]:
+    if points is None or len(points) == 0:
+        return []
+    return np.rint(points[:, :2] * inv_scale).astype(np.int32).ravel().tolist()
+
+
+_STATE_SEVERITY = {"safe": 0, "near_face": 1, "touching_face": 2}
+
+
+def _assign_hands_to_faces(
+    face_boxes: Sequence[Box],
+    hand_point_sets: Sequence[LandmarkArray],
+    frame_width: int,
+    frame_height: int,
+) -> List[List[LandmarkArray]]:
+    """Give every hand to the face it most plausibly belongs to (max two per face).
+
+    Affinity is the hand box overlap with the face's expanded box plus the
+    palm proximity to it; hands near no face go to the face whose center is
+    closest relative to its size. O(hands × faces).
+    """
+    expanded_boxes = [
+        _expand_box(box, frame_width, frame_height, _adaptive_face_margin(box, frame_width, frame_height))
+        for box in face_boxes
+    ]
+    candidates: List[List[Tuple[float, int, LandmarkArray]]] = [[] for _ in face_boxes]
+    for hand_index, points in enumerate(hand_point_sets):
+        hand_box = _points_box(_hand_bounding_points(points)) or _points_box(points)
+        if hand_box is None:
+            continue
+        palm = _palm_center(points)
+        anchor = (palm.x, palm.y) if palm is not None else hand_box.center
+        best_index, best_key = 0, None
+        for face_index, (face_box, expanded_box) in enumerate(zip(face_boxes, expanded_boxes)):
+            affinity = _intersection_ratio(hand_box, expanded_box) + _palm_to_face_score(palm, expanded_box)
+            center_x, center_y = face_box.center
+            distance = math.hypot(anchor[0] - center_x, anchor[1] - center_y) / max(face_box.diagonal, 1.0)
+            key = (affinity, -distance)
+            if best_key is None or key > best_key:
+                best_index, best_key = face_index, key
+        candidates[best_index].append((best_key[0], hand_index, points))
+
+    assigned = []
+    for face_candidates in candidates:
+        face_candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+        assigned.append([points for _, _, points in face_candidates[:2]])
+    return assigned
+
+
+def _score_face_touch(
+    face_points: LandmarkArray,
+    face_box: Box,
+    hand_point_sets: Sequence[LandmarkArray],
+    frame_width: int,
+    frame_height: int,
+) -> FaceTouchScores:
+    """Pure geometry scoring of one face against up to two hands.
+
+    No MediaPipe/OpenCV calls: everything here works on landmark arrays in
+    processed-frame pixels, with the 7 sensitive regions scored at once.
+    """
     # Adaptive margin: mặt xa → margin lớn, mặt gần → margin nhỏ
-    margin_ratio = _adaptive_face_margin(face_box, proc_w, proc_h)
-    expanded_face_box = _expand_box(face_box, proc_w, proc_h, margin_ratio)
+    margin_ratio = _adaptive_face_margin(face_box, frame_width, frame_height)
+    expanded_face_box = _expand_box(face_box, frame_width, frame_height, margin_ratio)
 
-    hand_landmark_sets = hand_results.multi_hand_landmarks or []
     hand_boxes: List[Box] = []
-    hand_points_output: List[Point] = []
-    regions_triggered: set[str] = set()
+    hand_overlay_sets: List[LandmarkArray] = []
+    region_triggered = np.zeros(len(REGION_NAMES), dtype=bool)
     overlap_scores: List[float] = []
     proximity_scores: List[float] = []
     fingertip_scores: List[float] = []
@@ -998,34 +2516,30 @@ def analyze_face_touch_frame(request: FaceTouchAnalyzeRequest) -> FaceTouchAnaly
     depth_scores: List[float] = []
     near_scores: List[float] = []
     touch_scores: List[float] = []
+    in_front_scores: List[float] = []
+    hand_face_ratios: List[float] = []
 
     face_overlay_pts = _face_overlay_subset(face_points)
 
-    touch_region_boxes = {
-        name: _region_box(face_box, relative_box)
-        for name, relative_box in SENSITIVE_REGIONS.items()
-    }
-    near_region_boxes = {
-        name: _region_box(expanded_face_box, relative_box)
-        for name, relative_box in SENSITIVE_REGIONS.items()
-    }
+    # Rows 0..6: regions of the real face box (touch); rows 7..13: expanded box (near)
+    region_boxes = np.concatenate((_region_boxes(face_box), _region_boxes(expanded_face_box)))
+    region_count = len(REGION_NAMES)
 
-    for hand_landmarks in hand_landmark_sets[:2]:
-        points = _landmarks_to_points(hand_landmarks.landmark, proc_w, proc_h)
-        hand_points_output.extend(_hand_subset(points))
-
-        # Dùng fingertips + knuckles + wrist cho hand box chính xác
+    for points in hand_point_sets[:2]:
+        # Dùng fingertips + knuckles + wrist cho hand box chính xác (cũng là overlay subset)
         bounding_pts = _hand_bounding_points(points)
-        hand_box = _points_box(bounding_pts) if bounding_pts else _points_box(points)
+        hand_overlay_sets.append(bounding_pts if len(bounding_pts) else points)
+        hand_box = _points_box(bounding_pts) if len(bounding_pts) else _points_box(points)
         if hand_box is None:
             continue
         hand_boxes.append(hand_box)
 
         touch_overlap_score = _intersection_ratio(hand_box, face_box)
         near_overlap_score = _intersection_ratio(hand_box, expanded_face_box)
-        fingertip_points = [points[i] for i in FINGERTIP_INDICES if i < len(points)]
-        priority_points = [points[i] for i in FINGERTIP_PRIORITY if i < len(points)]
-        touch_proximity_score = _normalized_proximity(priority_points or fingertip_points, face_box)
+        fingertip_points = _landmark_rows(points, _FINGERTIP_ROWS)
+        priority_points = _landmark_rows(points, _FINGERTIP_PRIORITY_ROWS)
+        scoring_tips = priority_points if len(priority_points) else fingertip_points
+        touch_proximity_score = _normalized_proximity(scoring_tips, face_box)
         proximity_score = _normalized_proximity(fingertip_points, expanded_face_box)
 
         # Palm center proximity
@@ -1040,40 +2554,32 @@ def analyze_face_touch_frame(request: FaceTouchAnalyzeRequest) -> FaceTouchAnaly
         depth_scores.append(depth_assessment.foreground_score)
 
         # Region scoring: touch dùng face box thật, near dùng expanded face box
-        weighted_touch_region_scores = []
-        weighted_near_region_scores = []
-        for region_name in SENSITIVE_REGIONS:
-            touch_region_box = touch_region_boxes[region_name]
-            near_region_box = near_region_boxes[region_name]
-            weight = REGION_WEIGHTS.get(region_name, 1.0)
-            touch_region_overlap = _intersection_ratio(hand_box, touch_region_box)
-            touch_region_proximity = _normalized_proximity(
-                priority_points or fingertip_points,
-                touch_region_box,
-            )
-            near_region_overlap = _intersection_ratio(hand_box, near_region_box)
-            near_region_proximity = _normalized_proximity(
-                priority_points or fingertip_points,
-                near_region_box,
-            )
-
-            weighted_touch_region_scores.append(
-                _clamp_score(max(touch_region_overlap, touch_region_proximity) * weight)
-            )
-            weighted_near_region_scores.append(
-                _clamp_score(max(near_region_overlap, near_region_proximity) * weight)
-            )
-
-            if (
-                touch_region_overlap >= settings.FACE_TOUCH_REGION_TOUCH_THRESHOLD
-                or touch_region_proximity >= settings.FACE_TOUCH_REGION_TOUCH_THRESHOLD
-                or near_region_overlap >= settings.FACE_TOUCH_REGION_NEAR_THRESHOLD
-                or near_region_proximity >= settings.FACE_TOUCH_REGION_NEAR_THRESHOLD
-            ):
-                regions_triggered.add(region_name)
+        region_overlap = _intersection_ratios(hand_box, region_boxes)
+        region_proximity = _normalized_proximities(scoring_tips, region_boxes)
+        touch_region_overlap = region_overlap[:region_count]
+        touch_region_proximity = region_proximity[:region_count]
+        near_region_overlap = region_overlap[region_count:]
+        near_region_proximity = region_proximity[region_count:]
+
+        weighted_touch_region_scores = np.clip(
+            np.maximum(touch_region_overlap, touch_region_proximity) * _REGION_WEIGHT_ARRAY,
+            0.0,
+            1.0,
+        )
+        weighted_near_region_scores = np.clip(
+            np.maximum(near_region_overlap, near_region_proximity) * _REGION_WEIGHT_ARRAY,
+            0.0,
+            1.0,
+        )
+        region_triggered |= (
+            (touch_region_overlap >= settings.FACE_TOUCH_REGION_TOUCH_THRESHOLD)
+            | (touch_region_proximity >= settings.FACE_TOUCH_REGION_TOUCH_THRESHOLD)
+            | (near_region_overlap >= settings.FACE_TOUCH_REGION_NEAR_THRESHOLD)
+            | (near_region_proximity >= settings.FACE_TOUCH_REGION_NEAR_THRESHOLD)
+        )
 
-        fingertip_score = _clamp_score(max(weighted_touch_region_scores, default=0.0))
-        near_region_score = _clamp_score(max(weighted_near_region_scores, default=0.0))
+        fingertip_score = _clamp_score(float(weighted_touch_region_scores.max()))
+        near_region_score = _clamp_score(float(weighted_near_region_scores.max()))
         base_touch = (
             touch_overlap_score * 0.45
             + touch_proximity_score * 0.20
@@ -1081,6 +2587,8 @@ def analyze_face_touch_frame(request: FaceTouchAnalyzeRequest) -> FaceTouchAnaly
         )
         # Phân tích xem tay có đang ở TRƯỚC mặt thay vì chạm mặt không
         in_front = _hand_in_front_confidence(hand_box, face_box, face_overlay_pts)
+        in_front_scores.append(in_front)
+        hand_face_ratios.append(_hand_face_area_ratio(hand_box, face_box))
 
         # Bypass penalty CHỈ khi: contact cao + tay kích thước hợp lý
         # + occlusion thấp + KHÔNG có dấu hiệu tay ở trước mặt
@@ -1118,22 +2626,8 @@ def analyze_face_touch_frame(request: FaceTouchAnalyzeRequest) -> FaceTouchAnaly
         touch_scores.append(touch_score)
         near_scores.append(near_score)
 
-    overlap_score = _clamp_score(max(overlap_scores, default=0.0))
-    proximity_score = _clamp_score(max(proximity_scores, default=0.0))
-    fingertip_score = _clamp_score(max(fingertip_scores, default=0.0))
-    palm_score = _clamp_score(max(palm_scores, default=0.0))
-    depth_score = _clamp_score(max(depth_scores, default=0.0))
     touch_score = _clamp_score(max(touch_scores, default=0.0))
     near_score = _clamp_score(max(near_scores, default=0.0))
-    # Tính in_front tổng hợp cho debug output
-    in_front_max = 0.0
-    for hb in hand_boxes:
-        in_front_max = max(in_front_max,
-                          _hand_in_front_confidence(hb, face_box, face_overlay_pts))
-    largest_hand_face_ratio = max(
-        (_hand_face_area_ratio(hand_box, face_box) for hand_box in hand_boxes),
-        default=0.0,
-    )
 
     if touch_score >= settings.FACE_TOUCH_TOUCH_THRESHOLD:
         state = "touching_face"
@@ -1145,63 +2639,25 @@ def analyze_face_touch_frame(request: FaceTouchAnalyzeRequest) -> FaceTouchAnaly
         state = "safe"
         score = max(near_score, touch_score)
 
-    alert = state == "touching_face"
-    latency_ms = int((time.perf_counter() - started_at) * 1000)
-
-    if not hand_boxes:
-        note = "Đã phát hiện khuôn mặt nhưng chưa có bàn tay nào đi vào vùng phân tích."
-    elif state == "touching_face":
-        note = "Phát hiện tay chạm hoặc che vùng mặt nhạy cảm, nên phát cảnh báo tức thời."
-    elif state == "near_face":
-        note = "Có dấu hiệu tay tiến gần mặt. Hệ thống nên tiếp tục tích lũy persistence score."
-    elif largest_hand_face_ratio > settings.FACE_TOUCH_HAND_FACE_RATIO_SOFT_MAX:
-        note = "Phát hiện tay ở rất gần camera nhưng chưa đủ bằng chứng để kết luận là chạm mặt."
-    else:
-        note = "Tay xuất hiện nhưng vẫn giữ khoảng cách an toàn với khuôn mặt."
-
-    # Scale tọa độ về kích thước frame gốc cho overlay
-    inv_scale = 1.0 / scale if scale != 1.0 else 1.0
-
-    return FaceTouchAnalyzeResponse(
+    return FaceTouchScores(
         state=state,
-        score=round(score, 4),
-        alert=alert,
-        regions=sorted(regions_triggered),
-        hands=min(len(hand_boxes), 2),
-        faceDetected=True,
-        latencyMs=latency_ms,
-        note=note,
-        frameSize={"width": original_width, "height": original_height},
-        overlay={
-            "faceBox": {
-                "x": round(face_box.x * inv_scale, 2),
-                "y": round(face_box.y * inv_scale, 2),
-                "width": round(face_box.width * inv_scale, 2),
-                "height": round(face_box.height * inv_scale, 2),
-            },
-            "handBoxes": [
-                {
-                    "x": round(box.x * inv_scale, 2),
-                    "y": round(box.y * inv_scale, 2),
-                    "width": round(box.width * inv_scale, 2),
-                    "height": round(box.height * inv_scale, 2),
-                }
-                for box in hand_boxes
-            ],
-            "facePoints": [
-                {"x": round(pt.x * inv_scale, 2), "y": round(pt.y * inv_scale, 2)}
-                for pt in face_overlay_pts
-            ],
-            "handPoints": [
-                {"x": round(pt.x * inv_scale, 2), "y": round(pt.y * inv_scale, 2)}
-                for pt in hand_points_output
-            ],
-        },
-        debug={
-            "overlapScore": round(_clamp_score(overlap_score), 4),
-            "proximityScore": round(_clamp_score(proximity_score), 4),
-            "fingertipScore": round(_clamp_score(fingertip_score), 4),
-            "inFrontScore": round(_clamp_score(in_front_max), 4),
-            "depthScore": round(_clamp_score(depth_score), 4),
-        },
+        score=score,
+        regions=sorted(
+            name for name, triggered in zip(REGION_NAMES, region_triggered.tolist()) if triggered
+        ),
+        hand_boxes=hand_boxes,
+        face_overlay_points=face_overlay_pts,
+        hand_overlay_points=(
+            np.concatenate(hand_overlay_sets)
+            if hand_overlay_sets
+            else np.zeros((0, 3), dtype=np.float64)
+        ),
+        overlap_score=_clamp_score(max(overlap_scores, default=0.0)),
+        proximity_score=_clamp_score(max(proximity_scores, default=0.0)),
+        fingertip_score=_clamp_score(max(fingertip_scores, default=0.0)),
+        in_front_score=max(in_front_scores, default=0.0),
+        depth_score=_clamp_score(max(depth_scores, default=0.0)),
+        touch_score=touch_score,
+        near_score=near_score,
+        largest_hand_face_ratio=max(hand_face_ratios, default=0.0),
     )
@@ -0,0 +1,84 @@
+"""Startup warm-up of the face-touch worker pool.
+
+MediaPipe graphs and the Haar cascade are created lazily, so without a
+warm-up the first frame on every worker after a deploy or scale-out takes
+hundreds of milliseconds, while ``/api/face-touch/health`` already reports
+ready. The lifespan starts ``face_touch_warmup`` in the background; health
+answers 503 until every worker has loaded and exercised its models.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.services.face_touch_executor import FaceTouchExecutor
+from app.services.face_touch_service import warm_up_face_touch_worker
+
+logger = logging.getLogger(__name__)
+
+
+class FaceTouchWarmup:
+    """Tracks the warm-up run: pending → running → ready | failed (or disabled)."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.state = "pending" if enabled else "disabled"
+        self.elapsed_ms: Optional[float] = None
+        self.workers: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state in ("ready", "disabled")
+
+    async def run(self, executor: FaceTouchExecutor) -> None:
+        self.state = "running"
+        started_at = time.perf_counter()
+        try:
+            self.workers = await asyncio.wait_for(
+                executor.run_on_every_worker(warm_up_face_touch_worker),
+                timeout=settings.FACE_TOUCH_WARMUP_TIMEOUT_S,
+            )
+        except asyncio.CancelledError:
+            self.state = "pending"
+            raise
+        except Exception as error:
+            self.state = "failed"
+            self.error = str(error) or error.__class__.__name__
+            logger.error("[FACE TOUCH] warm-up failed: %s", self.error)
+        else:
+            self.state = "ready"
+            self.error = None
+        self.elapsed_ms = round((time.perf_counter() - started_at) * 1000, 1)
+        logger.info(
+            "[FACE TOUCH] warm-up %s in %.0f ms on %d worker(s)",
+            self.state,
+            self.elapsed_ms,
+            len(self.workers),
+        )
+
+    def start(self, executor: FaceTouchExecutor) -> None:
+        """Schedule ``run`` in the background so startup is not blocked."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self.run(executor))
+
+    def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "elapsedMs": self.elapsed_ms,
+            "workers": self.workers,
+            "error": self.error,
+        }
+
+
+face_touch_warmup = FaceTouchWarmup(enabled=settings.FACE_TOUCH_WARMUP_ENABLED)
@@ -0,0 +1,101 @@
+"""
+Application-scoped Groq client with a shared keep-alive connection pool.
+
+A roadmap is 1 generate + repair + up to 6 fill calls. Building a new
+``AsyncGroq`` per call meant a new httpx pool, so every call paid DNS + TCP
++ TLS again. ``groq_clients`` owns one ``httpx.AsyncClient`` for the whole
+process (started / closed by ``main.py``'s lifespan, created lazily for
+scripts); ``AsyncGroq`` instances are thin wrappers over it and are only
+rebuilt when the API key changes.
+
+Hot key reload: ``GROQ_API_KEY`` is re-read (environment, then ``.env``,
+like ``Settings``) when the ``.env`` file changes, checked at most every
+``GROQ_KEY_RELOAD_INTERVAL_S``. Setting ``settings.GROQ_API_KEY`` directly
+also takes effect on the next call. Neither touches the connection pool.
+"""
+
+import logging
+import os
+import time
+from typing import Optional
+
+import httpx
+from groq import AsyncGroq, DefaultAsyncHttpxClient
+
+from app.config import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+
+class GroqClientManager:
+    """One pooled HTTP client; ``AsyncGroq`` rebuilt only when the key changes."""
+
+    def __init__(self, env_file: str = ".env") -> None:
+        self.env_file = env_file
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[AsyncGroq] = None
+        self._client_key: Optional[str] = None
+        self._env_mtime: Optional[float] = self._read_env_mtime()
+        self._next_reload_check = 0.0
+        self.clients_built = 0
+        self.key_reloads = 0
+
+    def start(self) -> None:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.GROQ_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GROQ_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.GROQ_HTTP_KEEPALIVE_EXPIRY_S,
+                ),
+            )
+            self._client = None
+
+    async def close(self) -> None:
+        http_client, self._http_client = self._http_client, None
+        self._client = None
+        if http_client is not None:
+            await http_client.aclose()
+
+    def _read_env_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.env_file)
+        except OSError:
+            return None
+
+    def _maybe_reload_api_key(self) -> None:
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return
+        self._next_reload_check = now + settings.GROQ_KEY_RELOAD_INTERVAL_S
+        mtime = self._read_env_mtime()
+        if mtime == self._env_mtime:
+            return
+        self._env_mtime = mtime
+        api_key = Settings(_env_file=self.env_file).GROQ_API_KEY
+        if api_key != settings.GROQ_API_KEY:
+            settings.GROQ_API_KEY = api_key
+            self.key_reloads += 1
+            logger.info("[GROQ KEY] reloaded from %s", self.env_file)
+
+    def client(self) -> AsyncGroq:
+        """Groq client for the current API key, over the shared pool."""
+        self._maybe_reload_api_key()
+        self.start()
+        api_key = settings.GROQ_API_KEY
+        if self._client is None or self._client_key != api_key:
+            # max_retries=0: 429 backoff is handled by the callers (see groq_service).
+            self._client = AsyncGroq(api_key=api_key, max_retries=0, http_client=self._http_client)
+            self._client_key = api_key
+            self.clients_built += 1
+        return self._client
+
+    def stats(self) -> dict:
+        return {
+            "started": self._http_client is not None and not self._http_client.is_closed,
+            "clientsBuilt": self.clients_built,
+            "keyReloads": self.key_reloads,
+        }
+
+
+groq_clients = GroqClientManager()
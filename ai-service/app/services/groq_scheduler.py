@@ -0,0 +1,342 @@
+"""
+Groq Scheduler - proactive per-model TPM / RPM budgeting for Groq calls
+
+Groq meters every model separately: tokens per minute (prompt + max_tokens,
+checked when the request arrives) and requests per minute. We used to fire
+calls blindly and recover from 429s with fixed sleeps (20s before retrying
+the main call, a 12s+ cooldown in the fill loop, 2s before repair), which
+wasted wall-clock when budget was already available and still 429'd when
+several roadmaps overlapped.
+
+``groq_scheduler.acquire(model, tokens)`` now reserves budget *before* a
+call is sent:
+- one token bucket per model for TPM and one for RPM, refilled continuously
+  (``GROQ_TPM_LIMIT`` / ``GROQ_RPM_LIMIT``, ``GROQ_FILL_*`` for the fill
+  model);
+- the reservation is ``estimate_tokens(messages, max_tokens)`` and is
+  corrected with the real usage and Groq's ``x-ratelimit-*`` response
+  headers once the call returns;
+- a 429 (``throttled``) pauses the model until the Retry-After window opens;
+- waiting calls are granted round-robin across callers (one lane per roadmap
+  generation, see ``set_groq_caller``), FIFO within a caller, as soon as the
+  bucket can cover the head of the next lane.
+"""
+
+import asyncio
+import contextvars
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterable, Mapping, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CALLER = "default"
+
+_current_caller: contextvars.ContextVar[str] = contextvars.ContextVar("groq_caller", default=DEFAULT_CALLER)
+
+_DURATION_PART_RE = re.compile(r"([\d.]+)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+# Per-message framing (role, separators) on top of the content itself.
+_MESSAGE_OVERHEAD_TOKENS = 8
+
+
+def set_groq_caller(caller: str) -> None:
+    """Fairness lane for Groq calls made from the current task (and tasks it spawns)."""
+    _current_caller.set(caller)
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds from Groq reset headers such as ``"7.66s"``, ``"2m59.56s"`` or ``"120ms"``."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def estimate_tokens(messages: Iterable[Mapping[str, Any]], max_tokens: int) -> int:
+    """Upper-bound request cost as Groq counts it: prompt estimate + max_tokens."""
+    messages = list(messages)
+    prompt_chars = sum(len(str(message.get("content") or "")) for message in messages)
+    prompt_tokens = prompt_chars / max(settings.GROQ_CHARS_PER_TOKEN, 0.1)
+    return int(prompt_tokens) + len(messages) * _MESSAGE_OVERHEAD_TOKENS + max(int(max_tokens), 0)
+
+
+def _limits_from_settings(model: str) -> Tuple[int, int]:
+    if model == settings.GROQ_FILL_MODEL and model != settings.GROQ_MODEL:
+        return settings.GROQ_FILL_TPM_LIMIT, settings.GROQ_FILL_RPM_LIMIT
+    return settings.GROQ_TPM_LIMIT, settings.GROQ_RPM_LIMIT
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class GroqBudgetTimeout(RuntimeError):
+    """A call waited longer than ``GROQ_SCHEDULER_MAX_WAIT_S`` for budget.
+
+    ``retry_after_s`` is when the bucket could cover the call, not how long
+    it already waited.
+    """
+
+    def __init__(self, model: str, waited_s: float, retry_after_s: float) -> None:
+        self.model = model
+        self.waited_s = waited_s
+        self.retry_after_s = retry_after_s
+        super().__init__(f"Groq budget for {model} not available after {waited_s:.0f}s")
+
+
+class _Waiter:
+    __slots__ = ("tokens", "future")
+
+    def __init__(self, tokens: int, future: "asyncio.Future[None]") -> None:
+        self.tokens = tokens
+        self.future = future
+
+
+class _ModelBudget:
+    """TPM + RPM token buckets for one model and its per-caller wait lanes."""
+
+    def __init__(self, model: str, tokens_per_minute: int, requests_per_minute: int, now: float) -> None:
+        self.model = model
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.tokens = float(max(tokens_per_minute, 0))
+        self.requests = float(max(requests_per_minute, 0))
+        self.updated_at = now
+        self.blocked_until = 0.0
+        self.lanes: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self.wake: Optional[asyncio.TimerHandle] = None
+        self.granted = 0
+        self.waited = 0
+        self.wait_s = 0.0
+        self.throttled = 0
+        self.header_syncs = 0
+
+    def refill(self, now: float) -> None:
+        elapsed = max(now - self.updated_at, 0.0)
+        self.updated_at = now
+        if self.tokens_per_minute > 0:
+            self.tokens = min(
+                float(self.tokens_per_minute),
+                self.tokens + elapsed * self.tokens_per_minute / 60.0,
+            )
+        if self.requests_per_minute > 0:
+            self.requests = min(
+                float(self.requests_per_minute),
+                self.requests + elapsed * self.requests_per_minute / 60.0,
+            )
+
+    def delay_for(self, tokens: int, now: float) -> float:
+        """Seconds until a call costing ``tokens`` fits; 0 when it fits now."""
+        delay = self.blocked_until - now
+        if self.tokens_per_minute > 0:
+            # A call larger than the whole bucket waits for a full bucket and
+            # lets Groq's 413 handling shrink it, instead of waiting forever.
+            needed = min(tokens, self.tokens_per_minute)
+            if self.tokens < needed:
+                delay = max(delay, (needed - self.tokens) * 60.0 / self.tokens_per_minute)
+        if self.requests_per_minute > 0 and self.requests < 1.0:
+            delay = max(delay, (1.0 - self.requests) * 60.0 / self.requests_per_minute)
+        return max(delay, 0.0)
+
+    def take(self, tokens: int) -> None:
+        if self.tokens_per_minute > 0:
+            self.tokens -= tokens
+        if self.requests_per_minute > 0:
+            self.requests -= 1.0
+        self.granted += 1
+
+    def refund(self, tokens: float, requests: float = 0.0) -> None:
+        if self.tokens_per_minute > 0:
+            self.tokens = min(float(self.tokens_per_minute), self.tokens + tokens)
+        if self.requests_per_minute > 0:
+            self.requests = min(float(self.requests_per_minute), self.requests + requests)
+
+    def queued(self) -> int:
+        return sum(len(lane) for lane in self.lanes.values())
+
+
+class GroqReservation:
+    """Budget held for one Groq call; ``settle`` once the call has returned or failed."""
+
+    def __init__(self, scheduler: "GroqScheduler", budget: _ModelBudget, tokens: int) -> None:
+        self._scheduler = scheduler
+        self._budget = budget
+        self.tokens = tokens
+        self.settled = False
+
+    @property
+    def model(self) -> str:
+        return self._budget.model
+
+    def settle(
+        self,
+        used_tokens: Optional[int] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """
+        Return the unused part of the estimate (``used_tokens=None`` keeps the
+        whole estimate, e.g. for streams) and sync with Groq's headers.
+        """
+        if self.settled:
+            return
+        self.settled = True
+        budget = self._budget
+        budget.refill(self._scheduler._clock())
+        if used_tokens is not None:
+            budget.refund(self.tokens - used_tokens)
+        if headers is not None:
+            self._scheduler._observe_headers(budget, headers)
+        self._scheduler._pump(budget)
+
+
+class GroqScheduler:
+    """Per-model TPM/RPM buckets with round-robin queueing across callers."""
+
+    def __init__(
+        self,
+        limits: Callable[[str], Tuple[int, int]] = _limits_from_settings,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._limits = limits
+        self._clock = clock
+        self._budgets: Dict[str, _ModelBudget] = {}
+
+    def _budget(self, model: str) -> _ModelBudget:
+        budget = self._budgets.get(model)
+        if budget is None:
+            tokens_per_minute, requests_per_minute = self._limits(model)
+            budget = _ModelBudget(model, tokens_per_minute, requests_per_minute, self._clock())
+            self._budgets[model] = budget
+        return budget
+
+    async def acquire(self, model: str, tokens: int, caller: Optional[str] = None) -> GroqReservation:
+        """Wait (fairly) until ``model`` has budget for ``tokens``, then reserve it."""
+        budget = self._budget(model)
+        tokens = max(int(tokens), 1)
+        lane_key = caller or _current_caller.get()
+        waiter = _Waiter(tokens, asyncio.get_running_loop().create_future())
+        budget.lanes.setdefault(lane_key, deque()).append(waiter)
+        self._pump(budget)
+        if not waiter.future.done():
+            started_at = self._clock()
+            budget.waited += 1
+            try:
+                await asyncio.wait_for(waiter.future, timeout=settings.GROQ_SCHEDULER_MAX_WAIT_S)
+            except BaseException as error:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # Granted just as we gave up: hand the budget back.
+                    budget.refund(tokens, requests=1.0)
+                else:
+                    waiter.future.cancel()
+                self._pump(budget)
+                if isinstance(error, asyncio.TimeoutError):
+                    now = self._clock()
+                    budget.refill(now)
+                    raise GroqBudgetTimeout(
+                        model, now - started_at, budget.delay_for(tokens, now)
+                    ) from None
+                raise
+            finally:
+                budget.wait_s += self._clock() - started_at
+        return GroqReservation(self, budget, tokens)
+
+    def throttled(self, model: str, retry_after_s: float) -> None:
+        """Groq answered 429: nothing more goes to ``model`` until the window reopens."""
+        budget = self._budget(model)
+        now = self._clock()
+        budget.refill(now)
+        # Retry-After is Groq's own answer to "when does it fit"; the 429's
+        # x-ratelimit-* headers (see settle) already corrected the bucket.
+        budget.blocked_until = max(budget.blocked_until, now + max(retry_after_s, 0.0))
+        budget.throttled += 1
+        logger.warning("Groq 429 on %s; holding its queue for %.1fs.", model, retry_after_s)
+        self._pump(budget)
+
+    def _observe_headers(self, budget: _ModelBudget, headers: Mapping[str, str]) -> None:
+        # Groq: *-tokens is the per-minute window, *-requests the per-day one.
+        limit_tokens = _header_number(headers, "x-ratelimit-limit-tokens")
+        remaining_tokens = _header_number(headers, "x-ratelimit-remaining-tokens")
+        remaining_requests = _header_number(headers, "x-ratelimit-remaining-requests")
+        if limit_tokens is None and remaining_tokens is None and remaining_requests is None:
+            return
+        budget.header_syncs += 1
+        now = self._clock()
+        if limit_tokens and int(limit_tokens) != budget.tokens_per_minute:
+            # The account tier decides the real TPM; trust it over the setting.
+            if budget.tokens_per_minute <= 0:
+                budget.tokens = limit_tokens
+            budget.tokens_per_minute = int(limit_tokens)
+        if remaining_tokens is not None and budget.tokens_per_minute > 0:
+            budget.tokens = min(budget.tokens, remaining_tokens)
+            if remaining_tokens <= 0:
+                reset = parse_reset_duration(headers.get("x-ratelimit-reset-tokens"))
+                if reset:
+                    budget.blocked_until = max(budget.blocked_until, now + reset)
+        if remaining_requests is not None and remaining_requests <= 0:
+            reset = parse_reset_duration(headers.get("x-ratelimit-reset-requests"))
+            if reset:
+                budget.blocked_until = max(budget.blocked_until, now + reset)
+
+    def _pump(self, budget: _ModelBudget) -> None:
+        """Grant waiting calls round-robin while the buckets cover the next lane's head."""
+        if budget.wake is not None:
+            budget.wake.cancel()
+            budget.wake = None
+        now = self._clock()
+        budget.refill(now)
+        while budget.lanes:
+            lane_key, lane = next(iter(budget.lanes.items()))
+            while lane and lane[0].future.done():
+                lane.popleft()  # cancelled / timed out while queued
+            if not lane:
+                del budget.lanes[lane_key]
+                continue
+            delay = budget.delay_for(lane[0].tokens, now)
+            if delay > 0:
+                loop = asyncio.get_running_loop()
+                budget.wake = loop.call_later(delay, self._pump, budget)
+                return
+            waiter = lane.popleft()
+            budget.take(waiter.tokens)
+            waiter.future.set_result(None)
+            if lane:
+                budget.lanes.move_to_end(lane_key)
+            else:
+                del budget.lanes[lane_key]
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        models = {}
+        for model, budget in self._budgets.items():
+            budget.refill(now)
+            models[model] = {
+                "tpmLimit": budget.tokens_per_minute,
+                "rpmLimit": budget.requests_per_minute,
+                "tokensAvailable": int(budget.tokens),
+                "queued": budget.queued(),
+                "granted": budget.granted,
+                "waited": budget.waited,
+                "waitSeconds": round(budget.wait_s, 1),
+                "throttled": budget.throttled,
+                "headerSyncs": budget.header_syncs,
+                "blockedForSeconds": round(max(budget.blocked_until - now, 0.0), 1),
+            }
+        return {"models": models}
+
+
+groq_scheduler = GroqScheduler()
@@ -2,38 +2,41 @@
 Groq Service - Handles communication with Groq API for Llama 3 models
 """
 
+import hashlib
 import json
 import re
 import time
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 from groq import AsyncGroq, RateLimitError, APIStatusError, APIConnectionError
 
 from app.config import settings, get_model_info
 from app.prompts import ROADMAP_SYSTEM_PROMPT
+from app.services.groq_client import groq_clients
+from app.services.groq_scheduler import GroqBudgetTimeout, estimate_tokens, groq_scheduler
 
 
 def get_groq_client() -> AsyncGroq:
     """
-    Get or create Groq client with current API key from settings.
-    This ensures we always use the latest API key if .env is updated.
+    Shared Groq client (pooled keep-alive connections, see groq_client.py).
+    Picks up a changed API key on the next call without rebuilding the pool.
 
-    max_retries=0 — we handle 429 backoff in the application layer with a
-    much shorter cooldown (20s) than the SDK's default (60s). Letting the
-    SDK retry would block the whole pipeline for a full minute every time
-    Groq returns 429.
+    max_retries=0 — calls are budgeted up front by groq_scheduler and a 429
+    waits exactly Groq's Retry-After window instead of the SDK's default
+    (60s), which would block the whole pipeline for a full minute.
     """
-    return AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
+    return groq_clients.client()
 
 
 def get_groq_client_for_fill() -> AsyncGroq:
     """
     Client tuned for incremental fill calls. max_retries=0 so a transient
     429 fails immediately — the roadmap_generator's fill loop treats a
-    failed round as non-fatal and either retries with a short cooldown or
-    skips to the next round.
+    failed round as non-fatal and either retries once the scheduler reopens
+    the model's budget or skips to the next round. Shares the connection
+    pool with the main calls.
     """
-    return AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
+    return groq_clients.client()
 
 
 class GroqAPIError(Exception):
@@ -74,6 +77,72 @@ def _extract_retry_after_seconds(message: str, fallback: float = 0.0) -> float:
         return fallback
 
 
+def _retry_after_from_error(error: APIStatusError, fallback: float) -> float:
+    """Retry-After header of a 429, else the "try again in" hint, else fallback."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            return float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    err_text = str(getattr(error, "message", "")) or str(error)
+    return _extract_retry_after_seconds(err_text, fallback=fallback)
+
+
+async def _scheduled_completion(
+    client: AsyncGroq,
+    model: str,
+    messages: List[Dict[str, str]],
+    max_tokens: int,
+    caller: Optional[str] = None,
+    **kwargs: Any,
+):
+    """
+    One chat completion under ``model``'s TPM/RPM budget (see groq_scheduler).
+
+    Waits until the estimated prompt + max_tokens fits, then settles the
+    reservation with the real usage and Groq's x-ratelimit-* headers. A 429
+    pauses the model's queue for the Retry-After window before re-raising.
+    """
+    try:
+        reservation = await groq_scheduler.acquire(
+            model, estimate_tokens(messages, max_tokens), caller=caller
+        )
+    except GroqBudgetTimeout as e:
+        raise GroqAPIError(
+            message="Groq đang quá tải (hết hạn mức tokens/phút). Vui lòng thử lại sau ít phút.",
+            status_code=429,
+            error_type="rate_limit",
+            retry_after_s=e.retry_after_s,
+        )
+    try:
+        raw = await client.chat.completions.with_raw_response.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            **kwargs,
+        )
+    except APIStatusError as e:
+        status_code = getattr(e, "status_code", None)
+        headers = e.response.headers if getattr(e, "response", None) is not None else None
+        # A rejected request (429 / 413) consumed no tokens.
+        rejected = status_code in (413, 429)
+        reservation.settle(used_tokens=0 if rejected else None, headers=headers)
+        if status_code == 429:
+            groq_scheduler.throttled(model, _retry_after_from_error(e, fallback=15.0))
+        raise
+    except BaseException:
+        reservation.settle()
+        raise
+    response = await raw.parse()
+    usage = getattr(response, "usage", None)
+    reservation.settle(
+        used_tokens=usage.total_tokens if usage is not None else None,
+        headers=raw.headers,
+    )
+    return response
+
+
 async def generate_roadmap_json(user_prompt: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
     Generate roadmap JSON using Groq API with Llama 3 model.
@@ -91,7 +160,7 @@ async def generate_roadmap_json(user_prompt: str) -> Tuple[Dict[str, Any], Dict[
     start_time = time.time()
     model_info = get_model_info()
     
-    # Get fresh client to ensure we use latest API key
+    # Shared client: warm connections, latest API key
     client = get_groq_client()
     
     # Debug: Log API key status (first 10 chars only for security)
@@ -113,21 +182,24 @@ async def generate_roadmap_json(user_prompt: str) -> Tuple[Dict[str, Any], Dict[
         if "json" not in user_prompt.lower():
             user_prompt = user_prompt + "\n\nHãy trả về kết quả dưới dạng JSON."
         
+        messages = [
+            {"role": "system", "content": ROADMAP_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
         # Groq free tier enforces a TPM (tokens-per-minute) limit and counts
-        # (prompt_tokens + max_tokens) AT REQUEST TIME. If we hit HTTP 413
-        # "Request too large", retry once with a much smaller max_tokens so
-        # the request fits inside the per-minute budget.
+        # (prompt_tokens + max_tokens) AT REQUEST TIME. groq_scheduler holds
+        # the call until that fits; if we still hit HTTP 413 "Request too
+        # large", retry once with a much smaller max_tokens so the request
+        # fits inside the per-minute budget.
         attempted_max_tokens = settings.GROQ_MAX_TOKENS
         try:
-            response = await client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": ROADMAP_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ],
+            response = await _scheduled_completion(
+                client,
+                settings.GROQ_MODEL,
+                messages,
+                attempted_max_tokens,
                 response_format={"type": "json_object"},
                 temperature=settings.GROQ_TEMPERATURE,
-                max_tokens=attempted_max_tokens,
             )
         except APIStatusError as e_retryable:
             status_code = getattr(e_retryable, "status_code", None)
@@ -139,15 +211,13 @@ async def generate_roadmap_json(user_prompt: str) -> Tuple[Dict[str, Any], Dict[
                     "Groq 413 (request too large). Retrying with max_tokens=%d (was %d). Detail: %s",
                     fallback_max_tokens, attempted_max_tokens, err_msg,
                 )
-                response = await client.chat.completions.create(
-                    model=settings.GROQ_MODEL,
-                    messages=[
-                        {"role": "system", "content": ROADMAP_SYSTEM_PROMPT},
-                        {"role": "user", "content": user_prompt}
-                    ],
+                response = await _scheduled_completion(
+                    client,
+                    settings.GROQ_MODEL,
+                    messages,
+                    fallback_max_tokens,
                     response_format={"type": "json_object"},
                     temperature=settings.GROQ_TEMPERATURE,
-                    max_tokens=fallback_max_tokens,
                 )
                 attempted_max_tokens = fallback_max_tokens
             else:
@@ -180,27 +250,21 @@ async def generate_roadmap_json(user_prompt: str) -> Tuple[Dict[str, Any], Dict[
     
     except RateLimitError as e:
         # We disabled SDK retries (max_retries=0) so we own the backoff.
-        # Wait a short, deterministic period and retry once. This is much
-        # better than the SDK's default 60s wait because the per-minute TPM
-        # window often opens up within 15-25s once the previous big call
-        # finishes.
-        import logging as _logging
-        _logger = _logging.getLogger(__name__)
-        _logger.warning(
-            "Groq 429 on main call — sleeping 20s before single retry."
+        # _scheduled_completion already paused this model's queue for Groq's
+        # Retry-After window, so the single retry below is dispatched the
+        # moment that window reopens instead of after a fixed sleep.
+        logger.warning(
+            "Groq 429 on main call — retrying once when the budget reopens (hint: %.1fs).",
+            _retry_after_from_error(e, fallback=15.0),
         )
-        import asyncio as _asyncio
-        await _asyncio.sleep(20)
         try:
-            response = await client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": ROADMAP_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ],
+            response = await _scheduled_completion(
+                client,
+                settings.GROQ_MODEL,
+                messages,
+                attempted_max_tokens,
                 response_format={"type": "json_object"},
                 temperature=settings.GROQ_TEMPERATURE,
-                max_tokens=attempted_max_tokens,
             )
             end_time = time.time()
             latency_ms = int((end_time - start_time) * 1000)
@@ -219,11 +283,12 @@ async def generate_roadmap_json(user_prompt: str) -> Tuple[Dict[str, Any], Dict[
                 "provider": "groq",
             }
             return roadmap_data, metadata
-        except RateLimitError:
+        except RateLimitError as retry_error:
             raise GroqAPIError(
                 message="Groq API rate limit exceeded. Vui lòng đợi 1 phút và thử lại. (Free tier: 30 requests/phút)",
                 status_code=429,
-                error_type="rate_limit"
+                error_type="rate_limit",
+                retry_after_s=_retry_after_from_error(retry_error, fallback=60.0),
             )
     
     except APIStatusError as e:
@@ -289,6 +354,10 @@ async def generate_roadmap_json(user_prompt: str) -> Tuple[Dict[str, Any], Dict[
         
     except json.JSONDecodeError as e:
         raise ValueError(f"Failed to parse AI response as JSON: {str(e)}")
+
+    except GroqAPIError:
+        # Already mapped (e.g. the scheduler gave up waiting for budget).
+        raise
     
     except Exception as e:
         # Catch-all for unexpected errors
@@ -313,7 +382,7 @@ async def generate_roadmap_stream(user_prompt: str):
     Raises:
         GroqAPIError: When Groq API returns an error
     """
-    # Get fresh client to ensure we use latest API key
+    # Shared client: warm connections, latest API key
     client = get_groq_client()
     
     # Ensure user_prompt contains "json" for Groq JSON mode requirement
@@ -321,15 +390,19 @@ async def generate_roadmap_stream(user_prompt: str):
         user_prompt = user_prompt + "\n\nHãy trả về kết quả dưới dạng JSON."
     
     try:
-        stream = await client.chat.completions.create(
-            model=settings.GROQ_MODEL,
-            messages=[
+        # Each streamed roadmap queues in its own fairness lane; usage is not
+        # known up front, so the reservation keeps the full estimate.
+        stream = await _scheduled_completion(
+            client,
+            settings.GROQ_MODEL,
+            [
                 {"role": "system", "content": ROADMAP_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
+            settings.GROQ_MAX_TOKENS,
+            caller="stream:" + hashlib.sha256(user_prompt.encode("utf-8")).hexdigest()[:12],
             response_format={"type": "json_object"},
             temperature=settings.GROQ_TEMPERATURE,
-            max_tokens=settings.GROQ_MAX_TOKENS,
             stream=True,
         )
         
@@ -337,11 +410,15 @@ async def generate_roadmap_stream(user_prompt: str):
             if chunk.choices[0].delta.content:
                 yield chunk.choices[0].delta.content
     
+    except GroqAPIError:
+        raise
+
     except RateLimitError as e:
         raise GroqAPIError(
             message="Groq API rate limit exceeded. Please wait and try again.",
             status_code=429,
-            error_type="rate_limit"
+            error_type="rate_limit",
+            retry_after_s=_retry_after_from_error(e, fallback=15.0),
         )
     
     except APIStatusError as e:
@@ -447,16 +524,18 @@ async def generate_fill_nodes_json(
     if "json" not in fill_user_prompt.lower():
         fill_user_prompt = fill_user_prompt + "\n\nReturn JSON only."
 
+    messages = [
+        {"role": "system", "content": FILL_NODES_SYSTEM_PROMPT},
+        {"role": "user", "content": fill_user_prompt},
+    ]
     try:
-        response = await client.chat.completions.create(
-            model=fill_model,
-            messages=[
-                {"role": "system", "content": FILL_NODES_SYSTEM_PROMPT},
-                {"role": "user", "content": fill_user_prompt},
-            ],
+        response = await _scheduled_completion(
+            client,
+            fill_model,
+            messages,
+            max_tokens_override,
             response_format={"type": "json_object"},
             temperature=settings.GROQ_TEMPERATURE,
-            max_tokens=max_tokens_override,
         )
     except APIStatusError as e:
         # Mirror the same retry-on-413 pattern as generate_roadmap_json so a
@@ -464,19 +543,16 @@ async def generate_fill_nodes_json(
         status_code = getattr(e, "status_code", None)
         if status_code == 413 and max_tokens_override > 2000:
             fallback = max(2000, max_tokens_override // 2)
-            response = await client.chat.completions.create(
-                model=fill_model,
-                messages=[
-                    {"role": "system", "content": FILL_NODES_SYSTEM_PROMPT},
-                    {"role": "user", "content": fill_user_prompt},
-                ],
+            response = await _scheduled_completion(
+                client,
+                fill_model,
+                messages,
+                fallback,
                 response_format={"type": "json_object"},
                 temperature=settings.GROQ_TEMPERATURE,
-                max_tokens=fallback,
             )
         elif status_code == 429:
-            err_text = str(getattr(e, "message", "")) or str(e)
-            retry_after = _extract_retry_after_seconds(err_text, fallback=15.0)
+            retry_after = _retry_after_from_error(e, fallback=15.0)
             raise GroqAPIError(
                 message="Groq rate limit during incremental fill.",
                 status_code=429,
@@ -490,8 +566,7 @@ async def generate_fill_nodes_json(
                 error_type="api_error",
             )
     except RateLimitError as e:
-        err_text = str(getattr(e, "message", "")) or str(e)
-        retry_after = _extract_retry_after_seconds(err_text, fallback=15.0)
+        retry_after = _retry_after_from_error(e, fallback=15.0)
         raise GroqAPIError(
             message="Groq rate limit during incremental fill.",
             status_code=429,
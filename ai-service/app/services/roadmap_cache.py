@@ -0,0 +1,248 @@
+"""
+Roadmap Cache - content-addressed cache of validated roadmap results
+
+Many students pick the same current/target role presets, so
+``build_user_prompt`` produces byte-identical prompts and every one of them
+used to cost a full 70B Groq call (plus repair / fill calls). Results are
+keyed by a SHA-256 of the canonical prompt, both Groq models and
+``PROMPT_VERSION``, so a prompt or model change can never serve a stale
+roadmap.
+
+Backends (``ROADMAP_CACHE_BACKEND``):
+- ``memory``: in-process LRU with TTL (per worker process);
+- ``sqlite``: a local file shared by every worker on the host, no external
+  service needed;
+- ``none``: disabled.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def roadmap_cache_key(user_prompt: str) -> str:
+    """SHA-256 over the canonical prompt + models + prompt version."""
+    prompt = unicodedata.normalize("NFC", user_prompt)
+    prompt = "\n".join(line.rstrip() for line in prompt.strip().splitlines())
+    payload = json.dumps(
+        {
+            "prompt": prompt,
+            "model": settings.GROQ_MODEL,
+            "fill_model": settings.GROQ_FILL_MODEL,
+            "prompt_version": settings.PROMPT_VERSION,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RoadmapCacheBackend(Protocol):
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def size(self) -> int: ...
+
+
+class MemoryRoadmapCache:
+    """In-process LRU with a TTL; values are serialized JSON strings."""
+
+    def __init__(self, max_entries: int, ttl_s: float, clock=time.monotonic) -> None:
+        self.max_entries = max(max_entries, 1)
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SqliteRoadmapCache:
+    """File-backed cache shared by every worker process on the host."""
+
+    def __init__(self, path: str, max_entries: int, ttl_s: float, clock=time.time) -> None:
+        self.path = path
+        self.max_entries = max(max_entries, 1)
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS roadmap_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS roadmap_cache_used ON roadmap_cache (used_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call: safe across threads and processes.
+        connection = sqlite3.connect(self.path, timeout=5.0)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT value, expires_at FROM roadmap_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                connection.execute("DELETE FROM roadmap_cache WHERE key = ?", (key,))
+                return None
+            connection.execute("UPDATE roadmap_cache SET used_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = self._clock()
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO roadmap_cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_s, now),
+            )
+            connection.execute("DELETE FROM roadmap_cache WHERE expires_at <= ?", (now,))
+            connection.execute(
+                "DELETE FROM roadmap_cache WHERE key IN ("
+                " SELECT key FROM roadmap_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM roadmap_cache WHERE key = ?", (key,))
+
+    def size(self) -> int:
+        with self._lock, self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM roadmap_cache").fetchone()[0]
+
+
+class RoadmapCache:
+    """Async facade: backend I/O off the event loop, hit/miss counters."""
+
+    def __init__(self, backend: Optional[RoadmapCacheBackend]) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls) -> "RoadmapCache":
+        kind = settings.ROADMAP_CACHE_BACKEND
+        if kind == "memory":
+            return cls(MemoryRoadmapCache(settings.ROADMAP_CACHE_MAX_ENTRIES, settings.ROADMAP_CACHE_TTL_S))
+        if kind == "sqlite":
+            return cls(
+                SqliteRoadmapCache(
+                    settings.ROADMAP_CACHE_SQLITE_PATH,
+                    settings.ROADMAP_CACHE_MAX_ENTRIES,
+                    settings.ROADMAP_CACHE_TTL_S,
+                )
+            )
+        if kind != "none":
+            logger.warning("Unknown ROADMAP_CACHE_BACKEND %r, roadmap cache disabled.", kind)
+        return cls(None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def get(self, key: str, load: Callable[[Dict[str, Any]], T] = lambda entry: entry) -> Optional[T]:
+        """Cached entry passed through ``load``; None on a miss.
+
+        An entry that does not decode or ``load`` (corrupt, or written under
+        an older schema) counts as an error + miss and is deleted.
+        """
+        if self.backend is None:
+            return None
+        try:
+            value = await asyncio.to_thread(self.backend.get, key)
+        except Exception as error:  # a broken cache must never fail a generation
+            self.errors += 1
+            logger.warning("Roadmap cache read failed: %s", error)
+            value = None
+        if value is not None:
+            try:
+                result = load(json.loads(value))
+            except Exception as error:
+                self.errors += 1
+                logger.warning("Dropping unreadable roadmap cache entry %s: %s", key[:12], error)
+                await self._delete(key)
+            else:
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    async def _delete(self, key: str) -> None:
+        if self.backend is None:
+            return
+        try:
+            await asyncio.to_thread(self.backend.delete, key)
+        except Exception as error:
+            logger.warning("Roadmap cache delete failed: %s", error)
+
+    async def set(self, key: str, entry: Dict[str, Any]) -> None:
+        if self.backend is None:
+            return
+        try:
+            await asyncio.to_thread(self.backend.set, key, json.dumps(entry, ensure_ascii=False))
+        except Exception as error:
+            self.errors += 1
+            logger.warning("Roadmap cache write failed: %s", error)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": settings.ROADMAP_CACHE_BACKEND if self.enabled else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+roadmap_cache = RoadmapCache.from_settings()
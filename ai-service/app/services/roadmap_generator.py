@@ -5,6 +5,7 @@ Roadmap Generator Service - Main business logic
 import asyncio
 import logging
 import re
+import time
 import unicodedata
 from collections import Counter
 from datetime import datetime, timezone
@@ -31,9 +32,15 @@ from app.services.groq_service import (
     generate_fill_nodes_json,
     GroqAPIError,
 )
+from app.services.groq_scheduler import set_groq_caller
+from app.services.roadmap_cache import roadmap_cache, roadmap_cache_key
+from app.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# In-flight roadmap generations keyed by roadmap_cache_key (see single_flight.py).
+roadmap_generations: SingleFlight[RoadmapResponse] = SingleFlight()
+
 
 def calculate_personalization_score(
     profile: UserProfileRequest,
@@ -989,11 +996,12 @@ def _collect_structural_issues(roadmap: GeneratedRoadmap) -> List[str]:
 # as some docs suggest). Each call uses ~1500 input + max_tokens output,
 # so we keep output ≤2000 to fit ~1.7 calls per minute. Smaller chunks +
 # more rounds means we stay below TPM and skip the SDK's 60s wait entirely.
+# Chunks of one round are independent and go out concurrently (at most
+# _FILL_MAX_PARALLEL_CHUNKS); groq_scheduler spaces them to the fill TPM.
 _FILL_CHUNK_SIZE = 5
-_FILL_MAX_ROUNDS = 6
+_FILL_MAX_PARALLEL_CHUNKS = 4
+_FILL_MAX_ROUNDS = 3
 _FILL_OUTPUT_MAX_TOKENS = 2000
-# Local backoff baseline if we somehow have to wait without a Groq hint.
-_FILL_RATE_LIMIT_COOLDOWN_S = 12
 
 
 def _subsections_needing_fill(
@@ -1042,10 +1050,14 @@ def _build_fill_user_prompt(
     profile: UserProfileRequest,
     roadmap: GeneratedRoadmap,
     chunk: List[Dict[str, Any]],
+    id_prefix: str = "fill-",
 ) -> str:
     """
     Build a focused user prompt asking the LLM to ONLY produce additional
     nodes for the requested subsections, using the exact existing IDs.
+
+    ``id_prefix`` keeps node ids of chunks generated in parallel (which
+    cannot see each other's new ids) from colliding.
     """
     lang_instruction = "Vietnamese" if profile.preferred_language == "vi" else "English"
 
@@ -1080,7 +1092,7 @@ def _build_fill_user_prompt(
         f"{sections_text}\n\n"
         f"EXISTING NODE IDS (do not reuse): {existing_ids_preview}\n\n"
         "REQUIREMENTS:\n"
-        "- Each new node id MUST start with 'fill-' followed by a unique slug.\n"
+        f"- Each new node id MUST start with '{id_prefix}' followed by a unique slug.\n"
         "- Each node MUST set section_id and subsection_id to the values above (no new ids).\n"
         "- Most nodes should be type='core'. At most one project per chunk.\n"
         "- Provide concrete prerequisites and learning_outcomes for every core node.\n"
@@ -1220,6 +1232,45 @@ def _merge_fill_response(
     return added_count
 
 
+async def _fetch_fill_chunk(
+    fill_user_prompt: str,
+    label: str,
+) -> Optional[Dict[str, Any]]:
+    """
+    One fill call; None when it fails. A failed chunk is non-fatal: its
+    subsections stay pending for the next round.
+    """
+    try:
+        return await generate_fill_nodes_json(
+            fill_user_prompt,
+            max_tokens_override=_FILL_OUTPUT_MAX_TOKENS,
+        )
+    except GroqAPIError as exc:
+        # 429 from the fill model: the scheduler has already paused the
+        # fill model for Groq's Retry-After window, so retrying the same
+        # chunk once just queues until that window reopens.
+        if exc.error_type != "rate_limit":
+            logger.warning("Fill %s failed (%s); skipping.", label, exc)
+            return None
+        logger.warning(
+            "Fill %s hit 429 (Groq hint: %.1fs); retrying once when the budget reopens.",
+            label,
+            exc.retry_after_s,
+        )
+        try:
+            return await generate_fill_nodes_json(
+                fill_user_prompt,
+                max_tokens_override=_FILL_OUTPUT_MAX_TOKENS,
+            )
+        except Exception as retry_exc:  # noqa: BLE001
+            logger.warning("Fill %s retry also failed (%s); skipping.", label, retry_exc)
+            return None
+    except Exception as exc:  # noqa: BLE001
+        # Don't fail the whole roadmap if a fill chunk errors out.
+        logger.warning("Fill %s failed unexpectedly (%s); skipping.", label, exc)
+        return None
+
+
 async def _incremental_fill_roadmap(
     profile: UserProfileRequest,
     roadmap: GeneratedRoadmap,
@@ -1229,84 +1280,53 @@ async def _incremental_fill_roadmap(
     Run up to _FILL_MAX_ROUNDS rounds of incremental backfill against any
     subsection that is still below the minimum lesson count.
 
+    Each round splits the pending subsections into chunks of
+    _FILL_CHUNK_SIZE and sends up to _FILL_MAX_PARALLEL_CHUNKS of them at
+    once; groq_scheduler releases them as the fill model's TPM budget
+    allows. Every prompt is built from the roadmap as it was at the start
+    of the round and results are merged in chunk order, so the merged
+    roadmap does not depend on which call finished first.
+
     Returns total nodes added across all rounds.
     """
     total_added = 0
-    rate_limit_recoveries = 0
     for round_index in range(_FILL_MAX_ROUNDS):
         pending = _subsections_needing_fill(roadmap, directives)
         if not pending:
             break
 
-        # Small cooldown before each fill round (except the first) to spread
-        # the calls out across Groq's per-minute TPM window. The fill model
-        # has its own bucket but we still want to avoid stacking back-to-back
-        # 429s if the user generates two roadmaps quickly.
-        if round_index > 0:
-            await asyncio.sleep(0.5)
-
-        chunk = pending[:_FILL_CHUNK_SIZE]
+        chunks = [
+            pending[offset:offset + _FILL_CHUNK_SIZE]
+            for offset in range(0, len(pending), _FILL_CHUNK_SIZE)
+        ][:_FILL_MAX_PARALLEL_CHUNKS]
         logger.info(
-            "Incremental fill round %d: %d subsections need more nodes (filling %d this round).",
+            "Incremental fill round %d: %d subsections need more nodes (filling %d in %d parallel chunks).",
             round_index + 1,
             len(pending),
-            len(chunk),
+            sum(len(chunk) for chunk in chunks),
+            len(chunks),
         )
 
-        fill_user_prompt = _build_fill_user_prompt(profile, roadmap, chunk)
-        try:
-            fill_data = await generate_fill_nodes_json(
-                fill_user_prompt,
-                max_tokens_override=_FILL_OUTPUT_MAX_TOKENS,
+        prompts = [
+            _build_fill_user_prompt(
+                profile,
+                roadmap,
+                chunk,
+                id_prefix=f"fill-r{round_index + 1}c{chunk_index + 1}-",
             )
-        except GroqAPIError as exc:
-            # 429 from the fill model: wait the exact period Groq tells us
-            # (parsed from "try again in X.Ys" in the error message), then
-            # retry the same chunk once. Total worst case ≈ 35-40s, still
-            # much faster than letting the SDK block on a 60s default retry.
-            if exc.error_type == "rate_limit" and rate_limit_recoveries < 3:
-                rate_limit_recoveries += 1
-                # Add 1.5s buffer so we wake up just after the window opens
-                # rather than right on the boundary (which sometimes still
-                # 429s).
-                wait_s = max(_FILL_RATE_LIMIT_COOLDOWN_S, exc.retry_after_s + 1.5)
-                logger.warning(
-                    "Fill round %d hit 429; waiting %.1fs (Groq hint: %.1fs) and retrying once.",
-                    round_index + 1,
-                    wait_s,
-                    exc.retry_after_s,
-                )
-                await asyncio.sleep(wait_s)
-                try:
-                    fill_data = await generate_fill_nodes_json(
-                        fill_user_prompt,
-                        max_tokens_override=_FILL_OUTPUT_MAX_TOKENS,
-                    )
-                except Exception as retry_exc:  # noqa: BLE001
-                    logger.warning(
-                        "Fill round %d retry also failed (%s); skipping.",
-                        round_index + 1,
-                        retry_exc,
-                    )
-                    continue
-            else:
-                logger.warning(
-                    "Fill round %d failed (%s); skipping to next round.",
-                    round_index + 1,
-                    exc,
-                )
-                continue
-        except Exception as exc:  # noqa: BLE001
-            # Don't fail the whole roadmap if a fill chunk errors out — just
-            # skip and try the next round (or stop if we're out).
-            logger.warning(
-                "Fill round %d failed unexpectedly (%s); skipping.",
-                round_index + 1,
-                exc,
+            for chunk_index, chunk in enumerate(chunks)
+        ]
+        results = await asyncio.gather(
+            *(
+                _fetch_fill_chunk(prompt, f"round {round_index + 1} chunk {chunk_index + 1}")
+                for chunk_index, prompt in enumerate(prompts)
             )
-            continue
+        )
 
-        added = _merge_fill_response(roadmap, fill_data)
+        added = 0
+        for fill_data in results:
+            if fill_data is not None:
+                added += _merge_fill_response(roadmap, fill_data)
         total_added += added
         logger.info(
             "Incremental fill round %d added %d nodes (total: %d).",
@@ -1328,6 +1348,10 @@ async def generate_roadmap(
 ) -> RoadmapResponse:
     """
     Generate a personalized learning roadmap based on user profile.
+
+    Identical built prompts are served from ``roadmap_cache`` (see
+    roadmap_cache.py), and concurrent identical requests share one in-flight
+    generation; ``metadata.cache_status`` reports hit / miss / coalesced.
     """
 
     directives = _generation_directives_to_dict(profile, generation_directives)
@@ -1352,6 +1376,73 @@ async def generate_roadmap(
         generation_directives=directives,
     )
 
+    started_at = time.perf_counter()
+    cache_key = roadmap_cache_key(user_prompt)
+
+    def load_cached(entry: Dict[str, Any]) -> RoadmapResponse:
+        # Raises on entries from an older schema; the cache then treats it as a miss.
+        roadmap = GeneratedRoadmap.model_validate(entry["roadmap"])
+        metadata = GenerationMetadata.model_validate(
+            {
+                **entry["metadata"],
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "latency_ms": int((time.perf_counter() - started_at) * 1000),
+                "cache_status": "hit",
+            }
+        )
+        return RoadmapResponse(success=True, roadmap=roadmap, metadata=metadata)
+
+    cached = await roadmap_cache.get(cache_key, load_cached)
+    if cached is not None:
+        logger.info("Roadmap cache hit %s", cache_key[:12])
+        return cached
+
+    # Concurrent identical requests share one generation (one set of Groq calls).
+    shared_response, coalesced = await roadmap_generations.run(
+        cache_key,
+        lambda: _generate_and_cache_roadmap(profile, directives, user_prompt, cache_key),
+    )
+    response = shared_response.model_copy(deep=True)
+    if coalesced:
+        logger.info("Roadmap generation coalesced %s", cache_key[:12])
+        response.metadata.cache_status = "coalesced"
+        response.metadata.input_tokens = 0
+        response.metadata.output_tokens = 0
+        response.metadata.latency_ms = int((time.perf_counter() - started_at) * 1000)
+    else:
+        response.metadata.cache_status = "miss" if roadmap_cache.enabled else "disabled"
+    return response
+
+
+async def _generate_and_cache_roadmap(
+    profile: UserProfileRequest,
+    directives: Dict[str, Any],
+    user_prompt: str,
+    cache_key: str,
+) -> RoadmapResponse:
+    # Runs in its own task (SingleFlight): every Groq call of this roadmap
+    # shares one fairness lane in groq_scheduler.
+    set_groq_caller(cache_key[:12])
+    response = await _generate_roadmap_uncached(profile, directives, user_prompt)
+    # Roadmaps with quality warnings are not cached: the next identical request
+    # gets a fresh attempt instead of the same below-target roadmap for a day.
+    if not response.metadata.quality_warnings:
+        await roadmap_cache.set(
+            cache_key,
+            {
+                "roadmap": response.roadmap.model_dump(mode="json"),
+                "metadata": response.metadata.model_dump(mode="json"),
+            },
+        )
+    return response
+
+
+async def _generate_roadmap_uncached(
+    profile: UserProfileRequest,
+    directives: Dict[str, Any],
+    user_prompt: str,
+) -> RoadmapResponse:
     raw_roadmap, raw_metadata = await generate_roadmap_json(user_prompt)
     roadmap = validate_and_parse_roadmap(raw_roadmap)
     _rebalance_nodes_across_subsections(roadmap, directives)
@@ -1394,13 +1485,13 @@ async def generate_roadmap(
     )
 
     if quality_issues and needs_repair:
-        # Repair pass: full 70B regeneration. Expensive (10s + possible 20s
-        # cooldown if Groq returns 429), so we only do it when there are
-        # structural problems that incremental fill can't fix.
+        # Repair pass: full 70B regeneration. Expensive (10s + waiting for
+        # the 70B TPM budget to refill after the first call), so we only do
+        # it when there are structural problems that incremental fill can't
+        # fix. groq_scheduler dispatches it as soon as the budget allows.
         logger.info(
             "Running repair pass for %d quality issues.", len(quality_issues)
         )
-        await asyncio.sleep(2.0)
         repair_prompt = _build_repair_prompt(user_prompt, quality_issues)
         raw_roadmap, raw_metadata = await generate_roadmap_json(repair_prompt)
         roadmap = validate_and_parse_roadmap(raw_roadmap)
@@ -0,0 +1,55 @@
+"""
+Single-flight - coalesce concurrent identical async calls into one
+
+When a cohort submits the same roadmap preset within seconds, every request
+used to fire its own 70B Groq call against the shared 12k TPM budget, which
+then cascaded into 429s and cooldown sleeps. ``SingleFlight.run`` lets the
+first caller for a key start the work and every concurrent caller with the
+same key await that same result.
+
+The work runs in its own task and callers await it through
+``asyncio.shield``: a caller that disconnects does not cancel the generation
+the others are waiting for (it still finishes and, for roadmaps, fills the
+cache).
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Per-key in-flight deduplication for coroutines on one event loop."""
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[str, "asyncio.Task[T]"] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Result of ``factory()`` for ``key`` and whether it was shared with an earlier caller."""
+        task = self._in_flight.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: str, task: "asyncio.Task[T]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away.
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inFlight": len(self._in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
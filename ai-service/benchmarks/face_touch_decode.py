@@ -0,0 +1,118 @@
+"""Compare the base64/JSON and raw-bytes upload paths of analyze-frame.
+
+Measures, per frame, the bytes a client puts on the wire and the server-side
+cost of turning the request into a BGR frame (JSON parse + pydantic + base64 +
+imdecode vs. imdecode on the body buffer). Inference is excluded on purpose:
+it is identical for both paths.
+
+Usage (from ai-service/):
+    python -m benchmarks.face_touch_decode --frames 200 --width 640 --quality 70
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import pathlib
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.models import FaceTouchAnalyzeRequest
+from app.services.face_touch_service import _decode_image, _decode_image_bytes
+from tests.face_touch_fixtures import decode_fixture
+
+
+def _synthetic_frames(count: int, width: int, quality: int, seed: int) -> List[bytes]:
+    """JPEG frames with the fixture face at random positions over sensor-like noise."""
+    rng = np.random.default_rng(seed)
+    height = width * 3 // 4
+    face_size = max(32, width // 3)
+    face = cv2.resize(decode_fixture(), (face_size, face_size), interpolation=cv2.INTER_AREA)
+    frames = []
+    for _ in range(count):
+        canvas = rng.integers(180, 236, size=(height, width, 3), dtype=np.uint8)
+        x = int(rng.integers(0, width - face_size))
+        y = int(rng.integers(0, height - face_size))
+        canvas[y : y + face_size, x : x + face_size] = face
+        ok, encoded = cv2.imencode(".jpg", canvas, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        assert ok
+        frames.append(encoded.tobytes())
+    return frames
+
+
+def _time_ms(fn: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(np.asarray(values), q))
+
+
+def run(frames: int, width: int, quality: int, seed: int) -> dict[str, dict[str, float]]:
+    encoded_frames = _synthetic_frames(frames, width, quality, seed)
+    json_bodies = [
+        json.dumps(
+            {
+                "image": "data:image/jpeg;base64," + base64.b64encode(raw).decode("ascii"),
+                "timestamp": index * 100,
+                "sample_rate_fps": 10,
+            }
+        ).encode("utf-8")
+        for index, raw in enumerate(encoded_frames)
+    ]
+
+    def decode_json(body: bytes) -> np.ndarray:
+        request = FaceTouchAnalyzeRequest(**json.loads(body))
+        return _decode_image(request.image)
+
+    results: dict[str, dict[str, float]] = {}
+    for name, bodies, decode in (
+        ("base64_json", json_bodies, decode_json),
+        ("raw_bytes", encoded_frames, _decode_image_bytes),
+    ):
+        # One warm-up pass so allocator / codec init does not skew the first sample.
+        decode(bodies[0])
+        latencies = [_time_ms(lambda body=body: decode(body)) for body in bodies]
+        results[name] = {
+            "bytes_per_frame": statistics.fmean(len(body) for body in bodies),
+            "mean_ms": statistics.fmean(latencies),
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--quality", type=int, default=70)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = run(args.frames, args.width, args.quality, args.seed)
+    print(f"{'path':<12} {'bytes/frame':>12} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, row in results.items():
+        print(
+            f"{name:<12} {row['bytes_per_frame']:>12.0f} {row['mean_ms']:>9.3f} "
+            f"{row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f}"
+        )
+    raw, encoded = results["raw_bytes"], results["base64_json"]
+    print(
+        f"raw bytes: {1 - raw['bytes_per_frame'] / encoded['bytes_per_frame']:.1%} fewer bytes, "
+        f"{encoded['mean_ms'] / max(raw['mean_ms'], 1e-9):.2f}x faster decode"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Micro-benchmark of the landmark index subsets used on every frame.
+
+Compares, per subset, indexing with the plain index tuple (filtered and
+converted on every call, the previous behaviour) against the precomputed
+``_LandmarkIndex`` arrays, on full FaceMesh (478) / hand (21) landmark
+arrays. Also times the whole per-frame set: both face subsets plus the hand
+subsets of two hands.
+
+Usage (from ai-service/):
+    python -m benchmarks.face_touch_landmark_index --iterations 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.services import face_touch_service as service
+
+
+def _tuple_rows(points: np.ndarray, indices: Sequence[int]) -> np.ndarray:
+    count = len(points)
+    return points[[index for index in indices if index < count]]
+
+
+_SUBSETS = {
+    "face_bounding": ("face", service.FACE_BOUNDING_INDICES_FULL, service._FACE_BOUNDING_ROWS),
+    "face_overlay": ("face", service.FACE_OVERLAY_INDICES, service._FACE_OVERLAY_ROWS),
+    "hand_subset": ("hand", service.HAND_SUBSET_INDICES, service._HAND_SUBSET_ROWS),
+    "fingertips": ("hand", service.FINGERTIP_INDICES, service._FINGERTIP_ROWS),
+    "fingertip_priority": ("hand", service.FINGERTIP_PRIORITY, service._FINGERTIP_PRIORITY_ROWS),
+    "palm_center": ("hand", service.PALM_CENTER_INDICES, service._PALM_CENTER_ROWS),
+    "contact_joints": ("hand", service.ALL_CONTACT_INDICES, service._CONTACT_ROWS),
+}
+
+
+def _time_us(fn: Callable[[], object], iterations: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run(iterations: int, seed: int) -> Dict[str, Dict[str, float]]:
+    rng = np.random.default_rng(seed)
+    arrays = {"face": rng.uniform(0, 640, (478, 3)), "hand": rng.uniform(0, 640, (21, 3))}
+    results: Dict[str, Dict[str, float]] = {}
+
+    for name, (kind, indices, rows) in _SUBSETS.items():
+        points = arrays[kind]
+        assert np.array_equal(_tuple_rows(points, indices), service._landmark_rows(points, rows))
+        tuple_us = _time_us(lambda: _tuple_rows(points, indices), iterations)
+        array_us = _time_us(lambda: service._landmark_rows(points, rows), iterations)
+        results[name] = {"tuple_us": tuple_us, "array_us": array_us, "speedup": tuple_us / array_us}
+
+    face, hand = arrays["face"], arrays["hand"]
+    hands = (hand, hand)
+
+    def frame_with(select: Callable[[np.ndarray, str], np.ndarray]) -> None:
+        select(face, "face_bounding")
+        select(face, "face_overlay")
+        for points in hands:
+            for name in ("hand_subset", "fingertips", "fingertip_priority", "palm_center", "contact_joints"):
+                select(points, name)
+
+    tuple_us = _time_us(lambda: frame_with(lambda p, n: _tuple_rows(p, _SUBSETS[n][1])), iterations)
+    array_us = _time_us(lambda: frame_with(lambda p, n: service._landmark_rows(p, _SUBSETS[n][2])), iterations)
+    results["per_frame"] = {"tuple_us": tuple_us, "array_us": array_us, "speedup": tuple_us / array_us}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.seed)
+    print(f"{'subset':<20} {'tuple us':>9} {'array us':>9} {'speedup':>8}")
+    for name, row in results.items():
+        print(f"{name:<20} {row['tuple_us']:>9.2f} {row['array_us']:>9.2f} {row['speedup']:>7.1f}x")
+    if args.save:
+        pathlib.Path(args.save).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
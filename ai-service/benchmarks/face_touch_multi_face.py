@@ -0,0 +1,215 @@
+"""Per-face overhead of the multi-face mode (``max_faces`` > 1).
+
+Two views of the cost, for 1..N faces:
+
+- ``scoring``: hand-to-face assignment plus one ``_score_face_touch`` per
+  face on seeded synthetic landmarks (two hands per face). Deterministic, so
+  it shows the post-inference cost growing linearly with the face count;
+- ``pipeline``: the full session pipeline on frames with N copies of the
+  fixture face (a row of two, then a 2x2 grid) with sensor-like noise, or on
+  ``--recording`` footage with several people in view. Reports the faces
+  actually found, ms/frame and the overhead per extra face against the
+  single-face mode on the same frames.
+
+Usage (from ai-service/):
+    python -m benchmarks.face_touch_multi_face --faces 4 --frames 40
+    python -m benchmarks.face_touch_multi_face --recording lab.mp4 --faces 3 --save multi.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import statistics
+import sys
+import time
+from typing import Dict, List, Sequence
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.services.face_touch_service import (
+    Box,
+    _assign_hands_to_faces,
+    _score_face_touch,
+    analyze_face_touch_bytes,
+    release_face_touch_session,
+)
+from benchmarks.face_touch_pipeline import _encode, _recorded_sequence, _summary
+from tests.face_touch_fixtures import decode_fixture
+
+_FRAME_WIDTH = 640
+_FRAME_HEIGHT = 480
+
+
+def _synthetic_faces(rng: np.random.Generator, faces: int) -> tuple[List[np.ndarray], List[Box], List[np.ndarray]]:
+    """``faces`` faces spread over the frame width, each with two hands around it."""
+    slot = _FRAME_WIDTH / faces
+    face_size = min(slot * 0.6, 200.0)
+    face_points, face_boxes, hand_sets = [], [], []
+    for index in range(faces):
+        box = Box(
+            x=slot * index + (slot - face_size) / 2,
+            y=140.0,
+            width=face_size,
+            height=face_size * 1.2,
+        )
+        face_boxes.append(box)
+        face_points.append(
+            np.column_stack(
+                (
+                    rng.uniform(box.x, box.x + box.width, 478),
+                    rng.uniform(box.y, box.y + box.height, 478),
+                    rng.normal(0.0, 0.03, 478),
+                )
+            )
+        )
+        for _ in range(2):
+            center = rng.normal(box.center, (face_size * 0.6, face_size * 0.6))
+            hand_sets.append(
+                np.column_stack(
+                    (
+                        center[0] + rng.normal(0.0, face_size * 0.2, 21),
+                        center[1] + rng.normal(0.0, face_size * 0.25, 21),
+                        rng.normal(-0.05, 0.08, 21),
+                    )
+                )
+            )
+    return face_points, face_boxes, hand_sets
+
+
+def _score_faces(face_points: Sequence[np.ndarray], face_boxes: Sequence[Box], hand_sets: Sequence[np.ndarray]) -> None:
+    assigned = _assign_hands_to_faces(face_boxes, hand_sets, _FRAME_WIDTH, _FRAME_HEIGHT)
+    for points, box, hands in zip(face_points, face_boxes, assigned):
+        _score_face_touch(points, box, hands, _FRAME_WIDTH, _FRAME_HEIGHT)
+
+
+def run_scoring_case(faces: int, iterations: int, seed: int) -> Dict[str, object]:
+    rng = np.random.default_rng(seed + faces)
+    cases = [_synthetic_faces(rng, faces) for _ in range(iterations)]
+    _score_faces(*cases[0])
+
+    latencies = []
+    for case in cases:
+        started = time.perf_counter()
+        _score_faces(*case)
+        latencies.append((time.perf_counter() - started) * 1000)
+    summary = _summary(latencies)
+    return {"frames": iterations, "faces": faces, **summary, "per_face_ms": summary["mean_ms"] / faces}
+
+
+def _grid_sequence(faces: int, count: int, seed: int, quality: int = 70) -> List[bytes]:
+    """N fixture faces, a row of two per line, over per-frame sensor noise."""
+    rng = np.random.default_rng(seed)
+    tile = cv2.resize(decode_fixture(), (320, 320), interpolation=cv2.INTER_AREA)
+    columns = min(faces, 2)
+    rows = (faces + 1) // 2
+    canvas = np.full((320 * rows, 320 * columns, 3), 210, dtype=np.uint8)
+    for index in range(faces):
+        row, column = divmod(index, 2)
+        canvas[row * 320 : (row + 1) * 320, column * 320 : (column + 1) * 320] = tile
+
+    frames = []
+    for _ in range(count):
+        noise = rng.integers(-6, 7, size=canvas.shape, dtype=np.int16)
+        frames.append(_encode(np.clip(canvas.astype(np.int16) + noise, 0, 255).astype(np.uint8), quality))
+    return frames
+
+
+def run_pipeline_case(frames: Sequence[bytes], max_faces: int, fps: int, name: str) -> Dict[str, object]:
+    session_id = f"bench-{name}"
+    latencies: List[float] = []
+    face_counts: List[int] = []
+    stage_rows: List[Dict[str, float]] = []
+    try:
+        # First frames pay graph creation and tracker start-up.
+        for index, frame in enumerate(frames[:3]):
+            analyze_face_touch_bytes(frame, session_id, index * 1000 // fps, fps, max_faces=max_faces)
+        for index, frame in enumerate(frames, start=3):
+            started = time.perf_counter()
+            response = analyze_face_touch_bytes(
+                frame,
+                session_id,
+                index * 1000 // fps,
+                fps,
+                overlay_mode="none",
+                max_faces=max_faces,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            face_counts.append(len(response.faces) if response.faces is not None else int(response.faceDetected))
+            stage_rows.append(response.debug.stages or {})
+    finally:
+        release_face_touch_session(session_id)
+
+    stage_names = sorted({stage for row in stage_rows for stage in row})
+    return {
+        "frames": len(latencies),
+        "max_faces": max_faces,
+        "faces_found": statistics.fmean(face_counts),
+        **_summary(latencies),
+        "stages_ms": {stage: statistics.fmean(row.get(stage, 0.0) for row in stage_rows) for stage in stage_names},
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, object]]:
+    results: Dict[str, Dict[str, object]] = {}
+    for faces in range(1, args.faces + 1):
+        results[f"scoring/faces{faces}"] = run_scoring_case(faces, args.scoring_iterations, args.seed)
+
+    for faces in range(1, args.faces + 1):
+        if args.recording:
+            frames = _recorded_sequence(pathlib.Path(args.recording), args.frames, args.width)
+            sequence = "recorded"
+        else:
+            frames = _grid_sequence(faces, args.frames, args.seed)
+            sequence = f"grid{faces}"
+        single = results.setdefault(
+            f"pipeline/{sequence}/single",
+            run_pipeline_case(frames, 1, args.fps, f"{sequence}-single"),
+        )
+        if faces == 1:
+            continue
+        row = run_pipeline_case(frames, faces, args.fps, f"{sequence}-multi{faces}")
+        extra_faces = row["faces_found"] - single["faces_found"]
+        row["overhead_ms"] = row["mean_ms"] - single["mean_ms"]
+        row["per_extra_face_ms"] = row["overhead_ms"] / extra_faces if extra_faces >= 0.5 else None
+        results[f"pipeline/{sequence}/max{faces}"] = row
+    return results
+
+
+def _print_results(results: Dict[str, Dict[str, object]]) -> None:
+    print(f"{'case':<30} {'faces':>6} {'mean ms':>8} {'p95 ms':>8} {'per face':>9} {'overhead':>9}")
+    for name, row in results.items():
+        faces = row.get("faces_found", row.get("faces"))
+        per_face = row.get("per_face_ms", row.get("per_extra_face_ms"))
+        per_face_text = f"{per_face:>9.3f}" if per_face is not None else f"{'-':>9}"
+        overhead = f"{row['overhead_ms']:>9.2f}" if "overhead_ms" in row else f"{'-':>9}"
+        print(f"{name:<30} {faces:>6.2f} {row['mean_ms']:>8.3f} {row['p95_ms']:>8.3f} {per_face_text} {overhead}")
+        if row.get("stages_ms"):
+            breakdown = ", ".join(f"{stage} {value:.2f}" for stage, value in row["stages_ms"].items())
+            print(f"{'':<30} stages ms: {breakdown}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=int, default=4, help="largest max_faces to measure")
+    parser.add_argument("--frames", type=int, default=40, help="frames per pipeline case")
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--recording", help="directory of images or a video file with several people")
+    parser.add_argument("--width", type=int, default=640, help="frame width for --recording")
+    parser.add_argument("--scoring-iterations", type=int, default=2000)
+    parser.add_argument("--save", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    _print_results(results)
+    if args.save:
+        pathlib.Path(args.save).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
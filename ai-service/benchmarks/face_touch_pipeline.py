@@ -0,0 +1,326 @@
+"""End-to-end throughput / latency benchmark of the face-touch pipeline.
+
+Runs ``analyze_face_touch_frame`` over reproducible frame sequences and
+reports frames/sec, p50/p95/p99 latency, mean per-stage time and RSS for
+every (sequence, width, concurrency) case, plus the pure scoring stage for
+0/1/2 hands on seeded synthetic landmarks:
+
+- ``synthetic``: the fixture face drifting over sensor-like noise (fixed
+  seed), so keyframe reuse and tracking behave like a real webcam;
+- ``recorded``: a directory of images or a video file (``--recording``),
+  the only way to exercise Hands end to end (a synthetic canvas has none).
+
+Each concurrent stream is its own session, like separate webcam clients.
+``--backend`` picks the landmark backend (``FACE_TOUCH_BACKEND``); pipeline
+cases also report process CPU seconds and frames per CPU second, the number
+to compare backends by on a shared server. ``--save`` writes the results as JSON; ``--baseline`` compares against such
+a file and exits with status 1 when any case loses more than
+``--max-regression`` of its throughput or p95 latency.
+
+Usage (from ai-service/):
+    python -m benchmarks.face_touch_pipeline --frames 60 --widths 320,640 --concurrency 1,2
+    python -m benchmarks.face_touch_pipeline --save baseline.json
+    python -m benchmarks.face_touch_pipeline --baseline baseline.json --max-regression 0.15
+    python -m benchmarks.face_touch_pipeline --recording session.mp4 --frames 300
+    python -m benchmarks.face_touch_pipeline --backend onnx --save onnx.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import pathlib
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.models import FaceTouchAnalyzeRequest
+from app.services.face_touch_service import (
+    Box,
+    _score_face_touch,
+    analyze_face_touch_frame,
+    release_face_touch_session,
+)
+from tests.face_touch_fixtures import decode_fixture
+
+_IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def _rss_mb() -> float:
+    """Current resident set size; falls back to the peak where /proc is missing."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _encode(frame: np.ndarray, quality: int) -> bytes:
+    ok, encoded = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    assert ok
+    return encoded.tobytes()
+
+
+def _synthetic_sequence(count: int, width: int, seed: int, quality: int = 70) -> List[bytes]:
+    """Fixture face on a slow random walk; small per-frame jitter like a seated user."""
+    rng = np.random.default_rng(seed)
+    height = width * 3 // 4
+    face_size = max(48, width * 2 // 5)
+    face = cv2.resize(decode_fixture(), (face_size, face_size), interpolation=cv2.INTER_AREA)
+    background = rng.integers(170, 236, size=(height, width, 3), dtype=np.uint8)
+    x = float((width - face_size) // 2)
+    y = float((height - face_size) // 2)
+
+    frames = []
+    for _ in range(count):
+        x = float(np.clip(x + rng.normal(0.0, width * 0.006), 0, width - face_size))
+        y = float(np.clip(y + rng.normal(0.0, height * 0.006), 0, height - face_size))
+        noise = rng.integers(-6, 7, size=background.shape, dtype=np.int16)
+        canvas = np.clip(background.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        canvas[int(y) : int(y) + face_size, int(x) : int(x) + face_size] = face
+        frames.append(_encode(canvas, quality))
+    return frames
+
+
+def _recorded_sequence(path: pathlib.Path, count: int, width: int, quality: int = 70) -> List[bytes]:
+    """First ``count`` frames of an image directory (sorted by name) or a video file."""
+    if path.is_dir():
+        images = (cv2.imread(str(item)) for item in sorted(path.iterdir()) if item.suffix.lower() in _IMAGE_SUFFIXES)
+        raw_frames = [image for image in images if image is not None][:count]
+    else:
+        capture = cv2.VideoCapture(str(path))
+        raw_frames = []
+        try:
+            while len(raw_frames) < count:
+                ok, image = capture.read()
+                if not ok:
+                    break
+                raw_frames.append(image)
+        finally:
+            capture.release()
+    if not raw_frames:
+        raise SystemExit(f"No frames could be read from {path}")
+
+    frames = []
+    for image in raw_frames:
+        if image.shape[1] != width:
+            height = max(1, round(image.shape[0] * width / image.shape[1]))
+            image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+        frames.append(_encode(image, quality))
+    return frames
+
+
+def _requests(frames: Sequence[bytes], session_id: str, fps: int) -> List[FaceTouchAnalyzeRequest]:
+    return [
+        FaceTouchAnalyzeRequest(
+            image="data:image/jpeg;base64," + base64.b64encode(frame).decode("ascii"),
+            timestamp=index * 1000 // fps,
+            sample_rate_fps=fps,
+            session_id=session_id,
+        )
+        for index, frame in enumerate(frames)
+    ]
+
+
+def _run_stream(requests: Sequence[FaceTouchAnalyzeRequest]) -> tuple[List[float], List[Dict[str, float]]]:
+    latencies: List[float] = []
+    stages: List[Dict[str, float]] = []
+    try:
+        for request in requests:
+            started = time.perf_counter()
+            response = analyze_face_touch_frame(request)
+            latencies.append((time.perf_counter() - started) * 1000)
+            stages.append(response.debug.stages or {})
+    finally:
+        release_face_touch_session(requests[0].session_id)
+    return latencies, stages
+
+
+def _summary(latencies: Sequence[float]) -> Dict[str, float]:
+    values = np.asarray(latencies)
+    return {
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+    }
+
+
+def run_pipeline_case(frames: Sequence[bytes], concurrency: int, fps: int, name: str) -> Dict[str, object]:
+    """Analyze ``frames`` on ``concurrency`` parallel sessions; all streams see the same frames."""
+    streams = [_requests(frames, f"bench-{name}-{stream}", fps) for stream in range(concurrency)]
+    # Warm-up stream: MediaPipe graph creation must not land in the first samples.
+    _run_stream(_requests(frames[:3], f"bench-{name}-warmup", fps))
+
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+        outcomes = list(pool.map(_run_stream, streams))
+    wall_s = time.perf_counter() - started
+    cpu_s = time.process_time() - cpu_started
+
+    latencies = [value for stream_latencies, _ in outcomes for value in stream_latencies]
+    stage_rows = [row for _, stream_stages in outcomes for row in stream_stages]
+    stage_names = sorted({stage for row in stage_rows for stage in row})
+    return {
+        "frames": len(latencies),
+        "fps": len(latencies) / wall_s,
+        "cpu_s": cpu_s,
+        "frames_per_cpu_s": len(latencies) / cpu_s if cpu_s > 0 else None,
+        **_summary(latencies),
+        "stages_ms": {stage: statistics.fmean(row.get(stage, 0.0) for row in stage_rows) for stage in stage_names},
+        "rss_mb": _rss_mb(),
+        "rss_delta_mb": _rss_mb() - rss_before,
+    }
+
+
+def _synthetic_landmarks(rng: np.random.Generator, hands: int) -> tuple[np.ndarray, Box, List[np.ndarray]]:
+    face_box = Box(x=220.0, y=120.0, width=200.0, height=240.0)
+    face_points = np.column_stack(
+        (
+            rng.uniform(face_box.x, face_box.x + face_box.width, 478),
+            rng.uniform(face_box.y, face_box.y + face_box.height, 478),
+            rng.normal(0.0, 0.03, 478),
+        )
+    )
+    hand_sets = []
+    for _ in range(hands):
+        center = rng.uniform((120.0, 80.0), (520.0, 420.0))
+        hand = np.column_stack(
+            (
+                center[0] + rng.normal(0.0, 40.0, 21),
+                center[1] + rng.normal(0.0, 50.0, 21),
+                rng.normal(-0.05, 0.08, 21),
+            )
+        )
+        hand_sets.append(hand)
+    return face_points, face_box, hand_sets
+
+
+def run_scoring_case(hands: int, iterations: int, seed: int) -> Dict[str, object]:
+    """Post-inference geometry only (``_score_face_touch``) for a fixed hand count."""
+    rng = np.random.default_rng(seed + hands)
+    cases = [_synthetic_landmarks(rng, hands) for _ in range(iterations)]
+    _score_face_touch(*cases[0], 640, 480)
+
+    latencies = []
+    started = time.perf_counter()
+    for face_points, face_box, hand_sets in cases:
+        case_started = time.perf_counter()
+        _score_face_touch(face_points, face_box, hand_sets, 640, 480)
+        latencies.append((time.perf_counter() - case_started) * 1000)
+    wall_s = time.perf_counter() - started
+    return {"frames": iterations, "fps": iterations / wall_s, **_summary(latencies)}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, object]]:
+    results: Dict[str, Dict[str, object]] = {}
+    widths = [int(value) for value in args.widths.split(",")]
+    concurrency_levels = [int(value) for value in args.concurrency.split(",")]
+
+    for width in widths:
+        sequences = {"synthetic": _synthetic_sequence(args.frames, width, args.seed)}
+        if args.recording:
+            sequences["recorded"] = _recorded_sequence(pathlib.Path(args.recording), args.frames, width)
+        for sequence_name, frames in sequences.items():
+            for concurrency in concurrency_levels:
+                name = f"pipeline/{sequence_name}/w{width}/c{concurrency}"
+                results[name] = run_pipeline_case(frames, concurrency, args.fps, name.replace("/", "-"))
+
+    for hands in (0, 1, 2):
+        results[f"scoring/hands{hands}"] = run_scoring_case(hands, args.scoring_iterations, args.seed)
+
+    results["process"] = {"peak_rss_mb": _peak_rss_mb(), "backend": settings.FACE_TOUCH_BACKEND}
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, object]],
+    baseline: Dict[str, Dict[str, object]],
+    max_regression: float,
+) -> List[str]:
+    """Return one message per case whose fps or p95 regressed past the threshold."""
+    failures = []
+    for name, row in results.items():
+        reference = baseline.get(name)
+        if not reference or "fps" not in row or "fps" not in reference:
+            continue
+        if row["fps"] < reference["fps"] * (1.0 - max_regression):
+            failures.append(f"{name}: fps {row['fps']:.1f} < baseline {reference['fps']:.1f}")
+        if row["p95_ms"] > reference["p95_ms"] * (1.0 + max_regression):
+            failures.append(f"{name}: p95 {row['p95_ms']:.2f} ms > baseline {reference['p95_ms']:.2f} ms")
+    return failures
+
+
+def _print_results(results: Dict[str, Dict[str, object]]) -> None:
+    print(
+        f"{'case':<34} {'frames':>6} {'fps':>8} {'f/cpu-s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rss MB':>8}"
+    )
+    for name, row in results.items():
+        if "fps" not in row:
+            continue
+        rss = f"{row['rss_mb']:>8.0f}" if "rss_mb" in row else f"{'-':>8}"
+        per_cpu = row.get("frames_per_cpu_s")
+        per_cpu_text = f"{per_cpu:>8.1f}" if per_cpu is not None else f"{'-':>8}"
+        print(
+            f"{name:<34} {row['frames']:>6} {row['fps']:>8.1f} {per_cpu_text} {row['p50_ms']:>8.2f} "
+            f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {rss}"
+        )
+        if row.get("stages_ms"):
+            breakdown = ", ".join(f"{stage} {value:.2f}" for stage, value in row["stages_ms"].items())
+            print(f"{'':<34} stages ms: {breakdown}")
+    print(f"backend: {results['process']['backend']}, peak RSS: {results['process']['peak_rss_mb']:.0f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=60, help="frames per stream")
+    parser.add_argument("--widths", default="320,640", help="comma-separated frame widths")
+    parser.add_argument("--concurrency", default="1,2", help="comma-separated parallel session counts")
+    parser.add_argument("--fps", type=int, default=10, help="sample rate used for frame timestamps")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--recording", help="directory of images or a video file")
+    parser.add_argument("--scoring-iterations", type=int, default=2000)
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    parser.add_argument("--backend", choices=("mediapipe", "onnx"), help="landmark backend (default: settings)")
+    args = parser.parse_args()
+    if args.backend:
+        settings.FACE_TOUCH_BACKEND = args.backend
+
+    results = run(args)
+    _print_results(results)
+
+    if args.save:
+        pathlib.Path(args.save).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(pathlib.Path(args.baseline).read_text(encoding="utf-8"))
+        failures = compare(results, baseline, args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+        print(f"no regression beyond {args.max_regression:.0%}")
+
+
+if __name__ == "__main__":
+    main()
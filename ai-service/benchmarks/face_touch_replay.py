@@ -0,0 +1,144 @@
+"""Threshold sweeps over captured face-touch landmarks, without re-inference.
+
+Three modes (see ``app/services/face_touch_replay.py`` for the file format):
+
+- ``capture``: run the live pipeline once over a recording (directory of
+  images or a video) with capture on, producing one ``.ftcap`` file;
+  alternatively set ``FACE_TOUCH_CAPTURE_DIR`` on a server;
+- ``sweep``: precision / recall of every combination of ``--grid`` settings
+  over labelled captures (``<capture>.labels.json`` next to each file);
+- ``throughput``: replay frames/s of the scoring stage and of the event
+  tracker alone, i.e. what one sweep step costs.
+
+Usage (from ai-service/):
+    python -m benchmarks.face_touch_replay capture --recording lab.mp4 --out captures/
+    python -m benchmarks.face_touch_replay sweep captures/*.ftcap --workers 8 \\
+        --grid FACE_TOUCH_TOUCH_THRESHOLD=0.45,0.55,0.65 \\
+        --grid FACE_TOUCH_REGION_TOUCH_THRESHOLD=0.3,0.4 --save sweep.json
+    python -m benchmarks.face_touch_replay throughput captures/*.ftcap --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import pathlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.services import face_touch_replay as replay
+
+
+def _parse_grid(values: Sequence[str]) -> Dict[str, List[object]]:
+    grid: Dict[str, List[object]] = {}
+    for value in values:
+        name, _, options = value.partition("=")
+        current = getattr(settings, name)
+        grid[name] = [type(current)(option) for option in options.split(",") if option]
+    return grid
+
+
+def capture(args: argparse.Namespace) -> None:
+    from app.services.face_touch_service import analyze_face_touch_bytes, release_face_touch_session
+    from benchmarks.face_touch_pipeline import _recorded_sequence
+
+    settings.FACE_TOUCH_CAPTURE_DIR = args.out
+    frames = _recorded_sequence(pathlib.Path(args.recording), args.frames, args.width)
+    session_id = pathlib.Path(args.recording).stem
+    try:
+        for index, frame in enumerate(frames):
+            analyze_face_touch_bytes(frame, session_id, index * 1000 / args.fps, args.fps, overlay_mode="none")
+    finally:
+        release_face_touch_session(session_id)
+    print(f"captured {len(frames)} frames into {args.out}")
+
+
+def sweep(args: argparse.Namespace) -> None:
+    grid = _parse_grid(args.grid)
+    started = time.perf_counter()
+    rows = replay.sweep(args.captures, grid, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    rows.sort(key=lambda row: -(row["frame_precision"] or 0.0) * (row["frame_recall"] or 0.0))
+
+    def text(value: float | None) -> str:
+        return f"{value:>7.3f}" if value is not None else f"{'-':>7}"
+
+    print(f"{'frame P':>7} {'frame R':>7} {'event P':>7} {'event R':>7} {'events':>6}  settings")
+    for row in rows:
+        print(
+            f"{text(row['frame_precision'])} {text(row['frame_recall'])} {text(row['event_precision'])} "
+            f"{text(row['event_recall'])} {row['events']:>6}  {row['settings']}"
+        )
+    frames = rows[0]["frames"] if rows else 0
+    print(f"{len(rows)} combinations over {frames} frames in {elapsed:.1f}s")
+    if args.save:
+        pathlib.Path(args.save).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+def throughput(args: argparse.Namespace) -> None:
+    pool = None
+    if args.workers > 1:
+        pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        if pool is not None:
+            # Spawn the workers (and their imports) outside the measurement.
+            empty = np.zeros(0, dtype=np.intp)
+            list(pool.map(replay._score_chunk, [args.captures[0]] * args.workers, [empty] * args.workers, [{}] * args.workers))
+        total = scored = 0
+        scoring_s = events_s = 0.0
+        for path in args.captures:
+            records = replay.open_capture(path)
+            total += len(records)
+            scored += len(replay.scorable_rows(records))
+            started = time.perf_counter()
+            touch, near = replay.score_capture(path, pool=pool)
+            scoring_s += time.perf_counter() - started
+            started = time.perf_counter()
+            replay.replay_events(np.asarray(records["timestamp_ms"]), touch, near)
+            events_s += time.perf_counter() - started
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    print(f"frames: {total} ({scored} with face + hands, scored)")
+    print(f"scoring: {scoring_s:.2f}s, {total / max(scoring_s, 1e-9):.0f} frames/s")
+    print(f"event tracker: {events_s:.2f}s, {total / max(events_s, 1e-9):.0f} frames/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    capture_parser = modes.add_parser("capture", help="capture landmarks of a recording")
+    capture_parser.add_argument("--recording", required=True, help="directory of images or a video file")
+    capture_parser.add_argument("--out", required=True, help="directory for the .ftcap file")
+    capture_parser.add_argument("--frames", type=int, default=3000)
+    capture_parser.add_argument("--width", type=int, default=640)
+    capture_parser.add_argument("--fps", type=int, default=10)
+    capture_parser.set_defaults(run=capture)
+
+    sweep_parser = modes.add_parser("sweep", help="precision / recall over a settings grid")
+    sweep_parser.add_argument("captures", nargs="+")
+    sweep_parser.add_argument("--grid", action="append", default=[], help="SETTING=v1,v2,... (repeatable)")
+    sweep_parser.add_argument("--workers", type=int, default=1)
+    sweep_parser.add_argument("--save", help="write all rows as JSON")
+    sweep_parser.set_defaults(run=sweep)
+
+    throughput_parser = modes.add_parser("throughput", help="replay speed with current settings")
+    throughput_parser.add_argument("captures", nargs="+")
+    throughput_parser.add_argument("--workers", type=int, default=1)
+    throughput_parser.set_defaults(run=throughput)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
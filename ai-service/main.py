@@ -9,6 +9,12 @@ from contextlib import asynccontextmanager
 
 from app.config import settings
 from app.routers import roadmap, ollama, ollama_proxy, face_touch, cv
+from app.services.face_touch_executor import face_touch_executor
+from app.services.face_touch_warmup import face_touch_warmup
+from app.services.groq_client import groq_clients
+from app.services.groq_scheduler import groq_scheduler
+from app.services.roadmap_cache import roadmap_cache
+from app.services.roadmap_generator import roadmap_generations
 
 # Configure logging
 logging.basicConfig(
@@ -30,8 +36,14 @@ async def lifespan(app: FastAPI):
     logger.info(f"[OLLAMA] {settings.OLLAMA_BASE_URL}")
     logger.info(f"[OLLAMA CHAT] {settings.OLLAMA_CHAT_MODEL}")
     logger.info(f"[OLLAMA COMPLETION] {settings.OLLAMA_COMPLETION_MODEL}")
+    groq_clients.start()
+    face_touch_executor.start()
+    face_touch_warmup.start(face_touch_executor)
     yield
     # Shutdown
+    face_touch_warmup.cancel()
+    face_touch_executor.shutdown()
+    await groq_clients.close()
     logger.info("[STOP] Shutting down AI Service")
 
 
@@ -82,6 +94,8 @@ async def health_check():
                 "configured": bool(settings.GROQ_API_KEY),
                 "model": settings.GROQ_MODEL,
                 "api_key_preview": api_key_preview,
+                "client": groq_clients.stats(),
+                "rateLimits": groq_scheduler.stats(),
             },
             "ollama": {
                 "base_url": settings.OLLAMA_BASE_URL,
@@ -89,6 +103,8 @@ async def health_check():
                 "completion_model": settings.OLLAMA_COMPLETION_MODEL,
             },
         },
+        "roadmap_cache": roadmap_cache.stats(),
+        "roadmap_coalescing": roadmap_generations.stats(),
     }
 
 
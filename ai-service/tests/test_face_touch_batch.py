@@ -0,0 +1,50 @@
+import asyncio
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.services import face_touch_batch
+
+
+class _CountingExecutor:
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self.running = 0
+        self.peak = 0
+
+    async def run(self, fn, *args, affinity):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return [affinity]
+
+
+def test_concurrent_batches_leave_a_worker_for_live_frames(monkeypatch):
+    executor = _CountingExecutor(workers=3)
+    monkeypatch.setattr(face_touch_batch, "face_touch_executor", executor)
+    monkeypatch.setattr(settings, "FACE_TOUCH_BATCH_MAX_WORKERS", 0)
+    calls = [(None, (), f"seg{index}") for index in range(6)]
+
+    async def scenario():
+        return await asyncio.gather(
+            face_touch_batch._run_segments(calls),
+            face_touch_batch._run_segments(calls),
+        )
+
+    first, second = asyncio.run(scenario())
+
+    assert face_touch_batch.batch_slots() == 2
+    assert executor.peak == 2
+    assert first == second == [f"seg{index}" for index in range(6)]
+
+
+def test_batch_slots_setting_is_capped_at_the_pool_size(monkeypatch):
+    monkeypatch.setattr(face_touch_batch, "face_touch_executor", _CountingExecutor(workers=1))
+    monkeypatch.setattr(settings, "FACE_TOUCH_BATCH_MAX_WORKERS", 0)
+    assert face_touch_batch.batch_slots() == 1
+    monkeypatch.setattr(face_touch_batch, "face_touch_executor", _CountingExecutor(workers=4))
+    monkeypatch.setattr(settings, "FACE_TOUCH_BATCH_MAX_WORKERS", 8)
+    assert face_touch_batch.batch_slots() == 4
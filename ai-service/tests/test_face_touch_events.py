@@ -0,0 +1,56 @@
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.services.face_touch_events import FaceTouchEventTracker
+
+
+def _feed(tracker, touch_scores, step_ms=100, start_ms=0):
+    return [
+        tracker.update(start_ms + index * step_ms, touch, touch * 0.8, ["nose"] if touch else [])
+        for index, touch in enumerate(touch_scores)
+    ]
+
+
+def test_single_frame_blip_does_not_raise_alert():
+    tracker = FaceTouchEventTracker(tau_ms=150, exit_ratio=0.75, min_duration_ms=200)
+
+    states = _feed(tracker, [0.0, 0.95, 0.0, 0.0, 0.0])
+
+    assert not any(state.alertStarted or state.alertActive for state in states)
+    assert not any(state.events for state in states)
+    assert tracker.flush() == []
+
+
+def test_sustained_touch_emits_one_debounced_event():
+    tracker = FaceTouchEventTracker(tau_ms=150, exit_ratio=0.75, min_duration_ms=200)
+
+    states = _feed(tracker, [0.0] + [0.9] * 8 + [0.0] * 6)
+
+    assert sum(state.alertStarted for state in states) == 1
+    events = [event for state in states for event in state.events]
+    assert len(events) == 1
+    assert events[0].durationMs >= 200
+    assert events[0].peakScore == 0.9
+    assert events[0].regions == ["nose"]
+
+
+def test_hysteresis_keeps_touching_state_between_exit_and_enter_thresholds():
+    tracker = FaceTouchEventTracker(tau_ms=50, exit_ratio=0.75, min_duration_ms=0)
+
+    _feed(tracker, [0.9] * 4)
+    # 0.5 is below the 0.58 enter threshold but above the 0.435 exit threshold
+    states = _feed(tracker, [0.5] * 4, start_ms=400)
+
+    assert all(state.state == "touching_face" for state in states)
+
+
+def test_smoothing_does_not_depend_on_frame_rate():
+    fast = FaceTouchEventTracker(tau_ms=150)
+    slow = FaceTouchEventTracker(tau_ms=150)
+
+    fast_state = _feed(fast, [0.0] + [0.9] * 10, step_ms=50)[-1]
+    slow_state = _feed(slow, [0.0] + [0.9] * 2, step_ms=250)[-1]
+
+    assert abs(fast_state.touchScore - slow_state.touchScore) < 1e-3
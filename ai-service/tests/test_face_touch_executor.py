@@ -0,0 +1,72 @@
+import asyncio
+import pathlib
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.services.face_touch_executor import FaceTouchBusyError, FaceTouchExecutor
+
+
+def test_thread_backend_runs_work_off_the_event_loop():
+    executor = FaceTouchExecutor(backend="thread", workers=2, max_pending=0)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        worker_thread = await executor.run(threading.get_ident)
+        return loop_thread, worker_thread
+
+    try:
+        loop_thread, worker_thread = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert worker_thread != loop_thread
+    assert executor.stats()["completed"] == 1
+
+
+def test_saturated_executor_rejects_instead_of_queueing():
+    executor = FaceTouchExecutor(backend="thread", workers=1, max_pending=1, retry_after_s=2.0)
+    release = threading.Event()
+
+    async def scenario():
+        running = [
+            asyncio.ensure_future(executor.run(release.wait)),
+            asyncio.ensure_future(executor.run(release.wait)),
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(FaceTouchBusyError) as excinfo:
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+        return excinfo.value
+
+    try:
+        error = asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert error.retry_after_s == 2.0
+    assert stats["rejected"] == 1
+    assert stats["inFlight"] == 0
+    assert stats["completed"] == 2
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        FaceTouchExecutor(backend="gpu")
+
+
+def test_run_on_every_worker_reaches_each_thread():
+    executor = FaceTouchExecutor(backend="thread", workers=3, max_pending=0)
+
+    try:
+        threads = asyncio.run(executor.run_on_every_worker(threading.get_ident))
+    finally:
+        executor.shutdown()
+
+    assert len(set(threads)) == 3
@@ -0,0 +1,109 @@
+import asyncio
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.services.face_touch_limiter import FaceTouchLimiter, FaceTouchRateLimitedError
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_allows_burst_then_limits_to_advertised_rate():
+    clock = _Clock()
+    limiter = FaceTouchLimiter(global_fps=100, slack=0.0, burst_s=1.0, clock=clock)
+
+    for _ in range(5):
+        limiter.try_acquire("session:a", 5)
+    with pytest.raises(FaceTouchRateLimitedError) as error:
+        limiter.try_acquire("session:a", 5)
+
+    assert error.value.reason == "rate"
+    assert error.value.suggested_fps == 5
+    assert error.value.retry_after_s == pytest.approx(0.2)
+
+    clock.now += 0.2
+    limiter.try_acquire("session:a", 5)
+    assert limiter.stats()["limited"] == 1
+
+
+def test_busy_sessions_are_capped_at_their_fair_share():
+    clock = _Clock()
+    limiter = FaceTouchLimiter(global_fps=20, slack=0.0, burst_s=1.0, clock=clock)
+    for index in range(4):
+        limiter.try_acquire(f"session:{index}", 30)
+
+    wait_s, suggested_fps = limiter.reserve("session:0", 30)
+    for _ in range(10):
+        wait_s, suggested_fps = limiter.reserve("session:0", 30)
+
+    assert suggested_fps == 5
+    assert wait_s == pytest.approx(1 / 5 * 6)
+
+
+def test_newer_frame_supersedes_the_one_waiting_behind_the_gate():
+    limiter = FaceTouchLimiter(global_fps=100)
+    release = asyncio.Event()
+    outcomes = []
+
+    async def frame(name: str, hold: bool = False):
+        try:
+            async with limiter.admit("session:a", 10):
+                outcomes.append(name)
+                if hold:
+                    await release.wait()
+        except FaceTouchRateLimitedError as error:
+            outcomes.append(f"{name}:{error.reason}")
+
+    async def scenario():
+        first = asyncio.create_task(frame("first", hold=True))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(frame("second"))
+        await asyncio.sleep(0)
+        third = asyncio.create_task(frame("third"))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, second, third)
+
+    asyncio.run(scenario())
+
+    assert outcomes == ["first", "second:superseded", "third"]
+    assert limiter.stats()["superseded"] == 1
+
+
+def test_session_less_frames_share_the_global_budget_without_superseding():
+    # Every student behind the Next.js proxy arrives as one client address.
+    clock = _Clock()
+    limiter = FaceTouchLimiter(global_fps=40, slack=0.0, burst_s=1.0, clock=clock)
+    release = asyncio.Event()
+    outcomes = []
+
+    async def frame(name: str, hold: bool = False):
+        async with limiter.admit("client:127.0.0.1", 10, shared=True):
+            outcomes.append(name)
+            if hold:
+                await release.wait()
+
+    async def scenario():
+        tasks = [asyncio.create_task(frame(f"student{index}", hold=True)) for index in range(4)]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    for _ in range(36):
+        limiter.try_acquire("client:127.0.0.1", 10, shared=True)
+
+    assert outcomes == ["student0", "student1", "student2", "student3"]
+    assert limiter.stats()["superseded"] == 0
+    assert limiter.stats()["limited"] == 0
+    with pytest.raises(FaceTouchRateLimitedError):
+        limiter.try_acquire("client:127.0.0.1", 10, shared=True)
@@ -0,0 +1,105 @@
+import math
+import pathlib
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.services import face_touch_onnx
+from app.services.face_touch_service import (
+    _extract_face_points,
+    _FrameContext,
+    _intersection_ratio,
+    _MediaPipeRuntime,
+    get_face_touch_runtime_status,
+)
+from tests.face_touch_fixtures import decode_fixture, make_small_face_landscape_frame
+
+_ONNX_UNAVAILABLE = face_touch_onnx.onnx_backend_error()
+
+
+def test_anchor_layouts_match_mediapipe_detectors():
+    assert len(face_touch_onnx.ssd_anchors(192, (4,), False)) == 2304
+    assert len(face_touch_onnx.ssd_anchors(128, (8, 16, 16, 16), True)) == 896
+    palm = face_touch_onnx.ssd_anchors(192, (8, 16, 16, 16), True)
+    assert len(palm) == 2016
+    assert np.allclose(palm[0], (0.5 / 24, 0.5 / 24))
+
+
+def test_detections_decode_and_merge_overlapping_candidates():
+    anchors = face_touch_onnx.ssd_anchors(128, (16,), False)
+    raw_boxes = np.zeros((len(anchors), 16))
+    raw_scores = np.full(len(anchors), -10.0)
+    # Two neighbouring anchors propose the same 32 px face, a third one a far-away face.
+    for index in (27, 28, 54):
+        raw_boxes[index, 2:4] = 32.0
+        raw_scores[index] = 3.0
+
+    scores, boxes, points = face_touch_onnx.decode_detections(raw_boxes, raw_scores, anchors, 128, 6, 0.5)
+    detections = face_touch_onnx.weighted_nms(scores, boxes, points)
+
+    assert len(scores) == 3
+    assert len(detections) == 2
+    _, merged_box, merged_points = detections[0]
+    assert np.allclose(merged_box[2:], (0.25, 0.25))
+    assert merged_points.shape == (6, 2)
+
+
+def test_rotated_roi_maps_crop_corners_back_to_the_frame():
+    points = np.array([[100.0, 100.0], [160.0, 100.0], [100.0, 180.0], [160.0, 180.0]])
+    roi = face_touch_onnx.roi_from_points(points, math.pi / 6, 1.0)
+    matrix = roi.matrix(192)
+
+    center = matrix[:, :2] @ (96.0, 96.0) + matrix[:, 2]
+    corner = matrix[:, :2] @ (0.0, 0.0) + matrix[:, 2]
+
+    assert np.allclose(center, (roi.center_x, roi.center_y))
+    assert math.isclose(np.linalg.norm(corner - center), roi.size / math.sqrt(2))
+    assert roi.size >= 80.0
+
+
+def test_status_reports_unavailable_onnx_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "FACE_TOUCH_BACKEND", "onnx")
+    monkeypatch.setattr(settings, "FACE_TOUCH_ONNX_MODEL_DIR", str(tmp_path))
+
+    status = get_face_touch_runtime_status(load_models=False)
+
+    assert status["available"] is False
+    assert status["message"] == face_touch_onnx.onnx_backend_error()
+
+
+@pytest.mark.skipif(_ONNX_UNAVAILABLE is not None, reason=_ONNX_UNAVAILABLE or "")
+@pytest.mark.parametrize(
+    "make_frame",
+    [
+        pytest.param(lambda: cv2.resize(decode_fixture(), (320, 320), interpolation=cv2.INTER_AREA), id="square"),
+        pytest.param(lambda: make_small_face_landscape_frame(face_size=96), id="small-face-landscape"),
+    ],
+)
+def test_onnx_landmarks_match_mediapipe_on_fixture_frames(make_frame):
+    frame = make_frame()
+    reference, onnx = _MediaPipeRuntime(), face_touch_onnx.OnnxFaceTouchRuntime()
+    try:
+        expected = _extract_face_points(reference, reference, _FrameContext(frame))
+        actual = _extract_face_points(onnx, onnx, _FrameContext(frame))
+        reference_hands = reference.hands().process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).multi_hand_landmarks
+        onnx_hands = onnx.hands().process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).multi_hand_landmarks
+    finally:
+        reference.reset()
+        onnx.reset()
+
+    assert expected is not None and actual is not None
+    expected_points, expected_box, _ = expected
+    actual_points, actual_box, _ = actual
+    # MediaPipe runs the attention model (478 points); its first 468 share the ONNX mesh topology.
+    assert actual_points.shape == (468, 3)
+    errors = np.linalg.norm(actual_points[:, :2] - expected_points[:468, :2], axis=1)
+    assert float(np.mean(errors)) < 0.05 * expected_box.width
+    assert float(np.percentile(errors, 95)) < 0.12 * expected_box.width
+    assert min(_intersection_ratio(actual_box, expected_box), _intersection_ratio(expected_box, actual_box)) > 0.8
+    # The fixtures have no hands in them; both backends must agree on that.
+    assert not reference_hands and not onnx_hands
@@ -0,0 +1,74 @@
+import json
+import pathlib
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.services import face_touch_replay as replay
+from app.services.face_touch_service import Box, _score_face_touch, release_face_touch_session
+from tests.face_touch_fixtures import decode_fixture, hand_at, request_from_frame
+
+
+def _write_capture(path: pathlib.Path, frames: int = 40) -> list:
+    """Face at a fixed spot; a hand moves onto it for frames 15..29."""
+    rng = np.random.default_rng(3)
+    face_box = Box(x=240.0, y=120.0, width=160.0, height=200.0)
+    face_points = np.column_stack(
+        (rng.uniform(240, 400, 478), rng.uniform(120, 320, 478), rng.normal(0.0, 0.02, 478))
+    )
+    writer = replay.FaceTouchCaptureWriter(str(path))
+    inputs = []
+    for index in range(frames):
+        hands = [hand_at(320.0, 220.0)] if 15 <= index < 30 else [hand_at(560.0, 420.0)] if index % 2 else []
+        writer.append(index * 100.0, 640, 480, (face_points, face_box), hands)
+        inputs.append((face_points, face_box, hands))
+    writer.close()
+    return inputs
+
+
+def test_capture_replays_the_same_scores_from_a_memory_map(tmp_path):
+    path = tmp_path / "lab.ftcap"
+    inputs = _write_capture(path)
+
+    records = replay.open_capture(str(path))
+    touch, near = replay.score_capture(str(path))
+    expected = [_score_face_touch(points, box, hands, 640, 480) for points, box, hands in inputs]
+
+    assert isinstance(records, np.memmap) and len(records) == 40
+    assert len(replay.scorable_rows(records)) == 15 + 7 + 5
+    assert np.allclose(touch, [scores.touch_score for scores in expected], atol=1e-4)
+    assert np.allclose(near, [scores.near_score for scores in expected], atol=1e-4)
+
+
+def test_sweep_reports_precision_recall_per_setting(tmp_path):
+    path = tmp_path / "lab.ftcap"
+    _write_capture(path)
+    (tmp_path / "lab.labels.json").write_text(json.dumps({"touches": [[1500, 2900]]}))
+
+    rows = replay.sweep([str(path)], {"FACE_TOUCH_TOUCH_THRESHOLD": [0.05, 1.01]})
+
+    detected, silent = rows
+    assert detected["settings"] == {"FACE_TOUCH_TOUCH_THRESHOLD": 0.05}
+    assert detected["event_recall"] == 1.0 and detected["event_precision"] == 1.0
+    assert detected["frame_recall"] > 0.5
+    assert silent["events"] == 0 and silent["frame_recall"] == 0.0
+    assert settings.FACE_TOUCH_TOUCH_THRESHOLD not in (0.05, 1.01)
+
+
+def test_live_session_writes_capture_when_enabled(monkeypatch, tmp_path):
+    from app.services.face_touch_service import analyze_face_touch_frame
+
+    monkeypatch.setattr(settings, "FACE_TOUCH_CAPTURE_DIR", str(tmp_path))
+    request = request_from_frame(decode_fixture()).model_copy(update={"session_id": "capture/1"})
+    for timestamp in (0, 100, 200):
+        analyze_face_touch_frame(request.model_copy(update={"timestamp": timestamp}))
+    release_face_touch_session("capture/1")
+
+    (path,) = tmp_path.glob("capture_1-*.ftcap")
+    records = replay.open_capture(str(path))
+    assert replay.read_capture_metadata(str(path))["sessionId"] == "capture/1"
+    assert len(records) == 3
+    assert (records["face_points"] > 0).all()
@@ -0,0 +1,240 @@
+import asyncio
+import base64
+import pathlib
+import sys
+
+import cv2
+import httpx
+import pytest
+from fastapi import FastAPI, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.routers import face_touch
+from app.services.face_touch_executor import FaceTouchExecutor
+from app.services.face_touch_limiter import FaceTouchLimiter
+from tests.face_touch_fixtures import decode_fixture
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(face_touch.router)
+    return TestClient(app)
+
+
+def _jpeg_bytes(size: int = 320) -> bytes:
+    frame = cv2.resize(decode_fixture(), (size, size), interpolation=cv2.INTER_AREA)
+    ok, encoded = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 70])
+    assert ok
+    return encoded.tobytes()
+
+
+def test_stream_returns_analysis_for_binary_frames():
+    with _client().websocket_connect("/api/face-touch/stream?session_id=ws-test") as websocket:
+        websocket.send_bytes(_jpeg_bytes())
+        result = websocket.receive_json()
+
+    assert result["frameSeq"] == 1
+    assert result["faceDetected"] is True
+    assert result["state"] in {"safe", "near_face", "touching_face"}
+    assert "droppedFrames" in result
+
+
+def test_stream_reports_undecodable_frames_without_closing():
+    with _client().websocket_connect("/api/face-touch/stream") as websocket:
+        websocket.send_bytes(b"not-an-image")
+        error = websocket.receive_json()
+        websocket.send_bytes(_jpeg_bytes())
+        result = websocket.receive_json()
+
+    assert "error" in error
+    assert result["faceDetected"] is True
+
+
+def test_stream_rejects_out_of_range_sample_rate():
+    for fps in (0, 10000):
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            with _client().websocket_connect(f"/api/face-touch/stream?sample_rate_fps={fps}"):
+                pass
+        assert disconnect.value.code == 1008
+
+
+def test_raw_endpoint_accepts_octet_stream_body():
+    response = _client().post(
+        "/api/face-touch/analyze-frame/raw?session_id=raw-test",
+        content=_jpeg_bytes(),
+        headers={"content-type": "application/octet-stream"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["faceDetected"] is True
+
+
+def test_raw_endpoint_accepts_multipart_upload():
+    response = _client().post(
+        "/api/face-touch/analyze-frame/raw",
+        files={"image": ("frame.jpg", _jpeg_bytes(), "image/jpeg")},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["faceDetected"] is True
+
+
+def test_raw_endpoint_rejects_undecodable_body():
+    response = _client().post(
+        "/api/face-touch/analyze-frame/raw",
+        content=b"garbage",
+        headers={"content-type": "application/octet-stream"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_batch_endpoint_returns_ordered_compact_results():
+    image = "data:image/jpeg;base64," + base64.b64encode(_jpeg_bytes()).decode("ascii")
+    frames = [{"image": image, "timestamp": index * 100} for index in range(20)]
+
+    response = _client().post(
+        "/api/face-touch/analyze-batch",
+        json={"session_id": "review-1", "frames": frames},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["frameCount"] == 20
+    assert [frame["index"] for frame in body["frames"]] == list(range(20))
+    assert all(frame["faceDetected"] for frame in body["frames"])
+    assert body["events"] == []
+
+
+def test_batch_video_endpoint_samples_frames(tmp_path):
+    video_path = tmp_path / "review.avi"
+    frame = cv2.resize(decode_fixture(), (320, 320), interpolation=cv2.INTER_AREA)
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 20.0, (320, 320))
+    for _ in range(40):
+        writer.write(frame)
+    writer.release()
+
+    response = _client().post(
+        "/api/face-touch/analyze-batch/video?sample_rate_fps=10",
+        files={"video": ("review.avi", video_path.read_bytes(), "video/x-msvideo")},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["frameCount"] == 20
+    assert [frame["timestamp"] for frame in body["frames"]][:3] == [0, 100, 200]
+
+
+def test_stage_timings_are_opt_in_and_exported_as_metrics():
+    client = _client()
+    plain = client.post(
+        "/api/face-touch/analyze-frame/raw",
+        content=_jpeg_bytes(),
+        headers={"content-type": "application/octet-stream"},
+    ).json()
+    timed = client.post(
+        "/api/face-touch/analyze-frame/raw?debug_timings=true",
+        content=_jpeg_bytes(),
+        headers={"content-type": "application/octet-stream"},
+    ).json()
+    metrics = client.get("/api/face-touch/metrics")
+
+    assert plain["debug"]["stages"] is None
+    assert {"decode", "hands", "scoring"} <= set(timed["debug"]["stages"])
+    assert timed["debug"]["facePath"]
+    assert metrics.status_code == 200
+    assert 'face_touch_stage_ms_bucket{stage="hands",le="+Inf"}' in metrics.text
+    assert "face_touch_executor_in_flight" in metrics.text
+
+
+def test_health_reports_ready_only_after_warmup():
+    warmup = face_touch.face_touch_warmup
+    saved = (warmup.enabled, warmup.state, warmup.workers, warmup.elapsed_ms)
+    executor = FaceTouchExecutor(backend="thread", workers=2, max_pending=0)
+    try:
+        warmup.enabled, warmup.state = True, "pending"
+        before = _client().get("/api/face-touch/health")
+
+        asyncio.run(warmup.run(executor))
+        after = _client().get("/api/face-touch/health")
+    finally:
+        executor.shutdown()
+        warmup.enabled, warmup.state, warmup.workers, warmup.elapsed_ms = saved
+
+    assert before.status_code == 503
+    assert before.json()["warmup"]["state"] == "pending"
+    assert after.status_code == 200
+    assert after.json()["warmup"]["state"] == "ready"
+    assert len(after.json()["warmup"]["workers"]) == 2
+
+
+def test_raw_endpoint_omits_overlay_when_not_rendered():
+    response = _client().post(
+        "/api/face-touch/analyze-frame/raw?overlay_mode=none",
+        content=_jpeg_bytes(),
+        headers={"content-type": "application/octet-stream"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["overlay"] is None
+    assert response.json()["faceDetected"] is True
+
+
+def test_raw_endpoint_returns_429_with_suggested_fps_over_budget(monkeypatch):
+    limiter = FaceTouchLimiter(global_fps=2, slack=0.0, burst_s=1.0)
+    monkeypatch.setattr(face_touch, "face_touch_limiter", limiter)
+    client = _client()
+
+    statuses = [
+        client.post(
+            "/api/face-touch/analyze-frame/raw?session_id=limited&sample_rate_fps=10&overlay_mode=none",
+            content=_jpeg_bytes(),
+            headers={"content-type": "application/octet-stream"},
+        )
+        for _ in range(3)
+    ]
+
+    assert [response.status_code for response in statuses[:2]] == [200, 200]
+    limited = statuses[2]
+    assert limited.status_code == 429
+    assert limited.headers["retry-after"] == "1"
+    assert isinstance(limited.json()["detail"], str)
+    assert limited.headers["x-suggested-fps"] == "2"
+    assert limited.headers["x-rate-limit-reason"] == "rate"
+
+
+def test_session_less_clients_behind_the_proxy_get_their_own_budget(monkeypatch):
+    limiter = FaceTouchLimiter(global_fps=8, slack=0.0, burst_s=1.0)
+    monkeypatch.setattr(face_touch, "face_touch_limiter", limiter)
+    monkeypatch.setattr(settings, "FACE_TOUCH_RATE_TRUSTED_PROXIES", ["proxy"])
+    app = FastAPI()
+    app.include_router(face_touch.router)
+    frame = _jpeg_bytes()
+
+    async def post(client, query="", forwarded_for=None):
+        headers = {"content-type": "application/octet-stream"}
+        if forwarded_for:
+            headers["x-forwarded-for"] = f"{forwarded_for}, 10.1.0.1"
+        response = await client.post(
+            f"/api/face-touch/analyze-frame/raw?overlay_mode=none{query}", content=frame, headers=headers
+        )
+        return response.status_code
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app, client=("proxy", 3000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            sessions = [await post(client, f"&session_id=s{index}") for index in range(4)]
+            students = await asyncio.gather(*(post(client, forwarded_for=f"10.0.0.{index}") for index in range(4)))
+        return sessions, students
+
+    sessions, students = asyncio.run(scenario())
+
+    # 8 active keys share 8 fps: one frame each. Keyed on the proxy address, the
+    # four students would have split a single 1.6 fps bucket.
+    assert sessions == [200] * 4
+    assert students == [200] * 4
+    assert {f"client:10.0.0.{index}" for index in range(4)} <= set(limiter._buckets)
+
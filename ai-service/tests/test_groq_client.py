@@ -0,0 +1,45 @@
+import asyncio
+import os
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.services.groq_client import GroqClientManager
+
+
+def test_client_is_reused_and_rebuilt_over_the_same_pool_on_key_change(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "gsk_first")
+    manager = GroqClientManager(env_file=str(tmp_path / "missing.env"))
+
+    first = manager.client()
+    again = manager.client()
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "gsk_second")
+    rotated = manager.client()
+    asyncio.run(manager.close())
+
+    assert first is again
+    assert rotated is not first and rotated.api_key == "gsk_second"
+    assert rotated._client is first._client
+    assert manager.clients_built == 2
+    assert manager.stats()["started"] is False
+
+
+def test_api_key_is_hot_reloaded_when_env_file_changes(monkeypatch, tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("GROQ_API_KEY=gsk_old\n")
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "gsk_old")
+    monkeypatch.setattr(settings, "GROQ_KEY_RELOAD_INTERVAL_S", 0.0)
+    manager = GroqClientManager(env_file=str(env_file))
+    assert manager.client().api_key == "gsk_old"
+
+    env_file.write_text("GROQ_API_KEY=gsk_new\n")
+    os.utime(env_file, (1, 1))
+    client = manager.client()
+    asyncio.run(manager.close())
+
+    assert client.api_key == "gsk_new"
+    assert settings.GROQ_API_KEY == "gsk_new"
+    assert manager.key_reloads == 1
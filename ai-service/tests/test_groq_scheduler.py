@@ -0,0 +1,82 @@
+import asyncio
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from app.config import settings
+from app.services.groq_scheduler import (
+    GroqBudgetTimeout,
+    GroqScheduler,
+    estimate_tokens,
+    parse_reset_duration,
+)
+
+
+def test_reset_durations_and_token_estimate(monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_CHARS_PER_TOKEN", 3.0)
+
+    assert parse_reset_duration("7.66s") == pytest.approx(7.66)
+    assert parse_reset_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_reset_duration("120ms") == pytest.approx(0.12)
+    assert parse_reset_duration("1h0m1s") == pytest.approx(3601.0)
+    assert parse_reset_duration("") is None
+    messages = [{"role": "system", "content": "x" * 300}, {"role": "user", "content": "y" * 30}]
+    assert estimate_tokens(messages, 1000) == 110 + 2 * 8 + 1000
+
+
+def test_waiting_calls_are_granted_round_robin_across_callers():
+    # 6000 TPM refills 100 tokens/s: each 10-token call waits ~0.1s.
+    scheduler = GroqScheduler(limits=lambda model: (6000, 0))
+    order = []
+
+    async def call(caller, name):
+        reservation = await scheduler.acquire("m", 10, caller=caller)
+        order.append(name)
+        reservation.settle(used_tokens=10)
+
+    async def main():
+        await scheduler.acquire("m", 6000, caller="warmup")
+        tasks = [asyncio.ensure_future(call("a", f"a{i}")) for i in range(3)]
+        tasks.append(asyncio.ensure_future(call("b", "b0")))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+
+    assert order == ["a0", "b0", "a1", "a2"]
+    stats = scheduler.stats()["models"]["m"]
+    assert stats["granted"] == 5 and stats["queued"] == 0 and stats["waited"] == 4
+
+
+def test_usage_headers_and_throttling_update_the_bucket(monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_SCHEDULER_MAX_WAIT_S", 0.05)
+    scheduler = GroqScheduler(limits=lambda model: (12000, 30))
+
+    async def main():
+        reservation = await scheduler.acquire("m", 5000)
+        # Real usage was lower, but Groq reports less headroom than we assumed.
+        reservation.settle(
+            used_tokens=1000,
+            headers={"x-ratelimit-limit-tokens": "6000", "x-ratelimit-remaining-tokens": "2000"},
+        )
+        budget = scheduler._budgets["m"]
+        assert budget.tokens_per_minute == 6000
+        assert budget.tokens == pytest.approx(2000, abs=5)
+
+        scheduler.throttled("m", 30.0)
+        with pytest.raises(GroqBudgetTimeout) as error:
+            await scheduler.acquire("m", 10)
+        assert error.value.retry_after_s == pytest.approx(30.0, abs=0.5)
+
+        # Deficit-bound: 6000 TPM refills 100 tokens/s and ~2000 are left.
+        budget.blocked_until = 0.0
+        with pytest.raises(GroqBudgetTimeout) as error:
+            await scheduler.acquire("m", 4000)
+        assert error.value.retry_after_s == pytest.approx(20.0, abs=0.5)
+
+    asyncio.run(main())
+
+    stats = scheduler.stats()["models"]["m"]
+    assert stats["throttled"] == 1 and stats["headerSyncs"] == 1 and stats["queued"] == 0
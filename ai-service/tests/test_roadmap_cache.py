@@ -0,0 +1,172 @@
+import asyncio
+import json
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.models import GenerationMetadata, RoadmapResponse, UserProfileRequest
+from app.services import roadmap_generator
+from app.services.roadmap_cache import (
+    MemoryRoadmapCache,
+    RoadmapCache,
+    SqliteRoadmapCache,
+    roadmap_cache_key,
+)
+from app.services.roadmap_generator import validate_and_parse_roadmap
+
+
+def _profile(target_role: str = "Frontend Developer") -> UserProfileRequest:
+    return UserProfileRequest(
+        current_role="Student",
+        target_role=target_role,
+        current_skills=["html"],
+        skill_level="beginner",
+        learning_style=["video"],
+        hours_per_week=10,
+        target_months=6,
+    )
+
+
+def _response() -> RoadmapResponse:
+    roadmap = validate_and_parse_roadmap(
+        {
+            "roadmap_title": "Frontend Roadmap",
+            "roadmap_description": "Dense frontend path",
+            "total_estimated_hours": 80,
+            "sections": [{"id": "section-1", "name": "Foundation", "order": 1, "description": "Core"}],
+            "nodes": [],
+            "edges": [],
+        }
+    )
+    metadata = GenerationMetadata(
+        model="llama-3.3-70b-versatile",
+        input_tokens=1200,
+        output_tokens=6000,
+        latency_ms=9000,
+        prompt_version="2.0.0",
+    )
+    return RoadmapResponse(roadmap=roadmap, metadata=metadata)
+
+
+def test_cache_key_is_canonical_and_tracks_prompt_version(monkeypatch):
+    key = roadmap_cache_key("Mục tiêu: Frontend\n")
+    same = roadmap_cache_key("  Mục tiêu: Frontend  ")
+    monkeypatch.setattr(settings, "PROMPT_VERSION", "9.9.9")
+
+    assert key == same
+    assert roadmap_cache_key("Mục tiêu: Frontend") != key
+
+
+def test_memory_backend_evicts_lru_and_expires_entries():
+    now = [0.0]
+    cache = MemoryRoadmapCache(max_entries=2, ttl_s=10.0, clock=lambda: now[0])
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    now[0] = 11.0
+    assert cache.get("c") is None
+
+
+def test_sqlite_backend_round_trips_and_caps_entries(tmp_path):
+    path = str(tmp_path / "cache" / "roadmaps.sqlite3")
+    cache = SqliteRoadmapCache(path, max_entries=2, ttl_s=60.0)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+
+    reopened = SqliteRoadmapCache(path, max_entries=2, ttl_s=60.0)
+    assert reopened.size() == 2
+    assert reopened.get("c") == "C"
+    reopened.delete("c")
+    assert reopened.get("c") is None
+
+
+def test_identical_profiles_are_served_from_cache(monkeypatch):
+    calls = []
+
+    async def fake_generate(profile, directives, user_prompt):
+        calls.append(user_prompt)
+        return _response()
+
+    monkeypatch.setattr(roadmap_generator, "_generate_roadmap_uncached", fake_generate)
+    monkeypatch.setattr(roadmap_generator, "roadmap_cache", RoadmapCache(MemoryRoadmapCache(8, 60.0)))
+
+    async def scenario():
+        first = await roadmap_generator.generate_roadmap(_profile())
+        second = await roadmap_generator.generate_roadmap(_profile())
+        other = await roadmap_generator.generate_roadmap(_profile("Backend Developer"))
+        return first, second, other
+
+    first, second, other = asyncio.run(scenario())
+
+    assert len(calls) == 2
+    assert first.metadata.cache_status == "miss"
+    assert second.metadata.cache_status == "hit"
+    assert second.metadata.output_tokens == 0
+    assert second.roadmap == first.roadmap
+    assert other.metadata.cache_status == "miss"
+    assert roadmap_generator.roadmap_cache.stats()["hits"] == 1
+
+
+def test_corrupt_or_stale_entries_are_dropped_and_regenerated(monkeypatch):
+    calls = []
+
+    async def fake_generate(profile, directives, user_prompt):
+        calls.append(user_prompt)
+        return _response()
+
+    backend = MemoryRoadmapCache(8, 60.0)
+    cache = RoadmapCache(backend)
+    monkeypatch.setattr(roadmap_generator, "_generate_roadmap_uncached", fake_generate)
+    monkeypatch.setattr(roadmap_generator, "roadmap_cache", cache)
+
+    async def scenario():
+        await roadmap_generator.generate_roadmap(_profile())
+        (key,) = list(backend._entries)
+        backend.set(key, "{not json")
+        corrupt = await roadmap_generator.generate_roadmap(_profile())
+        backend.set(key, json.dumps({"roadmap": {"nodes": "old schema"}, "metadata": {}}))
+        stale = await roadmap_generator.generate_roadmap(_profile())
+        hit = await roadmap_generator.generate_roadmap(_profile())
+        return corrupt, stale, hit
+
+    corrupt, stale, hit = asyncio.run(scenario())
+
+    assert len(calls) == 3
+    assert corrupt.metadata.cache_status == "miss"
+    assert stale.metadata.cache_status == "miss"
+    assert hit.metadata.cache_status == "hit"
+    assert cache.stats() == {"backend": "memory", "hits": 1, "misses": 3, "errors": 2}
+
+
+def test_concurrent_identical_requests_share_one_generation(monkeypatch):
+    calls = []
+
+    async def fake_generate(profile, directives, user_prompt):
+        calls.append(user_prompt)
+        await asyncio.sleep(0.05)
+        return _response()
+
+    monkeypatch.setattr(roadmap_generator, "_generate_roadmap_uncached", fake_generate)
+    monkeypatch.setattr(roadmap_generator, "roadmap_cache", RoadmapCache(None))
+    monkeypatch.setattr(roadmap_generator, "roadmap_generations", roadmap_generator.SingleFlight())
+
+    async def scenario():
+        return await asyncio.gather(
+            *(roadmap_generator.generate_roadmap(_profile()) for _ in range(5)),
+            roadmap_generator.generate_roadmap(_profile("Backend Developer")),
+        )
+
+    responses = asyncio.run(scenario())
+    statuses = [response.metadata.cache_status for response in responses]
+
+    assert len(calls) == 2
+    assert statuses.count("coalesced") == 4
+    assert statuses.count("disabled") == 2
+    assert responses[0].metadata is not responses[1].metadata
+    assert roadmap_generator.roadmap_generations.stats() == {"inFlight": 0, "leaders": 2, "coalesced": 4}
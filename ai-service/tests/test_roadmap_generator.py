@@ -1,5 +1,11 @@
+import asyncio
+import re
+
+from app.models import UserProfileRequest
+from app.services import roadmap_generator
 from app.services.roadmap_generator import (
     _collect_structural_issues,
+    _incremental_fill_roadmap,
     _rebalance_nodes_across_subsections,
     _validate_roadmap_quality,
     validate_and_parse_roadmap,
@@ -697,3 +703,69 @@ def test_should_not_reject_density_only_shortfalls_after_repair():
     )
 
     assert _collect_structural_issues(roadmap) == []
+
+
+def test_incremental_fill_runs_chunks_concurrently_and_merges_in_chunk_order(monkeypatch):
+    roadmap = validate_and_parse_roadmap(
+        {
+            "roadmap_title": "Backend roadmap",
+            "roadmap_description": "Twelve empty subsections",
+            "total_estimated_hours": 60,
+            "sections": [
+                {
+                    "id": f"section-{section}",
+                    "name": f"Section {section}",
+                    "order": section,
+                    "subsections": [
+                        {"id": f"section-{section}-sub-{sub}", "name": f"Topic {sub}", "order": sub}
+                        for sub in range(1, 5)
+                    ],
+                }
+                for section in range(1, 4)
+            ],
+            "nodes": [],
+            "edges": [],
+        }
+    )
+    profile = UserProfileRequest(
+        current_role="Student",
+        target_role="Backend Developer",
+        skill_level="beginner",
+        learning_style=["video"],
+        hours_per_week=10,
+        target_months=3,
+    )
+    running = 0
+    peak = 0
+
+    async def fake_fill(prompt, max_tokens_override=4000):
+        nonlocal running, peak
+        prefix = re.search(r"MUST start with '([^']+)'", prompt).group(1)
+        subsection_ids = re.findall(r'subsection_id="([^"]+)"', prompt)
+        running += 1
+        peak = max(peak, running)
+        # Later chunks finish first; the merge must not follow completion order.
+        await asyncio.sleep(0.05 * (4 - int(prefix[-2])))
+        running -= 1
+        return {
+            "nodes": [
+                {
+                    "id": f"{prefix}{subsection_id}-{index}",
+                    "subsection_id": subsection_id,
+                    "data": {"label": f"Lesson {index}", "prerequisites": ["x"], "learning_outcomes": ["y"]},
+                }
+                for subsection_id in subsection_ids
+                for index in range(2)
+            ],
+            "edges": [],
+        }
+
+    monkeypatch.setattr(roadmap_generator, "generate_fill_nodes_json", fake_fill)
+    added = asyncio.run(
+        _incremental_fill_roadmap(profile, roadmap, {"min_lessons_per_subsection": {"min": 2, "max": 3}})
+    )
+
+    assert added == 24
+    assert peak == 3
+    prefixes = [node.id.split("-section")[0] for node in roadmap.nodes]
+    assert prefixes == ["fill-r1c1"] * 10 + ["fill-r1c2"] * 10 + ["fill-r1c3"] * 4
@@ -0,0 +1,32 @@
+import asyncio
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.services.single_flight import SingleFlight
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_work():
+    flights = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "roadmap"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flights.run("k", work))
+        follower = asyncio.ensure_future(flights.run("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == ("roadmap", True)
+    assert runs == [1]
+    assert flights.stats()["inFlight"] == 0
@@ -132,13 +132,23 @@ export async function POST(request: NextRequest) {
             );
         }
 
+        // Every student reaches the service from this server's address; forward
+        // theirs so the service rate-limits each student on their own budget.
+        const headers: Record<string, string> = {
+            "Content-Type": "application/json",
+        };
+        const clientAddress =
+            request.headers.get("x-forwarded-for") ??
+            request.headers.get("x-real-ip");
+        if (clientAddress) {
+            headers["X-Forwarded-For"] = clientAddress;
+        }
+
         let upstreamResponse: Response;
         try {
             upstreamResponse = await fetch(`${FASTAPI_BASE_URL}/api/face-touch/analyze-frame`, {
                 method: "POST",
-                headers: {
-                    "Content-Type": "application/json",
-                },
+                headers,
                 body: JSON.stringify({
                     image: body.image,
                     timestamp: body.timestamp ?? Date.now(),